@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from flask import Flask, request
 from flask_cors import CORS
 from .config import Config
@@ -10,7 +12,10 @@ from .analytics.routes import analytics_bp
 from .logs.routes import logs_bp
 from .tasks.routes import tasks_bp
 from .notifications.routes import notifications_bp
-from .models import ApiEvent
+from .exports.routes import exports_bp
+from .reports.routes import reports_bp
+from . import audit, pubsub
+from .search import ensure_fts_tables
 from flask_jwt_extended import get_jwt_identity
 from werkzeug.exceptions import HTTPException
 
@@ -28,6 +33,8 @@ def create_app():
     # extensions
     db.init_app(app)
     jwt.init_app(app)
+    audit.init_app(app)
+    pubsub.init_app(app)
 
     # CORS (allow all origins; credentials are still supported for JWT cookies)
     CORS(
@@ -47,6 +54,8 @@ def create_app():
     app.register_blueprint(logs_bp, url_prefix="/api/logs")
     app.register_blueprint(tasks_bp, url_prefix="/api/tasks")
     app.register_blueprint(notifications_bp, url_prefix="/api/notifications")
+    app.register_blueprint(exports_bp, url_prefix="/api/exports")
+    app.register_blueprint(reports_bp, url_prefix="/api/reports")
 
     # api/app/__init__.py (inside create_app, before return)
     @app.get("/api/ping")
@@ -69,6 +78,8 @@ def create_app():
     def handle_exception(e):
         """
         Log 5xx responses to ApiEvent so they appear in activity/error logs.
+        The row is queued for the audit writer, which also feeds the 5xx
+        anomaly detector; nothing is written on the request's session.
         """
         status_code = 500
         if isinstance(e, HTTPException):
@@ -81,17 +92,18 @@ def create_app():
                     uid = int(get_jwt_identity())
                 except Exception:
                     uid = None
-                evt = ApiEvent(
+                audit.record_api_event(
+                    app,
                     path=request.path,
                     method=request.method,
                     status_code=status_code,
                     user_id=uid,
                     error_message=str(e)[:500],
+                    created_at=datetime.utcnow(),
+                    route=(request.url_rule.rule if request.url_rule else request.path)[:255],
                 )
-                db.session.add(evt)
-                db.session.commit()
             except Exception:
-                db.session.rollback()
+                app.logger.exception("Could not queue ApiEvent")
 
         if isinstance(e, HTTPException):
             return e
@@ -100,5 +112,7 @@ def create_app():
 
     with app.app_context():
         db.create_all()
+        with db.engine.begin() as conn:
+            ensure_fts_tables(conn)
 
     return app
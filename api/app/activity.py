@@ -0,0 +1,104 @@
+"""
+Activity feed read model (the `activity` table).
+
+Each new task log gets a feed row in the same flush, copied with one
+INSERT ... SELECT from logs/tasks/workflows/users so it carries the owner,
+names and actor details the feeds show. Workflow renames and moves, task
+renames, status changes and moves rewrite the affected rows; deleting a task
+or workflow deletes its rows. The feeds then read activity alone, newest
+first by id, through (owner_user_id, id).
+
+rebuild_activity() recomputes the table from logs in id-range chunks, for
+the initial backfill and to pick up changes the hooks cannot see (actor
+name/email edits, raw SQL writes).
+"""
+from sqlalchemy import delete, func, insert, select, update
+
+from .changes import on_change
+from .extensions import db
+from .models import Activity, Log, Task, User, Workflow
+
+COLS = ["id", "owner_user_id", "workflow_id", "workflow_name", "task_id", "task_name", "task_status",
+        "actor_id", "actor_name", "actor_email", "timestamp", "event", "status", "duration_ms",
+        "service", "error_message"]
+
+
+def _source():
+    return (
+        select(Log.id, Workflow.user_id, Workflow.id, Workflow.name, Task.id, Task.name, Task.status,
+               Log.actor_id, User.name, User.email, Log.timestamp, Log.event, Log.status, Log.duration_ms,
+               Log.service, Log.error_message)
+        .join(Task, Log.task_id == Task.id)
+        .join(Workflow, Task.workflow_id == Workflow.id)
+        .outerjoin(User, Log.actor_id == User.id)
+    )
+
+
+@on_change
+def _maintain_activity(session, changes):
+    table = Activity.__table__
+
+    if changes.deleted_workflows:
+        session.execute(delete(table).where(table.c.workflow_id.in_(list(changes.deleted_workflows))))
+    for wf_id, _old_owner, new_owner in changes.moved_workflows:
+        session.execute(update(table).where(table.c.workflow_id == wf_id).values(owner_user_id=new_owner))
+    for wf_id, _owner, name in changes.renamed_workflows:
+        session.execute(update(table).where(table.c.workflow_id == wf_id).values(workflow_name=name))
+
+    deleted_tasks = []
+    for before, after in changes.tasks:
+        if after is None:
+            if before.workflow_id not in changes.deleted_workflows:
+                deleted_tasks.append(before.task_id)
+            continue
+        if before is None or (before.name, before.status, before.workflow_id) == (after.name, after.status, after.workflow_id):
+            continue
+        values = {"task_name": after.name, "task_status": after.status}
+        if before.workflow_id != after.workflow_id:
+            values.update(
+                workflow_id=after.workflow_id,
+                owner_user_id=after.owner_user_id,
+                workflow_name=select(Workflow.name).where(Workflow.id == after.workflow_id).scalar_subquery(),
+            )
+        session.execute(update(table).where(table.c.task_id == after.task_id).values(**values))
+    if deleted_tasks:
+        session.execute(delete(table).where(table.c.task_id.in_(deleted_tasks)))
+
+    if changes.new_logs:
+        ids = [l.id for l in changes.new_logs]
+        session.execute(insert(table).from_select(COLS, _source().where(Log.id.in_(ids))))
+
+
+def rebuild_activity(chunk_size: int = 5000, log=print) -> int:
+    """
+    Recompute activity from logs, one id range per transaction so the logs
+    table is never locked for the whole rebuild. Returns the number of logs
+    processed.
+
+    Only logs up to the newest id at the start are touched: later ones got
+    their rows from the flush hook, and deleting them here would lose them.
+    """
+    table = Activity.__table__
+    high_water = db.session.execute(select(func.max(Log.id))).scalar() or 0
+    db.session.commit()
+    last_id = 0
+    done = 0
+    while True:
+        ids = db.session.execute(
+            select(Log.id).where(Log.id > last_id, Log.id <= high_water).order_by(Log.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        hi = ids[-1]
+        db.session.execute(delete(table).where(table.c.id > last_id, table.c.id <= hi))
+        db.session.execute(insert(table).from_select(COLS, _source().where(Log.id > last_id, Log.id <= hi)))
+        db.session.commit()
+
+        last_id = hi
+        done += len(ids)
+        log(f"  rebuilt activity for logs up to #{last_id} ({done} so far)")
+
+    # Rows past the last log processed (deleted since)
+    db.session.execute(delete(table).where(table.c.id > last_id, table.c.id <= high_water))
+    db.session.commit()
+    return done
@@ -0,0 +1,113 @@
+"""
+Approximate counts for admin-scope analytics (?approx=true).
+
+Task totals come from the maintained workflow_stats counters, which are
+exact, so the bounds below carry sampling error only. Proportions (status
+breakdown, due today, overdue) come from a uniform random sample of task
+primary keys and are reported with 95% Wilson score bounds, scaled by the
+total. Sampling by PK reads a few thousand rows through the primary key
+regardless of table size. table_rows() serves estimates that have no
+counter, such as the workflow count.
+"""
+import math
+import random
+from datetime import date
+
+from sqlalchemy import func, select, text
+
+from ..extensions import db
+from ..models import Task, WorkflowStats
+
+SAMPLE_SIZE = 2000
+# Candidate ids drawn per wanted row before giving up on a sparse id range
+MAX_DRAWS_PER_ROW = 20
+Z95 = 1.96
+
+
+def table_rows(table: str):
+    """Row estimate from the planner statistics, or None if the dialect keeps none."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "mysql":
+        sql = text("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t")
+    elif dialect == "postgresql":
+        sql = text("SELECT reltuples::bigint FROM pg_class WHERE relname = :t")
+    else:
+        return None
+    n = db.session.execute(sql, {"t": table}).scalar()
+    return int(n) if n is not None and n >= 0 else None
+
+
+def task_total() -> tuple[int, str]:
+    """(total tasks, source); the counters are exact, unlike table statistics."""
+    total = db.session.execute(select(func.coalesce(func.sum(WorkflowStats.total_count), 0))).scalar()
+    return int(total), "counters"
+
+
+def sample_tasks(columns, size: int = SAMPLE_SIZE) -> list:
+    """
+    Uniform sample of `size` task rows: distinct random ids in [min_id, max_id],
+    keeping the ones that exist, until `size` rows are found or
+    MAX_DRAWS_PER_ROW * size ids have been tried. Every live row is equally
+    likely, whatever the gaps.
+    """
+    lo, hi = db.session.execute(select(func.min(Task.id), func.max(Task.id))).one()
+    if lo is None:
+        return []
+    span = hi - lo + 1
+    ids = random.sample(range(lo, hi + 1), min(span, size * MAX_DRAWS_PER_ROW))
+    rows = []
+    for i in range(0, len(ids), 1000):
+        rows.extend(db.session.execute(select(*columns).where(Task.id.in_(ids[i:i + 1000]))).all())
+        if len(rows) >= size:
+            break
+    # The last batch can overshoot; drop the excess at random, not by id
+    return random.sample(rows, size) if len(rows) > size else rows
+
+
+def wilson(hits: int, n: int) -> tuple[float, float, float]:
+    """(p, low, high) at 95% confidence."""
+    if n == 0:
+        return 0.0, 0.0, 1.0
+    p = hits / n
+    denom = 1 + Z95 ** 2 / n
+    centre = (p + Z95 ** 2 / (2 * n)) / denom
+    half = Z95 * math.sqrt(p * (1 - p) / n + Z95 ** 2 / (4 * n * n)) / denom
+    return p, max(0.0, centre - half), min(1.0, centre + half)
+
+
+def scaled(hits: int, n: int, total: int) -> dict:
+    p, low, high = wilson(hits, n)
+    return {"estimate": round(p * total), "low": math.floor(low * total), "high": math.ceil(high * total)}
+
+
+def status_breakdown() -> dict:
+    total, source = task_total()
+    rows = sample_tasks([Task.status])
+    n = len(rows)
+    counts = {}
+    for (status,) in rows:
+        counts[status] = counts.get(status, 0) + 1
+    breakdown = []
+    for status, hits in sorted(counts.items(), key=lambda kv: -kv[1]):
+        bounds = scaled(hits, n, total)
+        breakdown.append({
+            "status": status or "unknown",
+            "count": bounds["estimate"],
+            "pct": round(hits / n * 100.0, 1),
+            "bounds": {"low": bounds["low"], "high": bounds["high"]},
+        })
+    return {"total": total, "breakdown": breakdown, "sample_size": n, "total_source": source}
+
+
+def due_counts(today: date) -> dict:
+    total, source = task_total()
+    rows = sample_tasks([Task.status, Task.due_date])
+    n = len(rows)
+    open_rows = [d for s, d in rows if s != "done" and s is not None and d is not None]
+    return {
+        "due_today": scaled(sum(1 for d in open_rows if d == today), n, total),
+        "overdue": scaled(sum(1 for d in open_rows if d < today), n, total),
+        "sample_size": n,
+        "total_source": source,
+    }
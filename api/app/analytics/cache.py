@@ -0,0 +1,148 @@
+"""
+Response cache for the analytics endpoints.
+
+Entries are keyed by (scope, endpoint, query args, today) and stamped with
+the scope's data version: analytics_versions holds one counter per owner
+that every task/workflow/log write bumps inside its own flush, and the
+admin scope's version is the sum over all owners. A lookup whose version no
+longer matches is a miss, so writes invalidate exactly the dashboards they
+can affect without any cross-process messaging.
+
+Concurrent misses for the same key and version wait for a single
+computation, and every response carries a weak ETag derived from the key
+and version so a client holding the current one gets a 304 before anything
+is computed.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date
+
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import func, select
+
+from ..changes import on_change
+from ..extensions import db
+from ..models import AnalyticsVersion
+from ..upsert import add_counts
+
+# What the compute functions need to know about the caller; safe to hand to other threads.
+Scope = namedtuple("Scope", "id role")
+
+
+@on_change
+def _bump_versions(session, changes):
+    rows = [{"owner_user_id": owner, "version": 1} for owner in sorted(changes.owners(session))]
+    add_counts(session, AnalyticsVersion.__table__, ["owner_user_id"], rows, ["version"])
+
+
+def scope_key(scope: Scope):
+    return "admin" if scope.role == "admin" else scope.id
+
+
+def current_version(scope: Scope) -> int:
+    if scope.role == "admin":
+        stmt = select(func.coalesce(func.sum(AnalyticsVersion.version), 0))
+    else:
+        stmt = select(AnalyticsVersion.version).where(AnalyticsVersion.owner_user_id == scope.id)
+    return int(db.session.execute(stmt).scalar() or 0)
+
+
+class ResponseCache:
+    """LRU + TTL map of key -> (version, payload) with single-flight misses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (version, expires_at, payload)
+        self._inflight = {}  # (key, version) -> threading.Event
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, key, version):
+        entry = self._entries.get(key)
+        if entry and entry[0] == version and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry
+        return None
+
+    def get_or_compute(self, key, version, compute, ttl: int, max_entries: int):
+        flight = (key, version)
+        with self._lock:
+            entry = self._fresh(key, version)
+            if entry:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            waiter = self._inflight.get(flight)
+            leader = waiter is None
+            if leader:
+                waiter = self._inflight[flight] = threading.Event()
+
+        if not leader:
+            waiter.wait(timeout=30)
+            with self._lock:
+                entry = self._fresh(key, version)
+            # The leader failed or is too slow: compute our own copy.
+            return entry[2] if entry else compute()
+
+        try:
+            payload = compute()
+            with self._lock:
+                self._entries[key] = (version, time.monotonic() + ttl, payload)
+                self._entries.move_to_end(key)
+                while len(self._entries) > max_entries:
+                    self._entries.popitem(last=False)
+            return payload
+        finally:
+            with self._lock:
+                self._inflight.pop(flight, None)
+            waiter.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cache = ResponseCache()
+
+
+def cache_key(endpoint: str, scope: Scope, args) -> tuple:
+    params = tuple(sorted(args.items(multi=True)))
+    return (scope_key(scope), endpoint, params, date.today().isoformat())
+
+
+def etag_for(key, version: int) -> str:
+    return hashlib.sha1(repr((key, version)).encode()).hexdigest()
+
+
+def cached_payload(key, version: int, compute):
+    """compute() -> dict, served from the cache while (key, version) is current."""
+    return cache.get_or_compute(
+        key, version, compute,
+        ttl=current_app.config["ANALYTICS_CACHE_TTL"],
+        max_entries=current_app.config["ANALYTICS_CACHE_MAX_ENTRIES"],
+    )
+
+
+def etag_response(etag: str, payload_fn):
+    """JSON response for payload_fn(), or a bare 304 if the client already has etag."""
+    if request.if_none_match.contains_weak(etag):
+        resp = make_response("", 304)
+    else:
+        resp = jsonify(payload_fn())
+    resp.set_etag(etag, weak=True)
+    # Per-user data behind a cookie: browsers may keep it but must revalidate.
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+def cached_response(endpoint: str, scope: Scope, args, compute):
+    """
+    Serve compute(scope, args) -> dict through the cache as a JSON response
+    with a weak ETag; returns 304 when the client already has this version.
+    """
+    key = cache_key(endpoint, scope, args)
+    version = current_version(scope)
+    return etag_response(etag_for(key, version),
+                         lambda: cached_payload(key, version, lambda: compute(scope, args)))
@@ -0,0 +1,152 @@
+"""
+Per-workflow task counters (workflow_stats).
+
+Task writes adjust total/open/done for the affected workflow in the same
+transaction, so /summary and /workflows/top read one small row per workflow
+instead of aggregating tasks. check_workflow_stats() compares the counters
+with the tasks table and repairs drift.
+
+Overdue is not kept here: whether a task is overdue changes with the date,
+not with a write, so a counter adjusted at write time goes wrong (and even
+negative) as days pass. Readers count it with overdue_count() instead.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import case, delete, func, select, update
+
+from ..changes import on_change
+from ..extensions import db
+from ..models import Task, Workflow, WorkflowStats
+from ..upsert import add_counts
+
+COUNT_COLS = ["total_count", "open_count", "done_count"]
+
+
+def _contribution(state) -> tuple[int, int, int]:
+    # Mirrors the SQL semantics used elsewhere: NULL status is neither open nor done.
+    is_open = state.status is not None and state.status != "done"
+    is_done = state.status == "done"
+    return 1, int(is_open), int(is_done)
+
+
+def overdue_count(workflow_id_col, today: date | None = None):
+    """
+    Correlated count of a workflow's open tasks due before today, one range
+    of ix_tasks_workflow_due (workflow_id, due_date) per workflow.
+    """
+    today = today or date.today()
+    return (select(func.count()).select_from(Task)
+            .where(Task.workflow_id == workflow_id_col, Task.due_date < today, Task.status != "done")
+            .scalar_subquery())
+
+
+@on_change
+def _maintain_workflow_stats(session, changes):
+    table = WorkflowStats.__table__
+
+    for wf_id, _old_owner, new_owner in changes.moved_workflows:
+        session.execute(update(table).where(table.c.workflow_id == wf_id).values(owner_user_id=new_owner))
+
+    if changes.deleted_workflows:
+        session.execute(delete(table).where(table.c.workflow_id.in_(list(changes.deleted_workflows))))
+
+    deltas = defaultdict(lambda: [0, 0, 0])
+    owners = {}
+    for wf_id, owner in changes.new_workflows:
+        deltas[wf_id]  # new workflows get a zero row so they show up in /workflows/top
+        owners[wf_id] = owner
+    for before, after in changes.tasks:
+        if before and before.workflow_id not in changes.deleted_workflows:
+            acc = deltas[before.workflow_id]
+            owners[before.workflow_id] = before.owner_user_id
+            for i, v in enumerate(_contribution(before)):
+                acc[i] -= v
+        if after:
+            acc = deltas[after.workflow_id]
+            owners[after.workflow_id] = after.owner_user_id
+            for i, v in enumerate(_contribution(after)):
+                acc[i] += v
+
+    rows = [
+        {"workflow_id": wf_id, "owner_user_id": owners[wf_id], **dict(zip(COUNT_COLS, acc))}
+        for wf_id, acc in deltas.items()
+        if owners.get(wf_id) is not None
+    ]
+    add_counts(session, table, ["workflow_id"], rows, COUNT_COLS)
+
+
+def _exact_counts(wf_ids: list[int]) -> dict:
+    rows = db.session.execute(
+        select(
+            Task.workflow_id,
+            func.count(),
+            func.sum(case((Task.status != "done", 1), else_=0)),
+            func.sum(case((Task.status == "done", 1), else_=0)),
+        )
+        .where(Task.workflow_id.in_(wf_ids))
+        .group_by(Task.workflow_id)
+    ).all()
+    return {wid: tuple(int(v or 0) for v in vals) for wid, *vals in rows}
+
+
+def check_workflow_stats(repair: bool = False, chunk_size: int = 500, log=print) -> dict:
+    """
+    Compare workflow_stats with the tasks table one chunk of workflows at a
+    time. With repair=True, drifted or missing rows are rewritten. Returns a
+    summary dict.
+    """
+    now = datetime.utcnow()
+    summary = {"workflows": 0, "drifted": 0, "missing": 0, "repaired": 0}
+    last_id = 0
+
+    while True:
+        wfs = db.session.execute(
+            select(Workflow.id, Workflow.user_id).where(Workflow.id > last_id).order_by(Workflow.id).limit(chunk_size)
+        ).all()
+        if not wfs:
+            break
+        wf_ids = [wid for wid, _ in wfs]
+        db.session.rollback()
+        # Lock the counters first so concurrent task writes queue behind this
+        # chunk, then count tasks in a snapshot taken after the lock.
+        stored = {
+            s.workflow_id: s
+            for s in WorkflowStats.query.filter(WorkflowStats.workflow_id.in_(wf_ids)).with_for_update()
+        }
+        exact = _exact_counts(wf_ids)
+
+        for wid, owner in wfs:
+            want = exact.get(wid, (0, 0, 0))
+            row = stored.get(wid)
+            if row is None:
+                summary["missing"] += 1
+                if repair:
+                    db.session.add(WorkflowStats(workflow_id=wid, owner_user_id=owner, checked_at=now,
+                                                 **dict(zip(COUNT_COLS, want))))
+                    summary["repaired"] += 1
+                continue
+            have = (row.total_count, row.open_count, row.done_count)
+            if have != want or row.owner_user_id != owner:
+                summary["drifted"] += 1
+                log(f"  workflow #{wid}: stored {have} owner={row.owner_user_id}, actual {want} owner={owner}")
+            if repair:
+                if have != want or row.owner_user_id != owner:
+                    summary["repaired"] += 1
+                row.owner_user_id = owner
+                for col, v in zip(COUNT_COLS, want):
+                    setattr(row, col, v)
+                row.checked_at = now
+
+        if repair:
+            db.session.commit()
+        else:
+            db.session.rollback()
+        summary["workflows"] += len(wfs)
+        last_id = wf_ids[-1]
+
+    if repair:
+        db.session.execute(delete(WorkflowStats.__table__).where(
+            WorkflowStats.workflow_id.notin_(select(Workflow.id))))
+        db.session.commit()
+    return summary
@@ -0,0 +1,250 @@
+"""
+Flow metrics (lead time, cycle time, time in status, weekly throughput)
+computed from the task status history in `logs`.
+
+Every task write records a Log carrying the task's status after the write,
+so a task's log rows ordered by id form its status timeline. Rows are
+streamed in chunks ordered by (task_id, id) and turned into NumPy columns;
+each chunk is reduced to per-task results before the next one is fetched,
+so memory is bounded by the chunk size plus one row per finished task.
+
+Definitions (all durations in hours):
+- lead time: first log of the task (its creation) -> first log in "done"
+- cycle time: first log whose status differs from the initial one -> first
+  "done"; tasks that went straight to "done" have no cycle time
+- time in status: per task, total time between a log and the next log of the
+  same task, attributed to the earlier log's status (the open segment after
+  the latest log is not counted)
+- throughput: tasks reaching "done" for the first time, per ISO week
+
+Logs written by /api/logs/record (service or error_message set) describe
+integration failures rather than task status, and are skipped.
+"""
+from collections import Counter
+from datetime import date
+
+import numpy as np
+from sqlalchemy import select
+
+from ..extensions import db
+from ..models import Task, Workflow, Log
+
+DONE = "done"
+PERCENTILES = (50, 90, 99)
+
+
+def _flow_query(scope, since: date, workflow_id=None):
+    stmt = (
+        select(Log.task_id, Log.timestamp, Log.status, Task.workflow_id, Task.assigned_to)
+        .join(Task, Log.task_id == Task.id)
+        .join(Workflow, Task.workflow_id == Workflow.id)
+        .where(
+            Task.created_at >= since,
+            Log.timestamp.isnot(None),
+            Log.service.is_(None),
+            Log.error_message.is_(None),
+        )
+        .order_by(Log.task_id, Log.id)
+    )
+    if scope.role != "admin":
+        stmt = stmt.where(Workflow.user_id == scope.id)
+    if workflow_id:
+        stmt = stmt.where(Task.workflow_id == workflow_id)
+    return stmt
+
+
+class _Codes(dict):
+    """Dictionary encoding: value -> small int, in first-seen order."""
+
+    def encode(self, values) -> np.ndarray:
+        return np.fromiter((self.setdefault(v, len(self)) for v in values), dtype=np.int32, count=len(values))
+
+    def names(self) -> list:
+        return list(self)
+
+
+class FlowAccumulator:
+    """Reduces (task_id, ts, status, workflow_id, assignee) chunks to per-task metrics."""
+
+    def __init__(self):
+        self.statuses = _Codes()
+        self.assignees = _Codes()
+        self.done_code = self.statuses.encode([DONE])[0]
+        # per finished chunk: one entry per task
+        self._task_wf, self._task_asg, self._lead, self._cycle = [], [], [], []
+        # per (task, status) totals
+        self._tis_wf, self._tis_asg, self._tis_status, self._tis_secs = [], [], [], []
+        self.weeks = Counter()
+        self.rows = 0
+
+    def add(self, tid, ts, st, wf, asg) -> None:
+        """
+        Consume one chunk of columns, sorted by task. The caller must pass
+        every row of a task in the same call (see stream_flow_metrics).
+        """
+        n = len(tid)
+        if not n:
+            return
+        self.rows += n
+        first = np.r_[True, tid[1:] != tid[:-1]]
+        starts = np.flatnonzero(first)
+        task_of_row = np.cumsum(first) - 1  # 0..tasks-1
+        n_tasks = len(starts)
+
+        # lead / cycle time
+        big = np.iinfo(np.int64).max
+        is_done = st == self.done_code
+        first_done = np.full(n_tasks, big, dtype=np.int64)
+        np.minimum.at(first_done, task_of_row[is_done], np.flatnonzero(is_done))
+        moved = st != st[starts][task_of_row]
+        first_move = np.full(n_tasks, big, dtype=np.int64)
+        np.minimum.at(first_move, task_of_row[moved], np.flatnonzero(moved))
+
+        finished = first_done != big
+        lead = np.full(n_tasks, np.nan)
+        lead[finished] = ts[first_done[finished]] - ts[starts[finished]]
+        worked = finished & (first_move < first_done)
+        cycle = np.full(n_tasks, np.nan)
+        cycle[worked] = ts[first_done[worked]] - ts[first_move[worked]]
+
+        self._task_wf.append(wf[starts])
+        self._task_asg.append(asg[starts])
+        self._lead.append(lead)
+        self._cycle.append(cycle)
+
+        # time in status: segment i runs from row i to row i+1 of the same task
+        seg = ~first[1:]
+        seg_task = task_of_row[:-1][seg]
+        seg_status = st[:-1][seg].astype(np.int64)
+        seg_secs = (ts[1:] - ts[:-1])[seg]
+        n_status = max(len(self.statuses), 1)
+        key = seg_task * n_status + seg_status
+        uniq, inv = np.unique(key, return_inverse=True)
+        totals = np.bincount(inv, weights=seg_secs)
+        per_task = uniq // n_status
+        self._tis_wf.append(wf[starts][per_task])
+        self._tis_asg.append(asg[starts][per_task])
+        self._tis_status.append((uniq % n_status).astype(np.int32))
+        self._tis_secs.append(totals)
+
+        # throughput by ISO week (Monday start; 1970-01-01 was a Thursday)
+        done_days = ts[first_done[finished]] // 86400
+        week_start = done_days - (done_days + 3) % 7
+        wk, counts = np.unique(week_start, return_counts=True)
+        self.weeks.update(dict(zip(wk.tolist(), counts.tolist())))
+
+    def workflow_ids(self) -> set:
+        return {int(w) for part in self._task_wf for w in np.unique(part)}
+
+    # ---------- results ----------
+
+    def _cat(self, parts, dtype):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    def result(self, workflow_names: dict) -> dict:
+        task_wf = self._cat(self._task_wf, np.int64)
+        task_asg = self._cat(self._task_asg, np.int32)
+        lead = self._cat(self._lead, float) / 3600.0
+        cycle = self._cat(self._cycle, float) / 3600.0
+        tis = (
+            self._cat(self._tis_wf, np.int64),
+            self._cat(self._tis_asg, np.int32),
+            self._cat(self._tis_status, np.int32),
+            self._cat(self._tis_secs, float) / 3600.0,
+        )
+        status_names = self.statuses.names()
+        assignee_names = self.assignees.names()
+
+        def breakdown(task_group, tis_group, label):
+            lead_p = _group_percentiles(task_group, lead)
+            cycle_p = _group_percentiles(task_group, cycle)
+            tasks = dict(zip(*np.unique(task_group, return_counts=True)))
+            in_status = {}
+            n_status = max(len(status_names), 1)
+            combined = tis_group.astype(np.int64) * n_status + tis[2]
+            for key, p in _group_percentiles(combined, tis[3]).items():
+                in_status.setdefault(key // n_status, {})[status_names[key % n_status]] = p
+            return [
+                {
+                    **label(g),
+                    "tasks": int(tasks[g]),
+                    "lead_time_hours": lead_p.get(g),
+                    "cycle_time_hours": cycle_p.get(g),
+                    "time_in_status_hours": in_status.get(g, {}),
+                }
+                for g in sorted(tasks, key=lambda g: -tasks[g])
+            ]
+
+        weeks = sorted(self.weeks.items())
+        return {
+            "rows_scanned": self.rows,
+            "tasks": int(len(task_wf)),
+            "tasks_done": int(np.count_nonzero(~np.isnan(lead))),
+            "overall": {
+                "lead_time_hours": _group_percentiles(np.zeros(len(lead), np.int8), lead).get(0),
+                "cycle_time_hours": _group_percentiles(np.zeros(len(cycle), np.int8), cycle).get(0),
+            },
+            "by_workflow": breakdown(
+                task_wf, tis[0],
+                lambda g: {"workflow": {"id": int(g), "name": workflow_names.get(int(g))}},
+            ),
+            "by_assignee": breakdown(
+                task_asg, tis[1],
+                lambda g: {"assignee": assignee_names[g]},
+            ),
+            "throughput": [
+                {"week": str(np.datetime64(int(d), "D")), "done": int(c)} for d, c in weeks
+            ],
+        }
+
+
+def _group_percentiles(groups: np.ndarray, values: np.ndarray) -> dict:
+    """group -> {"n", "p50", "p90", "p99"} over the non-NaN values, linear interpolation."""
+    keep = ~np.isnan(values)
+    groups, values = groups[keep], values[keep]
+    if not len(values):
+        return {}
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    keys, start, count = np.unique(groups, return_index=True, return_counts=True)
+    out = {int(k): {"n": int(c)} for k, c in zip(keys, count)}
+    for q in PERCENTILES:
+        pos = (count - 1) * (q / 100.0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, count - 1)
+        v = values[start + lo] + (values[start + hi] - values[start + lo]) * (pos - lo)
+        for k, x in zip(keys, v):
+            out[int(k)][f"p{q}"] = round(float(x), 2)
+    return out
+
+
+def stream_flow_metrics(scope, since: date, workflow_id=None, chunk_size: int = 50_000) -> dict:
+    """Stream the status history for scope and reduce it to flow metrics."""
+    acc = FlowAccumulator()
+    result = db.session.execute(
+        _flow_query(scope, since, workflow_id).execution_options(yield_per=chunk_size)
+    )
+    carry = None
+    for part in result.partitions():
+        tid, ts, st, wf, asg = zip(*part)
+        cols = (
+            np.fromiter(tid, dtype=np.int64, count=len(tid)),
+            np.array(ts, dtype="datetime64[s]").astype(np.int64),
+            acc.statuses.encode([s or "unknown" for s in st]),
+            np.fromiter(wf, dtype=np.int64, count=len(wf)),
+            acc.assignees.encode([a or "unassigned" for a in asg]),
+        )
+        if carry is not None:
+            cols = tuple(np.concatenate(pair) for pair in zip(carry, cols))
+        # The last task may continue in the next chunk: hold its rows back.
+        tail = int(np.searchsorted(cols[0], cols[0][-1]))
+        carry = tuple(c[tail:] for c in cols)
+        acc.add(*(c[:tail] for c in cols))
+    if carry is not None:
+        acc.add(*carry)
+
+    wf_ids = acc.workflow_ids()
+    names = {}
+    if wf_ids:
+        names = dict(db.session.execute(select(Workflow.id, Workflow.name).where(Workflow.id.in_(wf_ids))).all())
+    return acc.result(names)
@@ -0,0 +1,85 @@
+"""
+Incremental maintenance of task_daily_rollup.
+
+Every task insert/update/delete adjusts the (owner, workflow, day, status)
+counters in the same transaction, so /daily and /statuses read O(days)
+rows instead of grouping the whole tasks table.
+"""
+from collections import Counter
+
+from sqlalchemy import delete, func, insert, select, update
+
+from ..changes import on_change
+from ..extensions import db
+from ..models import Task, Workflow, TaskDailyRollup
+from ..upsert import add_counts
+
+KEY_COLS = ["owner_user_id", "workflow_id", "day", "status"]
+
+
+def _key(state):
+    return (state.owner_user_id, state.workflow_id, state.day, state.status or "")
+
+
+@on_change
+def _maintain_daily_rollup(session, changes):
+    table = TaskDailyRollup.__table__
+
+    for wf_id, _old_owner, new_owner in changes.moved_workflows:
+        session.execute(update(table).where(table.c.workflow_id == wf_id).values(owner_user_id=new_owner))
+
+    if changes.deleted_workflows:
+        session.execute(delete(table).where(table.c.workflow_id.in_(list(changes.deleted_workflows))))
+
+    deltas = Counter()
+    for before, after in changes.tasks:
+        if before and before.day and before.workflow_id not in changes.deleted_workflows:
+            deltas[_key(before)] -= 1
+        if after and after.day:
+            deltas[_key(after)] += 1
+
+    rows = [dict(zip(KEY_COLS, key), task_count=n) for key, n in deltas.items() if n]
+    add_counts(session, table, KEY_COLS, rows, ["task_count"])
+
+
+def rebuild_daily_rollup(chunk_size: int = 200, log=print) -> int:
+    """
+    Recompute task_daily_rollup from tasks, one chunk of workflows per
+    transaction so the tasks table is never locked for the whole rebuild.
+    Returns the number of workflows processed.
+    """
+    table = TaskDailyRollup.__table__
+    day = func.date(Task.created_at)
+    last_id = 0
+    done = 0
+    while True:
+        wf_ids = db.session.execute(
+            select(Workflow.id).where(Workflow.id > last_id).order_by(Workflow.id).limit(chunk_size)
+        ).scalars().all()
+        if not wf_ids:
+            break
+
+        agg = (
+            select(
+                Workflow.user_id,
+                Task.workflow_id,
+                day,
+                func.coalesce(Task.status, ""),
+                func.count(),
+            )
+            .join(Workflow, Task.workflow_id == Workflow.id)
+            .where(Task.workflow_id.in_(wf_ids), Task.created_at.isnot(None))
+            .group_by(Workflow.user_id, Task.workflow_id, day, func.coalesce(Task.status, ""))
+        )
+        db.session.execute(delete(table).where(table.c.workflow_id.in_(wf_ids)))
+        db.session.execute(insert(table).from_select(KEY_COLS + ["task_count"], agg))
+        db.session.commit()
+
+        last_id = wf_ids[-1]
+        done += len(wf_ids)
+        log(f"  rebuilt rollups for workflows up to #{last_id} ({done} so far)")
+
+    # Rows for workflows that no longer exist
+    db.session.execute(delete(table).where(table.c.workflow_id.notin_(select(Workflow.id))))
+    db.session.commit()
+    return done
@@ -1,9 +1,20 @@
-from datetime import date
-from flask import Blueprint, jsonify, request
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func, case
+from sqlalchemy import func
+from werkzeug.datastructures import MultiDict
 from ..extensions import db
-from ..models import User, Task, Workflow, Log  # <-- include Log
+from ..models import User, Task, Workflow, TaskDailyRollup, WorkflowStats, Activity
+from . import rollup, counters  # noqa: F401  (register the read-model maintenance hooks)
+from .sketches import service_stats
+from . import approx
+from .flow import stream_flow_metrics
+from .series import BUCKETS, METRICS, MAX_BUCKETS, bucket_count, series as build_series
+from ..pagination import CursorError, parse_cursor, keyset, page
+from .cache import (Scope, cache_key, cached_payload, cached_response, current_version,
+                    etag_for, etag_response)
 
 analytics_bp = Blueprint("analytics", __name__)
 
@@ -13,80 +24,89 @@ def _user():
     except Exception:
         return None
 
-@analytics_bp.get("/summary")
-@jwt_required()
-def summary():
+def _approx(u, args) -> bool:
+    """?approx=true only changes anything for the admin (whole-system) scope."""
+    return u.role == "admin" and args.get("approx", "").lower() in ("1", "true", "yes")
+
+def _serve(endpoint: str, compute):
     u = _user()
     if not u:
         return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    return cached_response(endpoint, Scope(u.id, u.role), request.args, compute)
 
-    q_tasks = db.session.query(Task)
+@analytics_bp.get("/summary")
+@jwt_required()
+def summary():
+    return _serve("summary", _summary)
+
+def _summary(u, args):
+    q_stats = db.session.query(
+        func.coalesce(func.sum(WorkflowStats.total_count), 0),
+        func.coalesce(func.sum(WorkflowStats.done_count), 0),
+    )
     q_wf = db.session.query(Workflow)
     if u.role != "admin":
-        q_tasks = (
-            q_tasks.join(Workflow, Task.workflow_id == Workflow.id)
-                   .filter(Workflow.user_id == u.id)
-        )
+        q_stats = q_stats.filter(WorkflowStats.owner_user_id == u.id)
         q_wf = q_wf.filter(Workflow.user_id == u.id)
 
-    total_tasks = q_tasks.count()
-    done_tasks = q_tasks.filter(Task.status == "done").count()
+    total_tasks, done_tasks = (int(v) for v in q_stats.one())
     pending_tasks = total_tasks - done_tasks
-    total_workflows = q_wf.count()
+    estimated = approx.table_rows("workflows") if _approx(u, args) else None
+    total_workflows = estimated if estimated is not None else q_wf.count()
 
-    return jsonify({
+    return {
         "ok": True,
         "summary": {
             "workflows": total_workflows,
             "tasks_total": total_tasks,
             "tasks_done": done_tasks,
             "tasks_pending": pending_tasks,
-        }
-    })
+        },
+        # task counts always come from the maintained counters and are exact
+        **({"approx": {"workflows": "table_stats"}} if estimated is not None else {}),
+    }
+
 @analytics_bp.get("/daily")
 @jwt_required()
 def daily():
     """Tasks created per day (last N days)."""
-    u = _user()
-    if not u:
-        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    return _serve("daily", _daily)
 
-    days = max(1, min(int(request.args.get("days", 14)), 90))
+def _daily(u, args):
+    days = max(1, min(int(args.get("days", 14)), 90))
 
     # keep references to labeled columns
-    d_col = func.date(Task.created_at).label("d")
-    c_col = func.count().label("c")
+    d_col = TaskDailyRollup.day.label("d")
+    c_col = func.sum(TaskDailyRollup.task_count).label("c")
 
     q = db.session.query(d_col, c_col)
     if u.role != "admin":
-        q = (
-            q.join(Workflow, Task.workflow_id == Workflow.id)
-             .filter(Workflow.user_id == u.id)
-        )
+        q = q.filter(TaskDailyRollup.owner_user_id == u.id)
 
     # order by the column object, not a string label
-    q = q.group_by(d_col).order_by(d_col.desc()).limit(days)
+    q = q.group_by(d_col).having(c_col > 0).order_by(d_col.desc()).limit(days)
 
     # present oldest→newest
     rows = list(reversed(q.all()))
     items = [{"date": str(d), "count": int(c)} for d, c in rows]
-    return jsonify({"ok": True, "items": items})
+    return {"ok": True, "items": items}
 
 
 @analytics_bp.get("/statuses")
 @jwt_required()
 def statuses():
     """Break down tasks by status with percentages."""
-    u = _user()
-    if not u:
-        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    return _serve("statuses", _statuses)
+
+def _statuses(u, args):
+    if _approx(u, args):
+        return {"ok": True, "approx": True, **approx.status_breakdown()}
 
-    q = (db.session.query(Task.status, func.count())
-         .select_from(Task)
-         .join(Workflow, Task.workflow_id == Workflow.id))
+    c_col = func.sum(TaskDailyRollup.task_count)
+    q = db.session.query(TaskDailyRollup.status, c_col)
     if u.role != "admin":
-        q = q.filter(Workflow.user_id == u.id)
-    rows = q.group_by(Task.status).all()
+        q = q.filter(TaskDailyRollup.owner_user_id == u.id)
+    rows = [(s, int(c)) for s, c in q.group_by(TaskDailyRollup.status).having(c_col > 0).all()]
 
     total = sum(c for _, c in rows) or 0
     breakdown = []
@@ -95,28 +115,32 @@ def statuses():
         pct = round((c / total * 100.0), 1) if total else 0.0
         breakdown.append({"status": status, "count": int(c), "pct": pct})
 
-    return jsonify({"ok": True, "total": total, "breakdown": breakdown})
+    return {"ok": True, "total": total, "breakdown": breakdown}
 
 @analytics_bp.get("/overdue")
 @jwt_required()
 def overdue():
     """Counts of due today / overdue + a small list of top overdue tasks."""
-    u = _user()
-    if not u:
-        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    return _serve("overdue", _overdue)
 
+def _overdue(u, args):
     today = date.today()
+    estimate = approx.due_counts(today) if _approx(u, args) else None
     base = (db.session.query(Task, Workflow)
             .join(Workflow, Task.workflow_id == Workflow.id))
     if u.role != "admin":
         base = base.filter(Workflow.user_id == u.id)
 
-    due_today_count = (base.filter(Task.due_date == today, Task.status != "done")
-                           .count())
     overdue_q = base.filter(Task.due_date < today, Task.status != "done")
-    overdue_count = overdue_q.count()
-
-    top_n = request.args.get("limit", 10, type=int)
+    if estimate:
+        due_today_count = estimate["due_today"]["estimate"]
+        overdue_count = estimate["overdue"]["estimate"]
+    else:
+        due_today_count = (base.filter(Task.due_date == today, Task.status != "done")
+                               .count())
+        overdue_count = overdue_q.count()
+
+    top_n = args.get("limit", 10, type=int)
     top = (overdue_q.with_entities(
                 Task.id,
                 Task.name,
@@ -138,64 +162,64 @@ def overdue():
             "days_overdue": (today - due).days if due else None,
         })
 
-    return jsonify({
+    return {
         "ok": True,
         "due_today": due_today_count,
         "overdue": overdue_count,
-        "top_overdue": items
-    })
+        "top_overdue": items,
+        **({"approx": True, "bounds": estimate} if estimate else {}),
+    }
 
 @analytics_bp.get("/recent")
 @jwt_required()
 def recent():
-    """Last N log entries across your workflows."""
-    u = _user()
-    if not u:
-        return jsonify({"ok": False, "error": "Unauthorized"}), 401
-
-    limit = request.args.get("limit", 10, type=int)
-    rows = (db.session.query(Log, Task, Workflow)
-            .join(Task, Log.task_id == Task.id)
-            .join(Workflow, Task.workflow_id == Workflow.id))
+    """Log entries across your workflows, newest first (keyset-paginated, limit <= 200)."""
+    try:
+        parse_cursor(request.args, default_limit=10)
+    except CursorError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    return _serve("recent", _recent)
+
+def _recent(u, args):
+    cursor = parse_cursor(args, default_limit=10)
+    rows = Activity.query
     if u.role != "admin":
-        rows = rows.filter(Workflow.user_id == u.id)
-    rows = rows.order_by(Log.id.desc()).limit(limit).all()
+        rows = rows.filter(Activity.owner_user_id == u.id)
+    rows, meta = page(keyset(rows, cursor, Activity.id, Activity.timestamp, Activity.status).all(), cursor, lambda a: a.id)
 
     items = [{
-        "log_id": L.id,
-        "timestamp": (L.timestamp.isoformat() if L.timestamp else None),
-        "event": L.event,
-        "status": L.status,
-        "task": {"id": T.id, "name": T.name},
-        "workflow": {"id": W.id, "name": W.name},
-    } for (L, T, W) in rows]
+        "log_id": a.id,
+        "timestamp": (a.timestamp.isoformat() if a.timestamp else None),
+        "event": a.event,
+        "status": a.status,
+        "task": {"id": a.task_id, "name": a.task_name},
+        "workflow": {"id": a.workflow_id, "name": a.workflow_name},
+    } for a in rows]
 
-    return jsonify({"ok": True, "items": items})
+    return {"ok": True, "items": items, **meta}
 
 @analytics_bp.get("/workflows/top")
 @jwt_required()
 def top_workflows():
     """Top workflows ranked by open (non-done) tasks, plus done counts."""
-    u = _user()
-    if not u:
-        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    return _serve("top_workflows", _top_workflows)
 
-    limit = request.args.get("limit", 5, type=int)
-    open_expr = func.sum(case((Task.status != "done", 1), else_=0))
-    done_expr = func.sum(case((Task.status == "done", 1), else_=0))
+def _top_workflows(u, args):
+    limit = args.get("limit", 5, type=int)
 
+    # Served from maintained counters via (owner_user_id, open_count, workflow_id)
     q = (db.session.query(
             Workflow.id,
             Workflow.name,
-            open_expr.label("open_count"),
-            done_expr.label("done_count"),
+            WorkflowStats.open_count,
+            WorkflowStats.done_count,
          )
-         .outerjoin(Task, Task.workflow_id == Workflow.id))
+         .select_from(WorkflowStats)
+         .join(Workflow, Workflow.id == WorkflowStats.workflow_id))
     if u.role != "admin":
-        q = q.filter(Workflow.user_id == u.id)
+        q = q.filter(WorkflowStats.owner_user_id == u.id)
 
-    rows = (q.group_by(Workflow.id, Workflow.name)
-             .order_by(open_expr.desc(), Workflow.id.asc())
+    rows = (q.order_by(WorkflowStats.open_count.desc(), WorkflowStats.workflow_id.asc())
              .limit(limit)
              .all())
 
@@ -206,4 +230,168 @@ def top_workflows():
         "done": int(done or 0),
     } for (wid, wname, open_, done) in rows]
 
-    return jsonify({"ok": True, "items": items})
+    return {"ok": True, "items": items}
+
+
+@analytics_bp.get("/flow")
+@jwt_required()
+def flow():
+    """Lead/cycle time and time-in-status percentiles + weekly throughput (tasks created in the last N days)."""
+    _, err = _flow_days(request.args)
+    if err:
+        return jsonify({"ok": False, "error": err}), 400
+    return _serve("flow", _flow)
+
+def _flow_days(args):
+    """
+    -> (days, error message). The status history of older tasks has been
+    archived (retention.py), so windows past RETENTION_DAYS are rejected
+    rather than computed from partial timelines.
+    """
+    retention = current_app.config["RETENTION_DAYS"]
+    days = max(1, args.get("days", min(90, retention), type=int))
+    if days > retention:
+        return None, f"days is limited to the {retention}-day log retention window"
+    return days, None
+
+def _flow(u, args):
+    days, _ = _flow_days(args)
+    workflow_id = args.get("workflow_id", type=int)
+    since = date.today() - timedelta(days=days)
+    return {"ok": True, "days": days, **stream_flow_metrics(u, since, workflow_id)}
+
+def _parse_when(value: str, end: bool = False) -> datetime:
+    """ISO date or datetime; a bare date as an end bound means the end of that day."""
+    if len(value) == 10:
+        d = datetime.fromisoformat(value)
+        return d + timedelta(days=1) if end else d
+    return datetime.fromisoformat(value).replace(tzinfo=None)
+
+def _series_params(args):
+    """-> (params, error message)"""
+    metric = args.get("metric", "created")
+    bucket = args.get("bucket", "day")
+    if metric not in METRICS:
+        return None, f"metric must be one of: {', '.join(METRICS)}"
+    if bucket not in BUCKETS:
+        return None, f"bucket must be one of: {', '.join(BUCKETS)}"
+    try:
+        end = _parse_when(args["to"], end=True) if args.get("to") else datetime.utcnow()
+        start = _parse_when(args["from"]) if args.get("from") else end - timedelta(days=30)
+    except ValueError:
+        return None, "from/to must be ISO dates (YYYY-MM-DD) or datetimes"
+    if start >= end:
+        return None, "from must be before to"
+    if bucket_count(start, end, bucket) > MAX_BUCKETS:
+        return None, f"range too large for {bucket} buckets (max {MAX_BUCKETS})"
+    return {"metric": metric, "bucket": bucket, "start": start, "end": end,
+            "workflow_id": args.get("workflow_id", type=int)}, None
+
+@analytics_bp.get("/series")
+@jwt_required()
+def series():
+    """Counts per hour/day/week/month for created|completed|events|errors, zero-filled."""
+    _, err = _series_params(request.args)
+    if err:
+        return jsonify({"ok": False, "error": err}), 400
+    return _serve("series", _series)
+
+def _series(u, args):
+    p, _ = _series_params(args)
+    items = build_series(u, p["metric"], p["bucket"], p["start"], p["end"], p["workflow_id"])
+    return {
+        "ok": True,
+        "metric": p["metric"],
+        "bucket": p["bucket"],
+        "from": p["start"].isoformat(),
+        "to": p["end"].isoformat(),
+        "items": items,
+    }
+
+@analytics_bp.get("/services")
+@jwt_required()
+def services():
+    """
+    Per-service event/error counts, error rate and p50/p95/p99 duration_ms over
+    the last ?hours=24 (1..720, whole hours incl. the current one)[&service=].
+    """
+    return _serve("services", _services)
+
+def _services(u, args):
+    hours = max(1, min(args.get("hours", 24, type=int), 720))
+    since = datetime.utcnow() - timedelta(hours=hours - 1)
+    return {"ok": True, "hours": hours, "items": service_stats(u, since, args.get("service") or None)}
+
+# /dashboard section name -> compute fn (names match the single endpoints so they share cache entries)
+SECTIONS = {
+    "summary": _summary,
+    "daily": _daily,
+    "statuses": _statuses,
+    "overdue": _overdue,
+    "recent": _recent,
+    "top_workflows": _top_workflows,
+    "services": _services,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=current_app.config["ANALYTICS_DASHBOARD_WORKERS"],
+                                           thread_name_prefix="analytics")
+        return _executor
+
+def _run_section(app, name, key, version, scope, args):
+    # Own app context => own scoped session and pooled connection, released on exit
+    with app.app_context():
+        return cached_payload(key, version, lambda: SECTIONS[name](scope, args))
+
+@analytics_bp.get("/dashboard")
+@jwt_required()
+def dashboard():
+    """
+    Several sections in one round trip: ?sections=summary,daily,... (default all).
+    Section args are prefixed with the section name, e.g. daily.days=30&recent.limit=5.
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+
+    raw = request.args.get("sections")
+    names = list(dict.fromkeys(n.strip() for n in raw.split(",") if n.strip())) if raw else list(SECTIONS)
+    unknown = [n for n in names if n not in SECTIONS]
+    if unknown or not names:
+        return jsonify({"ok": False, "error": f"Unknown sections: {', '.join(unknown)}",
+                        "sections": list(SECTIONS)}), 400
+
+    scope = Scope(u.id, u.role)
+    version = current_version(scope)
+    section_args = {
+        n: MultiDict([(k[len(n) + 1:], v) for k, v in request.args.items(multi=True) if k.startswith(n + ".")])
+        for n in names
+    }
+    keys = {n: cache_key(n, scope, section_args[n]) for n in names}
+    failed = []
+
+    def build():
+        app = current_app._get_current_object()
+        pool = _pool()
+        futures = {n: pool.submit(_run_section, app, n, keys[n], version, scope, section_args[n]) for n in names}
+        out = {}
+        for n, fut in futures.items():
+            try:
+                out[n] = fut.result()
+            except Exception:
+                current_app.logger.exception("analytics dashboard section %s failed", n)
+                out[n] = {"ok": False, "error": "Failed to load section"}
+                failed.append(n)
+        return {"ok": True, "sections": out}
+
+    resp = etag_response(etag_for(tuple(keys[n] for n in names), version), build)
+    if failed:
+        # Don't let a partial payload be revalidated as current
+        del resp.headers["ETag"]
+    return resp
@@ -0,0 +1,186 @@
+"""
+Per-service duration percentiles and error rates (service_stats,
+service_duration_bins).
+
+Durations go into a DDSketch with 1% relative accuracy: a value v > 0 lands
+in bin ceil(log_gamma(v)), gamma = (1 + a) / (1 - a), and any quantile read
+back from the bins is within a of the true value. Sketches of the same
+gamma merge by adding bin counts, so each (owner, hour, service) keeps its
+bins as rows maintained with add_counts in the log's own flush, concurrent
+writers included, and reading a window is one SUM ... GROUP BY over its
+hourly buckets instead of a scan of logs.
+
+Only logs that name a service are counted; one counts as an error when its
+status is failed/error or it carries an error_message.
+"""
+import math
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from ..changes import on_change
+from ..extensions import db
+from ..models import Log, ServiceDurationBin, ServiceStats, Task, Workflow
+from ..upsert import add_counts
+
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+LOG_GAMMA = math.log(GAMMA)
+ZERO_BIN = -1
+QUANTILES = (0.5, 0.95, 0.99)
+
+KEY_COLS = ["owner_user_id", "bucket", "service"]
+STAT_COLS = ["event_count", "error_count", "duration_count", "duration_sum"]
+
+
+def bin_of(ms: float) -> int:
+    return ZERO_BIN if ms <= 0 else max(0, math.ceil(math.log(ms) / LOG_GAMMA))
+
+
+def bin_value(i: int) -> float:
+    """Representative value of bin i (relative error <= ALPHA for anything in it)."""
+    return 0.0 if i == ZERO_BIN else 2 * GAMMA ** i / (GAMMA + 1)
+
+
+def quantiles(bins: dict, qs=QUANTILES) -> list:
+    """bins {index: count} -> value at each quantile (None when empty)."""
+    total = sum(bins.values())
+    if not total:
+        return [None for _ in qs]
+    ordered = sorted(bins.items())
+    out = []
+    for q in qs:
+        rank = q * (total - 1)
+        seen = 0
+        for i, n in ordered:
+            seen += n
+            if seen > rank:
+                out.append(round(bin_value(i), 1))
+                break
+    return out
+
+
+def hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def is_error(status, error_message) -> bool:
+    return (status or "").lower() in ("failed", "error") or bool(error_message)
+
+
+def _accumulate(stats, bins, owner, ts, service, status, error_message, duration_ms):
+    key = (owner, hour(ts), service)
+    acc = stats[key]
+    acc[0] += 1
+    acc[1] += int(is_error(status, error_message))
+    if duration_ms is not None:
+        acc[2] += 1
+        acc[3] += int(duration_ms)
+        bins[key + (bin_of(duration_ms),)] += 1
+
+
+def _write(session, stats, bins):
+    add_counts(session, ServiceStats.__table__, KEY_COLS,
+               [dict(zip(KEY_COLS, key), **dict(zip(STAT_COLS, acc))) for key, acc in stats.items()], STAT_COLS)
+    add_counts(session, ServiceDurationBin.__table__, KEY_COLS + ["bin"],
+               [dict(zip(KEY_COLS + ["bin"], key), count=n) for key, n in bins.items()], ["count"])
+
+
+@on_change
+def _maintain_service_sketches(session, changes):
+    logs = [l for l in changes.new_logs if l.service]
+    if not logs:
+        return
+    context = changes.log_context(session)
+    stats, bins = defaultdict(lambda: [0, 0, 0, 0]), Counter()
+    for log in logs:
+        ctx = context.get(log.task_id)
+        if not ctx:
+            continue
+        _accumulate(stats, bins, ctx[0], log.timestamp, log.service, log.status, log.error_message, log.duration_ms)
+    _write(session, stats, bins)
+
+
+def service_stats(scope, since: datetime, service: str | None = None) -> list[dict]:
+    """Merged stats and percentiles per service over buckets >= since."""
+    def scoped(stmt, model):
+        stmt = stmt.where(model.bucket >= hour(since))
+        if scope.role != "admin":
+            stmt = stmt.where(model.owner_user_id == scope.id)
+        if service:
+            stmt = stmt.where(model.service == service)
+        return stmt
+
+    totals = db.session.execute(scoped(
+        select(ServiceStats.service, *(func.sum(getattr(ServiceStats, c)) for c in STAT_COLS))
+        .group_by(ServiceStats.service), ServiceStats)).all()
+    merged = defaultdict(dict)
+    for svc, i, n in db.session.execute(scoped(
+            select(ServiceDurationBin.service, ServiceDurationBin.bin, func.sum(ServiceDurationBin.count))
+            .group_by(ServiceDurationBin.service, ServiceDurationBin.bin), ServiceDurationBin)):
+        merged[svc][i] = int(n)
+
+    items = []
+    for svc, events, errors, d_count, d_sum in totals:
+        events, errors, d_count = int(events or 0), int(errors or 0), int(d_count or 0)
+        p50, p95, p99 = quantiles(merged.get(svc, {}))
+        items.append({
+            "service": svc,
+            "events": events,
+            "errors": errors,
+            "error_rate": round(errors / events, 4) if events else 0.0,
+            "durations": d_count,
+            "avg_ms": round(int(d_sum or 0) / d_count, 1) if d_count else None,
+            "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+        })
+    items.sort(key=lambda it: -it["events"])
+    return items
+
+
+def rebuild_service_stats(days: int = 30, chunk_size: int = 5000, log=print) -> int:
+    """
+    Recompute both tables from the last `days` of logs, in log-id chunks.
+    Returns logs counted.
+
+    The high-water log id is read in the transaction that empties the tables,
+    after the DELETEs have locked them. Logs up to that id were counted by
+    their flush hook before the DELETE and are recounted here. Later logs are
+    counted by their own hook once the DELETE commits, so the rebuild stops
+    at the high-water id.
+    """
+    since = hour(datetime.utcnow() - timedelta(days=days))
+    db.session.execute(delete(ServiceStats.__table__))
+    db.session.execute(delete(ServiceDurationBin.__table__))
+    high_water = db.session.execute(select(func.max(Log.id))).scalar() or 0
+    db.session.commit()
+    last_id, done = 0, 0
+    while True:
+        rows = db.session.execute(
+            select(Log.id, Workflow.user_id, Log.timestamp, Log.service, Log.status, Log.error_message,
+                   Log.duration_ms)
+            .join(Task, Log.task_id == Task.id)
+            .join(Workflow, Task.workflow_id == Workflow.id)
+            .where(Log.id > last_id, Log.id <= high_water, Log.service.isnot(None), Log.service != "", Log.timestamp >= since)
+            .order_by(Log.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        stats, bins = defaultdict(lambda: [0, 0, 0, 0]), Counter()
+        for _, owner, ts, svc, status, err, dur in rows:
+            _accumulate(stats, bins, owner, ts, svc, status, err, dur)
+        _write(db.session, stats, bins)
+        db.session.commit()
+        last_id = rows[-1][0]
+        done += len(rows)
+        log(f"  counted logs up to #{last_id} ({done} so far)")
+    return done
+
+
+def prune_service_stats(days: int) -> int:
+    """Drop buckets older than `days`; returns the number of stat rows removed."""
+    cutoff = hour(datetime.utcnow() - timedelta(days=days))
+    db.session.execute(delete(ServiceDurationBin.__table__).where(ServiceDurationBin.bucket < cutoff))
+    n = db.session.execute(delete(ServiceStats.__table__).where(ServiceStats.bucket < cutoff)).rowcount
+    db.session.commit()
+    return n
@@ -0,0 +1,153 @@
+"""
+Online anomaly detection for API 5xx bursts.
+
+Each (method, route) series keeps, in one api_error_series row, the count of
+its open ANOMALY_BUCKET_SECONDS bucket and an exponentially weighted mean and
+variance of the counts of closed buckets (quiet buckets count as zeros).
+Every recorded 5xx rolls the series forward, bumps the open bucket and
+compares it with the baseline (an error from a bucket that is already closed
+counts in the open one):
+
+    z = (count - mean) / max(std, 1)
+
+A bucket with at least ANOMALY_MIN_COUNT errors and z >= ANOMALY_Z is
+recorded once as an ApiAnomaly and, with ANOMALY_SLACK_ALERTS on, posted to
+every admin's Slack webhook. State is O(1) per series and shared by all
+workers through the row lock; the api_events table is never read back.
+Events arrive in batches from the audit writer (see audit.py).
+"""
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from .extensions import db
+from .models import ApiAnomaly, ApiErrorSeries, Integration, User
+from .upsert import add_counts
+
+# After this many quiet buckets the baseline is ~0 for any usable alpha
+MAX_ZERO_STEPS = 500
+
+
+def _ewma(mean: float, var: float, x: float, alpha: float) -> tuple[float, float]:
+    diff = x - mean
+    incr = alpha * diff
+    return mean + incr, (1 - alpha) * (var + diff * incr)
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _bucket(now: datetime, size: int) -> datetime:
+    """Start of the (naive UTC) bucket containing now."""
+    seconds = int((now - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % size)
+
+
+def rolled(series: ApiErrorSeries, bucket: datetime, size: int, alpha: float) -> tuple[float, float, int, int]:
+    """-> (mean, var, open bucket count, buckets_seen) with every bucket before `bucket` closed."""
+    mean, var, seen = series.mean, series.var, series.buckets_seen
+    if series.bucket_start is None:
+        return mean, var, 0, seen
+    if bucket <= series.bucket_start:
+        return mean, var, series.bucket_count, seen
+    mean, var = _ewma(mean, var, series.bucket_count, alpha)
+    quiet = int((bucket - series.bucket_start).total_seconds()) // size - 1
+    if quiet > MAX_ZERO_STEPS:
+        mean, var = 0.0, 0.0
+    else:
+        for _ in range(quiet):
+            mean, var = _ewma(mean, var, 0, alpha)
+    return mean, var, 0, seen + 1 + quiet
+
+
+def zscore(count: int, mean: float, var: float) -> tuple[float, float]:
+    std = max(math.sqrt(max(var, 0.0)), 1.0)
+    return (count - mean) / std, std
+
+
+def observe(session, method: str, route: str, now: datetime, cfg, n: int = 1) -> ApiAnomaly | None:
+    """Count n errors at `now` for the series (row-locked); returns a new ApiAnomaly if that makes one."""
+    size, alpha = cfg["ANOMALY_BUCKET_SECONDS"], cfg["ANOMALY_ALPHA"]
+    table = ApiErrorSeries.__table__
+    # Create the series row if needed without racing other workers, then lock it
+    add_counts(session, table, ["method", "route"], [{"method": method, "route": route, "bucket_count": 0}],
+               ["bucket_count"])
+    series = session.execute(
+        select(ApiErrorSeries).where(ApiErrorSeries.method == method, ApiErrorSeries.route == route)
+        .with_for_update()
+    ).scalar_one()
+
+    bucket = _bucket(now, size)
+    if series.bucket_start is not None and bucket < series.bucket_start:
+        # Late errors (workers flush their batches out of time order) count in the open
+        # bucket: the series never moves back to a bucket it has already closed
+        bucket = series.bucket_start
+    mean, var, count, seen = rolled(series, bucket, size, alpha)
+    count += n
+    series.mean, series.var, series.buckets_seen = mean, var, seen
+    series.bucket_start, series.bucket_count = bucket, count
+
+    z, std = zscore(count, mean, var)
+    if count < cfg["ANOMALY_MIN_COUNT"] or z < cfg["ANOMALY_Z"] or series.alerted_bucket == bucket:
+        return None
+    series.alerted_bucket = bucket
+    anomaly = ApiAnomaly(method=method, route=route, bucket_start=bucket, count=count, expected=mean, std=std,
+                         zscore=z)
+    session.add(anomaly)
+    return anomaly
+
+
+def record_api_errors(session, events: list, cfg) -> list[ApiAnomaly]:
+    """
+    Feed (method, route, when) 5xx events into their series, one observe()
+    per series and bucket, in time order. The caller commits.
+    """
+    grouped = Counter((method, route, _bucket(when, cfg["ANOMALY_BUCKET_SECONDS"])) for method, route, when in events)
+    anomalies = []
+    for (method, route, bucket), n in sorted(grouped.items(), key=lambda kv: kv[0][2]):
+        anomaly = observe(session, method, route, bucket, cfg, n)
+        if anomaly is not None:
+            anomalies.append(anomaly)
+    return anomalies
+
+
+def alert_text(anomaly: ApiAnomaly, cfg) -> str:
+    return (f":rotating_light: {anomaly.count} x 5xx on {anomaly.method} {anomaly.route} in "
+            f"{cfg['ANOMALY_BUCKET_SECONDS']}s (baseline {anomaly.expected:.1f} ± {anomaly.std:.1f})")
+
+
+def notify_anomalies(app, texts: list[str]) -> None:
+    """Post alerts to every admin with a Slack webhook, if ANOMALY_SLACK_ALERTS is on."""
+    if not texts or not app.config["ANOMALY_SLACK_ALERTS"]:
+        return
+    from .integrations.slack import send_slack
+    with app.app_context():
+        admins = db.session.execute(
+            select(User.id).join(Integration, Integration.user_id == User.id)
+            .where(User.role == "admin", Integration.type == "slack")
+        ).scalars().all()
+        for uid in admins:
+            for text in texts:
+                try:
+                    send_slack(uid, text)
+                except Exception:
+                    app.logger.exception("Slack anomaly alert to user %s failed", uid)
+
+
+def current_series(cfg, limit: int = 20) -> list[dict]:
+    """Series ordered by how unusual their open bucket is right now (read-only)."""
+    size, alpha = cfg["ANOMALY_BUCKET_SECONDS"], cfg["ANOMALY_ALPHA"]
+    bucket = _bucket(datetime.utcnow(), size)
+    items = []
+    for s in ApiErrorSeries.query.all():
+        mean, var, count, seen = rolled(s, bucket, size, alpha)
+        z, std = zscore(count, mean, var)
+        items.append({
+            "method": s.method, "route": s.route, "bucket_start": bucket.isoformat(),
+            "count": count, "expected": round(mean, 2), "std": round(std, 2), "zscore": round(z, 1),
+            "buckets_seen": seen,
+        })
+    items.sort(key=lambda it: (-it["zscore"], -it["count"]))
+    return items[:limit]
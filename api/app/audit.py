@@ -0,0 +1,176 @@
+"""
+Buffered background writer for audit rows (api_events, login_attempts).
+
+Requests hand rows to a bounded in-process queue instead of committing them
+themselves; one daemon thread per process drains it and bulk-inserts a batch
+whenever AUDIT_BATCH_SIZE rows are waiting or AUDIT_FLUSH_INTERVAL seconds
+have passed since the first one. A full queue blocks the producer for at
+most AUDIT_ENQUEUE_TIMEOUT_MS and then drops the row and counts it, so an
+incident or a credential-stuffing wave cannot turn audit logging into extra
+load on the requests that are already struggling. Whatever is queued is
+flushed at interpreter exit (gunicorn's graceful worker shutdown included).
+
+The thread starts lazily on the first row, so it is created in the worker
+process even when the app is preloaded before forking. AUDIT_ASYNC=false
+writes each row synchronously through the same code path (tests, scripts).
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import insert
+
+from .anomaly import alert_text, notify_anomalies, record_api_errors
+from .extensions import db
+from .models import ApiEvent, LoginAttempt
+
+TABLES = {
+    "api_event": ApiEvent.__table__,
+    "login_attempt": LoginAttempt.__table__,
+}
+
+
+class AuditWriter:
+    def __init__(self, app):
+        cfg = app.config
+        self.app = app
+        self.enabled_async = cfg["AUDIT_ASYNC"]
+        self.batch_size = cfg["AUDIT_BATCH_SIZE"]
+        self.interval = cfg["AUDIT_FLUSH_INTERVAL"]
+        self.put_timeout = cfg["AUDIT_ENQUEUE_TIMEOUT_MS"] / 1000.0
+        self.queue = queue.Queue(maxsize=cfg["AUDIT_QUEUE_MAX"])
+        self.stats = Counter()  # written, dropped, failed, batches
+        self._stats_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        atexit.register(self.close)
+
+    # ---------- producers ----------
+
+    def submit(self, kind: str, row: dict) -> bool:
+        """Queue one row for TABLES[kind]; False if it was dropped."""
+        if not self.enabled_async:
+            self._write([(kind, row)])
+            return True
+        self._ensure_thread()
+        try:
+            self.queue.put((kind, row), timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+    # ---------- consumer ----------
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self, first_timeout: float) -> list:
+        try:
+            batch = [self.queue.get(timeout=first_timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch(first_timeout=0.5)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: list) -> None:
+        rows = {kind: [] for kind in TABLES}
+        api_errors = []
+        for kind, row in batch:
+            row = dict(row)
+            route = row.pop("route", None)
+            rows[kind].append(row)
+            if kind == "api_event" and route:
+                api_errors.append((row["method"], route, row["created_at"]))
+
+        with self._write_lock, self.app.app_context():
+            try:
+                for kind, items in rows.items():
+                    if items:
+                        db.session.execute(insert(TABLES[kind]), items)
+                anomalies = record_api_errors(db.session, api_errors, self.app.config) if api_errors else []
+                alerts = [alert_text(a, self.app.config) for a in anomalies]
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self._count("failed", len(batch))
+                self.app.logger.exception("Audit batch of %s rows failed", len(batch))
+                return
+            finally:
+                db.session.remove()
+        self._count("written", len(batch))
+        self._count("batches")
+        if alerts:
+            notify_anomalies(self.app, alerts)
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # ---------- lifecycle ----------
+
+    def flush(self) -> None:
+        """Write everything queued so far in the calling thread."""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {"queued": self.queue.qsize(), "capacity": self.queue.maxsize,
+                **{k: stats.get(k, 0) for k in ("written", "dropped", "failed", "batches")}}
+
+
+def init_app(app) -> AuditWriter:
+    writer = AuditWriter(app)
+    app.extensions["audit"] = writer
+    return writer
+
+
+def record_api_event(app, **row) -> bool:
+    return app.extensions["audit"].submit("api_event", row)
+
+
+def record_login_attempt(app, **row) -> bool:
+    return app.extensions["audit"].submit("login_attempt", row)
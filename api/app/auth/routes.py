@@ -1,4 +1,6 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
@@ -9,6 +11,7 @@ from flask_jwt_extended import (
     get_jwt_identity,
 )
 from sqlalchemy import func
+from ..audit import record_login_attempt
 from ..extensions import db
 from ..models import User, LoginAttempt
 from werkzeug.security import generate_password_hash
@@ -73,23 +76,17 @@ def login():
     user = User.query.filter(func.lower(User.email) == email).first()
 
     if not user or not user.check_password(password):
-        # log failed attempt
-        try:
-          db.session.add(LoginAttempt(email=email or "unknown", success=False, ip=ip, user_agent=ua))
-          db.session.commit()
-        except Exception:
-          db.session.rollback()
+        # log failed attempt (queued; written in batches by the audit writer)
+        record_login_attempt(current_app, email=email or "unknown", success=False, ip=ip, user_agent=ua,
+                             timestamp=datetime.utcnow())
         return _json_error("Invalid credentials", 401)
 
     # NOTE: identity must be a string to satisfy JWT "sub" requirements
     access = create_access_token(identity=str(user.id), additional_claims={"role": user.role})
     refresh = create_refresh_token(identity=str(user.id))
 
-    try:
-      db.session.add(LoginAttempt(email=email, success=True, ip=ip, user_agent=ua))
-      db.session.commit()
-    except Exception:
-      db.session.rollback()
+    record_login_attempt(current_app, email=email, success=True, ip=ip, user_agent=ua,
+                         timestamp=datetime.utcnow())
 
     resp = jsonify({"ok": True, "user": user.to_public()})
     set_access_cookies(resp, access)     # sets HttpOnly access cookie (+ csrf cookie if enabled)
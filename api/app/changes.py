@@ -0,0 +1,176 @@
+"""
+Flush hooks that keep derived tables in step with task/workflow/log writes.
+
+Handlers registered with @on_change run inside the flush that wrote the
+rows, so anything they write commits or rolls back together with the change.
+Paths that bypass the ORM unit of work can build a ChangeSet themselves and
+call dispatch().
+"""
+from collections import namedtuple
+
+from sqlalchemy import event, inspect, select
+
+from .extensions import db
+from .models import Task, Workflow, Log
+
+TaskState = namedtuple(
+    "TaskState",
+    "task_id workflow_id owner_user_id name status assigned_to due_date day",
+)
+
+
+class ChangeSet:
+    def __init__(self):
+        self.tasks: list[tuple[TaskState | None, TaskState | None]] = []  # (before, after)
+        self.new_workflows: list[tuple[int, int]] = []  # (workflow_id, owner)
+        self.moved_workflows: list[tuple[int, int, int]] = []  # (workflow_id, old_owner, new_owner)
+        self.renamed_workflows: list[tuple[int, int, str]] = []  # (workflow_id, owner, new_name)
+        self.deleted_workflows: dict[int, int] = {}  # workflow_id -> owner
+        self.new_logs: list[Log] = []
+        self.deleted_logs: list[tuple[int, int]] = []  # (log_id, task_id)
+        self._log_context = None
+
+    def __bool__(self):
+        return bool(self.tasks or self.new_workflows or self.moved_workflows or self.renamed_workflows
+                    or self.deleted_workflows or self.new_logs or self.deleted_logs)
+
+    def log_context(self, session) -> dict:
+        """
+        task_id -> (owner_user_id, workflow_id, workflow_name, task_name) for
+        the tasks referenced by new_logs; loaded once per flush and shared.
+        """
+        if self._log_context is None:
+            task_ids = {l.task_id for l in self.new_logs}
+            self._log_context = {}
+            if task_ids:
+                rows = session.execute(
+                    select(Task.id, Workflow.user_id, Workflow.id, Workflow.name, Task.name)
+                    .join(Workflow, Task.workflow_id == Workflow.id)
+                    .where(Task.id.in_(task_ids))
+                )
+                self._log_context = {tid: tuple(rest) for tid, *rest in rows}
+        return self._log_context
+
+    def owners(self, session) -> set:
+        """Every owner whose tasks, workflows or task logs changed in this flush."""
+        owners = set()
+        for before, after in self.tasks:
+            owners.update(s.owner_user_id for s in (before, after) if s)
+        owners.update(owner for _, owner in self.new_workflows)
+        for _, old_owner, new_owner in self.moved_workflows:
+            owners.update((old_owner, new_owner))
+        owners.update(owner for _, owner, _ in self.renamed_workflows)
+        owners.update(self.deleted_workflows.values())
+        if self.new_logs:
+            owners.update(ctx[0] for ctx in self.log_context(session).values())
+        owners.discard(None)
+        return owners
+
+
+_handlers = []
+
+
+def on_change(fn):
+    """Register fn(session, changeset) to run after every flush with relevant changes."""
+    _handlers.append(fn)
+    return fn
+
+
+def dispatch(session, changes: ChangeSet) -> None:
+    if not changes:
+        return
+    for fn in _handlers:
+        fn(session, changes)
+
+
+# ---------- collection ----------
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Assigning to an attribute of an expired instance (e.g. right after a commit)
+# normally skips loading the old value; active_history makes _before() see it.
+for _attr in (Task.workflow_id, Task.name, Task.status, Task.assigned_to, Task.due_date, Task.created_at,
+              Workflow.user_id, Workflow.name):
+    event.listen(_attr, "set", _load_old_value, active_history=True)
+
+
+def _before(obj, attr: str):
+    hist = inspect(obj).attrs[attr].history
+    if hist.deleted:
+        return hist.deleted[0]
+    return getattr(obj, attr)
+
+
+def _state(task: Task, owners: dict, before: bool) -> TaskState:
+    get = (lambda a: _before(task, a)) if before else (lambda a: getattr(task, a))
+    created_at = get("created_at")
+    workflow_id = get("workflow_id")
+    return TaskState(
+        task_id=task.id,
+        workflow_id=workflow_id,
+        owner_user_id=owners.get(workflow_id),
+        name=get("name"),
+        status=get("status"),
+        assigned_to=get("assigned_to"),
+        due_date=get("due_date"),
+        day=created_at.date() if created_at else None,
+    )
+
+
+def _owner_map(session, workflow_ids: set) -> dict:
+    owners = {}
+    mapper = inspect(Workflow)
+    for wid in workflow_ids:
+        obj = session.identity_map.get(mapper.identity_key_from_primary_key((wid,)))
+        if obj is not None:
+            owners[wid] = obj.user_id
+    missing = workflow_ids - owners.keys()
+    if missing:
+        rows = session.execute(select(Workflow.id, Workflow.user_id).where(Workflow.id.in_(missing)))
+        owners.update({wid: uid for wid, uid in rows})
+    return owners
+
+
+def collect(session) -> ChangeSet:
+    changes = ChangeSet()
+
+    new_tasks = [o for o in session.new if isinstance(o, Task)]
+    dirty_tasks = [o for o in session.dirty if isinstance(o, Task) and session.is_modified(o)]
+    deleted_tasks = [o for o in session.deleted if isinstance(o, Task)]
+
+    for wf in session.dirty:
+        if not isinstance(wf, Workflow) or not session.is_modified(wf):
+            continue
+        old_owner = _before(wf, "user_id")
+        if old_owner != wf.user_id:
+            changes.moved_workflows.append((wf.id, old_owner, wf.user_id))
+        if _before(wf, "name") != wf.name:
+            changes.renamed_workflows.append((wf.id, wf.user_id, wf.name))
+    changes.new_workflows = [(o.id, o.user_id) for o in session.new if isinstance(o, Workflow)]
+    changes.deleted_workflows = {o.id: o.user_id for o in session.deleted if isinstance(o, Workflow)}
+    changes.new_logs = [o for o in session.new if isinstance(o, Log)]
+    changes.deleted_logs = [(o.id, o.task_id) for o in session.deleted if isinstance(o, Log)]
+
+    if new_tasks or dirty_tasks or deleted_tasks:
+        wf_ids = {t.workflow_id for t in new_tasks + dirty_tasks + deleted_tasks}
+        wf_ids |= {_before(t, "workflow_id") for t in dirty_tasks + deleted_tasks}
+        owners = _owner_map(session, wf_ids)
+
+        for t in new_tasks:
+            changes.tasks.append((None, _state(t, owners, before=False)))
+        for t in dirty_tasks:
+            old, new = _state(t, owners, before=True), _state(t, owners, before=False)
+            if old != new:
+                changes.tasks.append((old, new))
+        for t in deleted_tasks:
+            changes.tasks.append((_state(t, owners, before=True), None))
+
+    return changes
+
+
+@event.listens_for(db.session, "after_flush")
+def _after_flush(session, flush_context):
+    if _handlers:
+        dispatch(session, collect(session))
@@ -17,3 +17,54 @@ class Config:
 
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:5173")
+
+    # Analytics response cache (per process); entries are also invalidated by owner version bumps
+    ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "300"))
+    ANALYTICS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "2048"))
+    ANALYTICS_DASHBOARD_WORKERS = int(os.getenv("ANALYTICS_DASHBOARD_WORKERS", "6"))
+
+    # Report snapshots: on-demand refresh throttling and retention
+    REPORT_REFRESH_MIN_INTERVAL = int(os.getenv("REPORT_REFRESH_MIN_INTERVAL", "300"))  # seconds per report
+    REPORT_MAX_CONCURRENT = int(os.getenv("REPORT_MAX_CONCURRENT", "2"))  # generations per process
+    REPORT_SNAPSHOTS_KEEP = int(os.getenv("REPORT_SNAPSHOTS_KEEP", "30"))  # per report
+
+    # POST /api/logs/record/batch
+    LOG_BATCH_MAX_ITEMS = int(os.getenv("LOG_BATCH_MAX_ITEMS", "10000"))
+    LOG_BATCH_CHUNK = int(os.getenv("LOG_BATCH_CHUNK", "500"))  # events per authorization query + commit
+    # POST /api/tasks/bulk (one transaction per request)
+    TASK_BULK_MAX_ITEMS = int(os.getenv("TASK_BULK_MAX_ITEMS", "1000"))
+    # POST /api/tasks/import and app.scripts.import_tasks
+    TASK_IMPORT_CHUNK = int(os.getenv("TASK_IMPORT_CHUNK", "1000"))  # rows per INSERT + commit
+    TASK_IMPORT_MAX_ROWS = int(os.getenv("TASK_IMPORT_MAX_ROWS", "200000"))  # per request; the CLI has no cap
+
+    # Retention: rows older than this move to gzip JSONL archives (python -m app.scripts.archive_old_rows)
+    RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "30"))
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "/var/lib/iwas/archive")
+    # Delta-sync clients older than this must resync from a full snapshot
+    TASK_TOMBSTONE_DAYS = int(os.getenv("TASK_TOMBSTONE_DAYS", "30"))
+
+    # 5xx burst detection per (method, route); see anomaly.py
+    ANOMALY_BUCKET_SECONDS = int(os.getenv("ANOMALY_BUCKET_SECONDS", "60"))
+    ANOMALY_ALPHA = float(os.getenv("ANOMALY_ALPHA", "0.1"))  # EWMA weight of the newest bucket
+    ANOMALY_Z = float(os.getenv("ANOMALY_Z", "4"))
+    ANOMALY_MIN_COUNT = int(os.getenv("ANOMALY_MIN_COUNT", "5"))  # errors in a bucket before it can alert
+    ANOMALY_SLACK_ALERTS = os.getenv("ANOMALY_SLACK_ALERTS", "false").lower() in ("1", "true", "yes")
+
+    # Audit rows (api_events, login_attempts) are queued and bulk-written by a background thread
+    AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "true").lower() in ("1", "true", "yes")
+    AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))  # rows beyond this are dropped (and counted)
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))  # seconds
+    AUDIT_ENQUEUE_TIMEOUT_MS = int(os.getenv("AUDIT_ENQUEUE_TIMEOUT_MS", "5"))
+
+    # Notifications SSE stream (per worker process)
+    SSE_POLL_SECONDS = float(os.getenv("SSE_POLL_SECONDS", "2"))  # tail interval for writes from other workers
+    SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    SSE_MAX_STREAM_SECONDS = int(os.getenv("SSE_MAX_STREAM_SECONDS", "600"))  # < access token lifetime
+    SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+    SSE_QUEUE_MAX = int(os.getenv("SSE_QUEUE_MAX", "100"))  # per connection, then re-read from the table
+    SSE_CATCHUP_MAX = int(os.getenv("SSE_CATCHUP_MAX", "1000"))
+    # Ids below the newest one seen that are re-checked for rows committed out of id order
+    SSE_RESCAN_IDS = int(os.getenv("SSE_RESCAN_IDS", "2000"))
+    SSE_RESCAN_SECONDS = int(os.getenv("SSE_RESCAN_SECONDS", "30"))  # on resume, re-check rows this recent
+    SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "5000"))
@@ -0,0 +1,188 @@
+"""
+Streaming exports: GET /api/exports/<dataset>?format=csv|ndjson[&gzip=1]
+
+Rows are read with yield_per (a server-side cursor on MySQL) and written to
+the response one chunk at a time, so memory stays flat regardless of the
+export size. The CSV header goes out before the query runs, and each gzip
+chunk is sync-flushed so clients see bytes immediately.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import or_, select
+
+from ..extensions import db
+from ..analytics.counters import overdue_count
+from ..models import User, Task, Workflow, Log, ApiEvent, TaskDailyRollup, WorkflowStats
+
+exports_bp = Blueprint("exports", __name__)
+
+CHUNK_ROWS = 1000
+
+def _user():
+    try:
+        return User.query.get(int(get_jwt_identity()))
+    except Exception:
+        return None
+
+def _when(value: str, end: bool = False):
+    """ISO date/datetime filter bound; a bare date as an end bound covers that whole day."""
+    if not value:
+        return None
+    ts = datetime.fromisoformat(value)
+    return ts + timedelta(days=1) if end and len(value) == 10 else ts
+
+def _range(stmt, col, args):
+    since, until = _when(args.get("since")), _when(args.get("until"), end=True)
+    if since:
+        stmt = stmt.where(col >= since)
+    if until:
+        stmt = stmt.where(col < until)
+    return stmt
+
+# ---------- datasets: (u, args) -> (columns, select) ----------
+
+def _tasks(u, args):
+    cols = ["id", "workflow_id", "workflow_name", "name", "status", "assigned_to", "due_date", "created_at"]
+    stmt = (select(Task.id, Workflow.id, Workflow.name, Task.name, Task.status,
+                   Task.assigned_to, Task.due_date, Task.created_at)
+            .join(Workflow, Task.workflow_id == Workflow.id)
+            .order_by(Task.id))
+    if u.role != "admin":
+        stmt = stmt.where(Workflow.user_id == u.id)
+    if args.get("workflow_id", type=int):
+        stmt = stmt.where(Task.workflow_id == args.get("workflow_id", type=int))
+    if args.get("status"):
+        stmt = stmt.where(Task.status == args["status"])
+    if args.get("assigned_to"):
+        stmt = stmt.where(Task.assigned_to.contains(args["assigned_to"], autoescape=True))
+    if args.get("q"):
+        stmt = stmt.where(or_(Task.name.contains(args["q"], autoescape=True),
+                              Workflow.name.contains(args["q"], autoescape=True)))
+    return cols, _range(stmt, Task.created_at, args)
+
+def _logs(u, args):
+    cols = ["id", "timestamp", "task_id", "task_name", "workflow_id", "workflow_name", "actor_id",
+            "event", "status", "duration_ms", "service", "error_message"]
+    stmt = (select(Log.id, Log.timestamp, Task.id, Task.name, Workflow.id, Workflow.name, Log.actor_id,
+                   Log.event, Log.status, Log.duration_ms, Log.service, Log.error_message)
+            .join(Task, Log.task_id == Task.id)
+            .join(Workflow, Task.workflow_id == Workflow.id)
+            .order_by(Log.id))
+    if u.role != "admin":
+        stmt = stmt.where(Workflow.user_id == u.id)
+    if args.get("workflow_id", type=int):
+        stmt = stmt.where(Task.workflow_id == args.get("workflow_id", type=int))
+    if args.get("task_id", type=int):
+        stmt = stmt.where(Log.task_id == args.get("task_id", type=int))
+    if args.get("status"):
+        stmt = stmt.where(Log.status == args["status"])
+    return cols, _range(stmt, Log.timestamp, args)
+
+def _api_events(u, args):
+    cols = ["id", "created_at", "method", "path", "status_code", "user_id", "error_message"]
+    stmt = (select(ApiEvent.id, ApiEvent.created_at, ApiEvent.method, ApiEvent.path,
+                   ApiEvent.status_code, ApiEvent.user_id, ApiEvent.error_message)
+            .order_by(ApiEvent.id))
+    if u.role != "admin":
+        stmt = stmt.where(ApiEvent.user_id == u.id)
+    return cols, _range(stmt, ApiEvent.created_at, args)
+
+def _daily_breakdown(u, args):
+    cols = ["day", "workflow_id", "workflow_name", "status", "tasks"]
+    stmt = (select(TaskDailyRollup.day, Workflow.id, Workflow.name, TaskDailyRollup.status,
+                   TaskDailyRollup.task_count)
+            .join(Workflow, Workflow.id == TaskDailyRollup.workflow_id)
+            .where(TaskDailyRollup.task_count > 0)
+            .order_by(TaskDailyRollup.day, TaskDailyRollup.workflow_id, TaskDailyRollup.status))
+    if u.role != "admin":
+        stmt = stmt.where(TaskDailyRollup.owner_user_id == u.id)
+    return cols, _range(stmt, TaskDailyRollup.day, args)
+
+def _workflow_breakdown(u, args):
+    cols = ["workflow_id", "workflow_name", "owner_user_id", "total", "open", "done", "overdue"]
+    stmt = (select(Workflow.id, Workflow.name, WorkflowStats.owner_user_id, WorkflowStats.total_count,
+                   WorkflowStats.open_count, WorkflowStats.done_count, overdue_count(WorkflowStats.workflow_id))
+            .join(Workflow, Workflow.id == WorkflowStats.workflow_id)
+            .order_by(WorkflowStats.workflow_id))
+    if u.role != "admin":
+        stmt = stmt.where(WorkflowStats.owner_user_id == u.id)
+    return cols, stmt
+
+DATASETS = {
+    "tasks": _tasks,
+    "logs": _logs,
+    "api_events": _api_events,
+    "analytics_daily": _daily_breakdown,
+    "analytics_workflows": _workflow_breakdown,
+}
+
+# ---------- encoding ----------
+
+def _cell(v):
+    return v.isoformat() if isinstance(v, (date, datetime)) else v
+
+def _encode_csv(cols, rows) -> str:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    if cols:
+        w.writerow(cols)
+    w.writerows([[_cell(v) for v in r] for r in rows])
+    return buf.getvalue()
+
+def _encode_ndjson(cols, rows) -> str:
+    return "".join(json.dumps(dict(zip(cols, map(_cell, r))), default=str) + "\n" for r in rows)
+
+def _stream(cols, stmt, fmt: str, gz: bool):
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    z = zlib.compressobj(6, zlib.DEFLATED, 31) if gz else None
+
+    def out(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return z.compress(data) + z.flush(zlib.Z_SYNC_FLUSH) if z else data
+
+    if fmt == "csv":
+        yield out(encode(cols, []))
+    result = db.session.execute(stmt.execution_options(yield_per=CHUNK_ROWS))
+    try:
+        for part in result.partitions():
+            yield out(encode(None if fmt == "csv" else cols, part))
+    finally:
+        result.close()
+    if z:
+        yield z.flush()
+
+@exports_bp.get("/<dataset>")
+@jwt_required()
+def export(dataset):
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    build = DATASETS.get(dataset)
+    if not build:
+        return jsonify({"ok": False, "error": f"Unknown dataset. Use one of: {', '.join(DATASETS)}"}), 404
+
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"ok": False, "error": "format must be csv or ndjson"}), 400
+    gz = request.args.get("gzip", "").lower() in ("1", "true", "yes")
+    try:
+        cols, stmt = build(u, request.args)
+    except ValueError:
+        return jsonify({"ok": False, "error": "since/until must be ISO dates or datetimes"}), 400
+
+    filename = f"iwas-{dataset}-{date.today().isoformat()}.{fmt}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",  # let nginx pass chunks straight through
+    }
+    if gz:
+        headers["Content-Encoding"] = "gzip"
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(stream_with_context(_stream(cols, stmt, fmt, gz)), mimetype=mimetype, headers=headers)
@@ -1,13 +1,6 @@
-import os, json, requests
-from cryptography.fernet import Fernet
+import json, requests
 from ..extensions import db
-from ..models import Integration
-
-def _fernet():
-    key = os.environ.get("INTEGRATION_KEY")
-    if not key:
-        raise RuntimeError("INTEGRATION_KEY env var is required")
-    return Fernet(key.encode())
+from ..models import Integration, _fernet
 
 def save_slack_webhook(user_id: int, webhook_url: str) -> int:
     creds = {"webhook_url": webhook_url}
@@ -1,8 +1,17 @@
-from flask import Blueprint, jsonify, request
+import json
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
 from ..extensions import db
-from ..models import User, Log, Task, Workflow, ApiEvent
+from ..models import User, Log, Task, Workflow, ApiEvent, Activity, ApiAnomaly
+from ..pagination import CursorError, parse_cursor, keyset, page
+from .. import activity  # noqa: F401  (registers the activity feed maintenance hook)
+from ..retention import TABLES as ARCHIVED_TABLES, read_archive
+from ..search import SearchError, search, terms as search_terms
+from ..anomaly import current_series
 
 logs_bp = Blueprint("logs", __name__)
 
@@ -12,39 +21,55 @@ def _user():
     except Exception:
         return None
 
+def _feed_item(a: Activity) -> dict:
+    return {
+        "id": a.id,
+        "timestamp": a.timestamp.isoformat(sep=" ", timespec="seconds") if a.timestamp else None,
+        "event": a.event,
+        "status": a.status,
+        "duration_ms": a.duration_ms,
+        "service": a.service,
+        "error_message": a.error_message,
+        "task": {"id": a.task_id, "name": a.task_name},
+        "workflow": {"id": a.workflow_id, "name": a.workflow_name, "user_id": a.owner_user_id},
+        "actor": {"id": a.actor_id, "name": a.actor_name, "email": a.actor_email} if a.actor_name else None,
+    }
+
 @logs_bp.get("/recent")
 @jwt_required()
 def recent():
+    """
+    Task logs, newest first. Keyset-paginated: limit (1..500, default 100),
+    before_id / after_id cursors, since/until and status filters.
+    """
     u = _user()
     if not u:
         return jsonify({"ok": False, "error": "Unauthorized"}), 401
-    limit = max(1, min(int(request.args.get("limit", 100)), 500))
+    try:
+        cursor = parse_cursor(request.args, default_limit=100, max_limit=500)
+    except CursorError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
 
-    q = (db.session.query(Log, Task, Workflow, User)
-         .join(Task, Log.task_id == Task.id)
-         .join(Workflow, Task.workflow_id == Workflow.id)
-         .outerjoin(User, Log.actor_id == User.id))
+    q = Activity.query
     if u.role != "admin":
-        q = q.filter(Workflow.user_id == u.id)
-    q = q.order_by(Log.id.desc()).limit(limit)
+        q = q.filter(Activity.owner_user_id == u.id)
+    rows, meta = page(keyset(q, cursor, Activity.id, Activity.timestamp, Activity.status).all(), cursor, lambda a: a.id)
 
-    items = []
-    for log, task, wf, actor in q.all():
-        items.append({
-            "id": log.id,
-            "timestamp": log.timestamp.isoformat(sep=" ", timespec="seconds") if log.timestamp else None,
-            "event": log.event,
-            "status": log.status,
-            "duration_ms": log.duration_ms,
-            "service": log.service,
-            "error_message": log.error_message,
-            "task": {"id": task.id, "name": task.name},
-            "workflow": {"id": wf.id, "name": wf.name, "user_id": wf.user_id},
-            "actor": {"id": actor.id, "name": actor.name, "email": actor.email} if actor else None,
-        })
-    return jsonify({"ok": True, "items": items})
+    items = [_feed_item(a) for a in rows]
+    return jsonify({"ok": True, "items": items, **meta})
 
 
+def _new_log(u, task_id: int, body: dict) -> Log:
+    return Log(
+        task_id=task_id,
+        actor_id=u.id,
+        event=body.get("event") or "failure",
+        status=body.get("status") or "failed",
+        duration_ms=body.get("duration_ms"),
+        service=body.get("service"),
+        error_message=body.get("error_message"),
+    )
+
 @logs_bp.post("/record")
 @jwt_required()
 def record():
@@ -67,20 +92,262 @@ def record():
     if u.role != "admin" and task.workflow.user_id != u.id:
         return jsonify({"ok": False, "error": "Forbidden"}), 403
 
-    log = Log(
-        task_id=task.id,
-        actor_id=u.id,
-        event=body.get("event") or "failure",
-        status=body.get("status") or "failed",
-        duration_ms=body.get("duration_ms"),
-        service=body.get("service"),
-        error_message=body.get("error_message"),
-    )
+    log = _new_log(u, task.id, body)
     db.session.add(log)
     db.session.commit()
     return jsonify({"ok": True, "item": log.to_public()})
 
 
+_INVALID = object()
+
+def _ndjson_events(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield _INVALID
+
+def _check_event(ev):
+    """-> (task_id, None) or (None, (status, error)) without touching the database"""
+    if ev is _INVALID:
+        return None, (400, "invalid JSON")
+    if not isinstance(ev, dict):
+        return None, (422, "each event must be a JSON object")
+    task_id = ev.get("task_id")
+    if isinstance(task_id, str) and task_id.isdigit():
+        task_id = int(task_id)
+    if not isinstance(task_id, int) or isinstance(task_id, bool) or task_id <= 0:
+        return None, (422, "task_id is required")
+    if ev.get("duration_ms") is not None and (not isinstance(ev["duration_ms"], int) or isinstance(ev["duration_ms"], bool)):
+        return None, (422, "duration_ms must be an integer")
+    for field in ("event", "status", "service", "error_message"):
+        if ev.get(field) is not None and not isinstance(ev[field], str):
+            return None, (422, f"{field} must be a string")
+    # One over-long value would fail the whole chunk's insert on MySQL
+    for field, size in (("status", 50), ("service", 100)):
+        if ev.get(field) is not None and len(str(ev[field])) > size:
+            return None, (422, f"{field} is longer than {size} characters")
+    return task_id, None
+
+def _write_chunk(u, chunk: list, results: list) -> None:
+    """Authorize chunk [(index, task_id, event)] with one query, insert it and commit once."""
+    owners = dict(db.session.execute(
+        select(Task.id, Workflow.user_id)
+        .join(Workflow, Task.workflow_id == Workflow.id)
+        .where(Task.id.in_({task_id for _, task_id, _ in chunk}))
+    ).all())
+
+    accepted = []
+    for index, task_id, ev in chunk:
+        if task_id not in owners:
+            results.append({"index": index, "ok": False, "status": 404, "error": "Task not found"})
+        elif u.role != "admin" and owners[task_id] != u.id:
+            results.append({"index": index, "ok": False, "status": 403, "error": "Forbidden"})
+        else:
+            accepted.append((index, _new_log(u, task_id, ev)))
+    if not accepted:
+        return
+
+    if _commit_logs(accepted, results):
+        return
+    # Something in the chunk broke the insert: retry one event at a time so
+    # only the offending ones are reported
+    current_app.logger.warning("Log batch chunk failed; retrying %d events one by one", len(accepted))
+    for index, log in accepted:
+        if not _commit_logs([(index, _copy_log(log))], results):
+            current_app.logger.error("Log batch event %d failed", index)
+            results.append({"index": index, "ok": False, "status": 500, "error": "write failed"})
+
+def _copy_log(log: Log) -> Log:
+    return Log(task_id=log.task_id, actor_id=log.actor_id, event=log.event, status=log.status,
+               duration_ms=log.duration_ms, service=log.service, error_message=log.error_message)
+
+def _commit_logs(accepted: list, results: list) -> bool:
+    """Insert [(index, log)] in one commit; on success append their results and return True."""
+    db.session.add_all([log for _, log in accepted])
+    try:
+        db.session.flush()
+        ids = [(index, log.id) for index, log in accepted]
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return False
+    results.extend({"index": index, "ok": True, "id": log_id} for index, log_id in ids)
+    return True
+
+@logs_bp.post("/record/batch")
+@jwt_required()
+def record_batch():
+    """
+    Record many log events in one request: a JSON array (or {"items": [...]})
+    or an NDJSON body (Content-Type: application/x-ndjson), each event shaped
+    like /record's body. Events are authorized and inserted
+    LOG_BATCH_CHUNK at a time, one query and one commit per chunk; a chunk
+    whose insert fails is retried event by event, so only the failing events
+    are rejected. Returns a result per event, by index.
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    max_items = current_app.config["LOG_BATCH_MAX_ITEMS"]
+    chunk_size = current_app.config["LOG_BATCH_CHUNK"]
+
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        events = _ndjson_events(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get("items")
+        if not isinstance(data, list):
+            return jsonify({"ok": False, "error": "Body must be a JSON array of log events or NDJSON"}), 400
+        if len(data) > max_items:
+            return jsonify({"ok": False, "error": f"At most {max_items} events per batch"}), 413
+        events = iter(data)
+
+    results, chunk, truncated = [], [], False
+    for index, ev in enumerate(events):
+        if index >= max_items:
+            truncated = True
+            break
+        task_id, err = _check_event(ev)
+        if err:
+            results.append({"index": index, "ok": False, "status": err[0], "error": err[1]})
+            continue
+        chunk.append((index, task_id, ev))
+        if len(chunk) >= chunk_size:
+            _write_chunk(u, chunk, results)
+            chunk = []
+    if chunk:
+        _write_chunk(u, chunk, results)
+
+    results.sort(key=lambda r: r["index"])
+    accepted = sum(1 for r in results if r["ok"])
+    body = {"ok": True, "accepted": accepted, "rejected": len(results) - accepted, "items": results}
+    if truncated:
+        body["truncated"] = True
+        body["error"] = f"Stopped after {max_items} events"
+    return jsonify(body)
+
+
+@logs_bp.get("/search")
+@jwt_required()
+def search_logs():
+    """
+    Full-text search: ?q=words (all must match, as prefixes)
+      - source=logs (task log event + error_message; default) or api_events (error_message)
+      - logs filters: service, status, workflow_id; both: since/until
+      - sort=rank (relevance, default) or recent; limit (1..200, default 50)
+      - next pages: pass next_cursor back (before_id, plus rank when sort=rank)
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    source = request.args.get("source", "logs")
+    sort = request.args.get("sort", "rank")
+    if source not in ("logs", "api_events") or sort not in ("rank", "recent"):
+        return jsonify({"ok": False, "error": "source must be logs|api_events and sort rank|recent"}), 400
+    try:
+        cursor = parse_cursor(request.args, default_limit=50, max_limit=200)
+        words = search_terms(request.args.get("q"))
+    except (CursorError, SearchError) as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    cursor["rank"] = request.args.get("rank", type=float)
+
+    if source == "logs":
+        model, ts_col = Activity, Activity.timestamp
+        q = select(Activity)
+        if u.role != "admin":
+            q = q.where(Activity.owner_user_id == u.id)
+        if request.args.get("service"):
+            q = q.where(Activity.service == request.args["service"])
+        if cursor["status"]:
+            q = q.where(Activity.status == cursor["status"])
+        if request.args.get("workflow_id", type=int):
+            q = q.where(Activity.workflow_id == request.args.get("workflow_id", type=int))
+    else:
+        model, ts_col = ApiEvent, ApiEvent.created_at
+        q = select(ApiEvent)
+        if u.role != "admin":
+            q = q.where(ApiEvent.user_id == u.id)
+    if cursor["since"]:
+        q = q.where(ts_col >= cursor["since"])
+    if cursor["until"]:
+        q = q.where(ts_col < cursor["until"])
+
+    stmt, ranked = search(model, q, words, cursor, sort)
+    rows = db.session.execute(stmt).all()
+    has_more = len(rows) > cursor["limit"]
+    rows = rows[:cursor["limit"]]
+
+    items = []
+    for row in rows:
+        obj = row[0]
+        item = _feed_item(obj) if source == "logs" else {
+            "id": obj.id,
+            "created_at": obj.created_at.isoformat(sep=" ", timespec="seconds") if obj.created_at else None,
+            "method": obj.method,
+            "path": obj.path,
+            "status_code": obj.status_code,
+            "user_id": obj.user_id,
+            "error_message": obj.error_message,
+        }
+        if ranked:
+            item["rank"] = row[1]
+        items.append(item)
+
+    next_cursor = None
+    if has_more:
+        next_cursor = {"before_id": rows[-1][0].id}
+        if ranked:
+            next_cursor["rank"] = rows[-1][1]
+    return jsonify({"ok": True, "items": items, "next_cursor": next_cursor, "has_more": has_more})
+
+
+@logs_bp.get("/archive")
+@jwt_required()
+def archived():
+    """
+    Stream archived rows as NDJSON: ?table=logs|api_events|login_attempts&since=&until=
+    (ISO dates/datetimes; since is required, until defaults to now). Rows
+    older than RETENTION_DAYS live only here (see retention.py).
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    table = request.args.get("table", "logs")
+    if table not in ARCHIVED_TABLES:
+        return jsonify({"ok": False, "error": f"table must be one of: {', '.join(ARCHIVED_TABLES)}"}), 400
+    if not request.args.get("since"):
+        return jsonify({"ok": False, "error": "since is required"}), 400
+    try:
+        since = datetime.fromisoformat(request.args["since"])
+        until = request.args.get("until")
+        if not until:
+            until = datetime.utcnow()
+        elif len(until) == 10:
+            until = datetime.fromisoformat(until) + timedelta(days=1)  # a bare date covers that whole day
+        else:
+            until = datetime.fromisoformat(until)
+    except ValueError:
+        return jsonify({"ok": False, "error": "since/until must be ISO dates or datetimes"}), 400
+
+    where = None
+    if u.role != "admin":
+        if table == "login_attempts":
+            return jsonify({"ok": False, "error": "Forbidden"}), 403
+        key = "owner_user_id" if table == "logs" else "user_id"
+
+        def where(row):
+            return row.get(key) == u.id
+
+    rows = read_archive(table, since, until, current_app.config["ARCHIVE_DIR"], where)
+    return Response(stream_with_context(json.dumps(row) + "\n" for row in rows),
+                    mimetype="application/x-ndjson", headers={"Cache-Control": "no-store"})
+
+
 @logs_bp.get("/errors")
 @jwt_required()
 def recent_errors():
@@ -95,3 +362,29 @@ def recent_errors():
     q = ApiEvent.query.order_by(ApiEvent.id.desc()).limit(limit)
     items = [e.to_public() for e in q.all()]
     return jsonify({"ok": True, "items": items})
+
+
+@logs_bp.get("/errors/anomalies")
+@jwt_required()
+def error_anomalies():
+    """
+    5xx bursts flagged by the online detector (newest first, ?limit<=200),
+    plus each route's open bucket against its baseline right now.
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    limit = max(1, min(request.args.get("limit", 50, type=int), 200))
+
+    items = [a.to_public() for a in ApiAnomaly.query.order_by(ApiAnomaly.id.desc()).limit(limit).all()]
+    return jsonify({"ok": True, "items": items, "series": current_series(current_app.config)})
+
+
+@logs_bp.get("/audit/stats")
+@jwt_required()
+def audit_stats():
+    """Audit writer queue depth and written/dropped/failed counters for this worker process (admin only)."""
+    u = _user()
+    if not u or u.role != "admin":
+        return jsonify({"ok": False, "error": "Forbidden"}), 403
+    return jsonify({"ok": True, **current_app.extensions["audit"].snapshot()})
@@ -2,9 +2,16 @@ from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from .extensions import db
 from sqlalchemy import func
-from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy.dialects import sqlite
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
 import os, json
 
+# DATETIME columns filled by CURRENT_TIMESTAMP hold whole seconds; on SQLite,
+# bind datetimes the same way so keyset comparisons against them match.
+ServerDateTime = db.DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite")
+
 
 class User(db.Model):
     __tablename__ = "users"
@@ -53,8 +60,21 @@ class Task(db.Model):
     name = db.Column(db.String(100), nullable=False)
     status = db.Column(db.String(50))
     assigned_to = db.Column(db.String(100))
-    due_date = db.Column(db.Date)
-    created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+    due_date = db.Column(db.Date, index=True)  # /analytics/overdue: ORDER BY due_date LIMIT n
+    created_at = db.Column(ServerDateTime, server_default=db.func.current_timestamp(), index=True)
+    # Change version of the last write to this row, for delta sync (see tasks/sync.py)
+    version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0", index=True)
+
+    __table_args__ = (
+        # Range scans for owner-scoped time series (see analytics/series.py)
+        db.Index("ix_tasks_workflow_created", "workflow_id", "created_at"),
+        # Keyset pages of /api/tasks sorted by due date (see tasks/listing.py)
+        db.Index("ix_tasks_workflow_due", "workflow_id", "due_date"),
+        db.Index("ix_tasks_assigned_due", "assigned_to", "due_date"),
+    )
+    # Load created_at (the database clock) during the INSERT flush so the
+    # flush hooks see the creation day without a reload
+    __mapper_args__ = {"eager_defaults": True}
 
     workflow = db.relationship("Workflow", backref=db.backref("tasks", cascade="all, delete-orphan"))
     logs = db.relationship("Log", back_populates="task", cascade="all, delete-orphan")
@@ -68,6 +88,7 @@ class Task(db.Model):
             "assigned_to": self.assigned_to,
             "due_date": self.due_date.isoformat() if self.due_date else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
+            "version": self.version,
         }
 
     # back-compat alias
@@ -79,13 +100,21 @@ class Log(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, db.ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
     actor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
-    timestamp = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+    timestamp = db.Column(db.DateTime, server_default=db.func.current_timestamp(), index=True)
     event = db.Column(db.Text)
     status = db.Column(db.String(50))
     duration_ms = db.Column(db.Integer)  # optional timing for the action
     service = db.Column(db.String(100))
     error_message = db.Column(db.Text)
 
+    __table_args__ = (
+        # status-filtered feeds page by id (see pagination.py)
+        db.Index("ix_logs_status_id", "status", "id"),
+    )
+    # Load timestamp (the database clock) during the INSERT flush, so flush
+    # hooks bucket a log by the same value the rebuilds read back
+    __mapper_args__ = {"eager_defaults": True}
+
     task = db.relationship("Task", back_populates="logs")
     actor = db.relationship("User", foreign_keys=[actor_id])
 
@@ -131,12 +160,19 @@ class WorkflowRule(db.Model):
             "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
-def _fernet():
-    key = os.environ.get("INTEGRATION_KEY")
-    if not key:
+def _integration_keys() -> list[bytes]:
+    """
+    INTEGRATION_KEY may hold several comma-separated keys during a rotation.
+    The first key encrypts; every key is tried when decrypting.
+    """
+    raw = os.environ.get("INTEGRATION_KEY") or ""
+    keys = [k.strip() for k in raw.split(",") if k.strip()]
+    if not keys:
         raise RuntimeError("INTEGRATION_KEY is not set")
-    # Accept either str or bytes; Fernet wants bytes
-    return Fernet(key.encode() if isinstance(key, str) else key)
+    return [k.encode() for k in keys]
+
+def _fernet():
+    return MultiFernet([Fernet(k) for k in _integration_keys()])
 
 class Integration(db.Model):
     __tablename__ = "integrations"
@@ -297,3 +333,311 @@ class LoginAttempt(db.Model):
             "user_agent": self.user_agent,
             "timestamp": self.timestamp.isoformat() if self.timestamp else None,
         }
+
+
+class TaskDailyRollup(db.Model):
+    """
+    Task counts per owner / workflow / creation day / status.
+    Maintained on every task write (see analytics/rollup.py); rebuild with
+    `python -m app.scripts.rebuild_rollups`.
+    """
+    __tablename__ = "task_daily_rollup"
+
+    owner_user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    workflow_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)  # "" when the task has no status
+    task_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_task_daily_rollup_owner_day", "owner_user_id", "day"),
+        db.Index("ix_task_daily_rollup_day", "day"),
+    )
+
+
+class WorkflowStats(db.Model):
+    """
+    Denormalized per-workflow task counters, maintained on every task write
+    (see analytics/counters.py). Overdue depends on today's date, so it is
+    counted at read time rather than stored here.
+    """
+    __tablename__ = "workflow_stats"
+
+    workflow_id = db.Column(db.Integer, db.ForeignKey("workflows.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    owner_user_id = db.Column(db.Integer, nullable=False)
+    total_count = db.Column(db.Integer, nullable=False, default=0)
+    open_count = db.Column(db.Integer, nullable=False, default=0)
+    done_count = db.Column(db.Integer, nullable=False, default=0)
+    checked_at = db.Column(db.DateTime)
+
+
+# Match the /workflows/top sort (open_count DESC, workflow_id ASC) so it is an index scan + LIMIT
+db.Index("ix_workflow_stats_owner_open", WorkflowStats.owner_user_id, WorkflowStats.open_count.desc(), WorkflowStats.workflow_id)
+db.Index("ix_workflow_stats_open", WorkflowStats.open_count.desc(), WorkflowStats.workflow_id)
+
+
+class AnalyticsVersion(db.Model):
+    """
+    Per-owner change counter bumped by every task/workflow/log write (see
+    analytics/cache.py). Cached analytics responses are keyed on it.
+    """
+    __tablename__ = "analytics_versions"
+
+    owner_user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class ReportDefinition(db.Model):
+    """
+    A report that the scheduler precomputes on cron_expr (see reports/). kind
+    selects the builder, params (JSON) its options; it runs with the owner's scope.
+    """
+    __tablename__ = "report_definitions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    owner_user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = db.Column(db.String(120), nullable=False)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text)  # JSON object
+    cron_expr = db.Column(db.String(120))  # e.g. "0 7 * * 0"; NULL = on demand only
+    last_run_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    owner = db.relationship("User")
+
+    def params_dict(self) -> dict:
+        try:
+            return json.loads(self.params or "{}")
+        except ValueError:
+            return {}
+
+    def to_public(self):
+        return {
+            "id": self.id,
+            "owner_user_id": self.owner_user_id,
+            "name": self.name,
+            "kind": self.kind,
+            "params": self.params_dict(),
+            "cron_expr": self.cron_expr,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class ReportSnapshot(db.Model):
+    """One precomputed run of a ReportDefinition; payload is gzip-compressed JSON."""
+    __tablename__ = "report_snapshots"
+    __table_args__ = (
+        db.Index("ix_report_snapshots_report_id", "report_id", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    report_id = db.Column(db.Integer, db.ForeignKey("report_definitions.id", ondelete="CASCADE"), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    trigger = db.Column(db.String(20), nullable=False)  # scheduled | manual
+    duration_ms = db.Column(db.Integer)
+    size_bytes = db.Column(db.Integer)
+    # MEDIUMBLOB on MySQL; deferred so listing snapshots never loads payloads
+    payload = db.deferred(db.Column(db.LargeBinary(length=2**24 - 1), nullable=False))
+
+    report = db.relationship("ReportDefinition", backref=db.backref("snapshots", cascade="all, delete-orphan"))
+
+    def to_public(self):
+        return {
+            "id": self.id,
+            "report_id": self.report_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "trigger": self.trigger,
+            "duration_ms": self.duration_ms,
+            "size_bytes": self.size_bytes,
+        }
+
+
+class Activity(db.Model):
+    """
+    Append-only feed row per task log, denormalized with the owner, task,
+    workflow and actor so the recent-activity feeds are one range scan on
+    (owner_user_id, id). Written in the same flush as the log and kept in step
+    with renames/moves (see activity.py); rebuild with
+    `python -m app.scripts.rebuild_activity`.
+    """
+    __tablename__ = "activity"
+    __table_args__ = (
+        db.Index("ix_activity_owner_id", "owner_user_id", "id"),
+        # ?status= and ?since=/until= feed filters, with and without the owner scope
+        db.Index("ix_activity_owner_status_id", "owner_user_id", "status", "id"),
+        db.Index("ix_activity_status_id", "status", "id"),
+        db.Index("ix_activity_owner_timestamp", "owner_user_id", "timestamp"),
+        db.Index("ix_activity_timestamp", "timestamp"),
+        db.Index("ix_activity_task_id", "task_id"),
+        db.Index("ix_activity_workflow_id", "workflow_id"),
+    )
+
+    id = db.Column(db.Integer, db.ForeignKey("logs.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)  # = logs.id
+    owner_user_id = db.Column(db.Integer, nullable=False)
+    workflow_id = db.Column(db.Integer, nullable=False)
+    workflow_name = db.Column(db.String(100))
+    task_id = db.Column(db.Integer, nullable=False)
+    task_name = db.Column(db.String(100))
+    task_status = db.Column(db.String(50))  # the task's current status, not the one at log time
+    actor_id = db.Column(db.Integer)
+    actor_name = db.Column(db.String(100))
+    actor_email = db.Column(db.String(120))
+    timestamp = db.Column(db.DateTime)
+    event = db.Column(db.Text)
+    status = db.Column(db.String(50))
+    duration_ms = db.Column(db.Integer)
+    service = db.Column(db.String(100))
+    error_message = db.Column(db.Text)
+
+
+class ArchivedLogCount(db.Model):
+    """
+    Per owner / workflow / hour counts of archived task logs for each
+    /series log metric (events, completed, errors). Written by the retention
+    job in the transaction that deletes the logs (see retention.py), so
+    /series never has to read the archive files.
+    """
+    __tablename__ = "archived_log_counts"
+
+    owner_user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    workflow_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    hour = db.Column(db.DateTime, primary_key=True)
+    metric = db.Column(db.String(20), primary_key=True)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_archived_log_counts_owner_metric_hour", "owner_user_id", "metric", "hour"),
+        db.Index("ix_archived_log_counts_metric_hour", "metric", "hour"),
+    )
+
+
+class ServiceStats(db.Model):
+    """
+    Per owner / hour / service counts of task logs that name a service,
+    maintained on every log insert (see analytics/sketches.py).
+    """
+    __tablename__ = "service_stats"
+
+    owner_user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    bucket = db.Column(db.DateTime, primary_key=True)  # UTC hour
+    service = db.Column(db.String(100), primary_key=True)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    duration_count = db.Column(db.Integer, nullable=False, default=0)
+    duration_sum = db.Column(db.BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_service_stats_bucket", "bucket"),
+    )
+
+
+class ServiceDurationBin(db.Model):
+    """
+    DDSketch bins of duration_ms per owner / hour / service: bin i counts
+    durations in (gamma^(i-1), gamma^i], bin -1 counts zeros. Sketches merge
+    by summing counts, so a window is one GROUP BY over its buckets.
+    """
+    __tablename__ = "service_duration_bins"
+
+    owner_user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    service = db.Column(db.String(100), primary_key=True)
+    bin = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_service_duration_bins_bucket", "bucket"),
+    )
+
+
+class ApiErrorSeries(db.Model):
+    """
+    Online baseline of 5xx counts per (method, route) in fixed buckets: the
+    open bucket's count plus an EWMA mean/variance of closed buckets (see
+    anomaly.py). One row per series, updated as errors are recorded.
+    """
+    __tablename__ = "api_error_series"
+
+    method = db.Column(db.String(10), primary_key=True)
+    route = db.Column(db.String(255), primary_key=True)  # URL rule, e.g. /api/tasks/<int:task_id>
+    bucket_start = db.Column(db.DateTime)
+    bucket_count = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float, nullable=False, default=0.0)
+    var = db.Column(db.Float, nullable=False, default=0.0)
+    buckets_seen = db.Column(db.Integer, nullable=False, default=0)
+    alerted_bucket = db.Column(db.DateTime)  # last bucket flagged, to alert once per burst bucket
+
+
+class ApiAnomaly(db.Model):
+    """A bucket whose 5xx count was far above its series' EWMA baseline."""
+    __tablename__ = "api_anomalies"
+
+    id = db.Column(db.Integer, primary_key=True)
+    method = db.Column(db.String(10), nullable=False)
+    route = db.Column(db.String(255), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    count = db.Column(db.Integer, nullable=False)
+    expected = db.Column(db.Float, nullable=False)
+    std = db.Column(db.Float, nullable=False)
+    zscore = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_public(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "route": self.route,
+            "bucket_start": self.bucket_start.isoformat(),
+            "count": self.count,
+            "expected": round(self.expected, 2),
+            "std": round(self.std, 2),
+            "zscore": round(self.zscore, 1),
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class NotificationCursor(db.Model):
+    """
+    A user's read position in the notifications feed (last activity/log id
+    seen) and the number of feed items after it. unread_count is bumped in
+    the flush that inserts the logs and recomputed whenever the cursor moves
+    (see notifications/unread.py).
+    """
+    __tablename__ = "notification_cursors"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    last_read_id = db.Column(db.Integer, nullable=False, default=0)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_public(self):
+        return {"unread": self.unread_count, "last_read_id": self.last_read_id}
+
+
+class ChangeCounter(db.Model):
+    """Named monotonic counters; "tasks" versions task changes for delta sync."""
+    __tablename__ = "change_counters"
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class TaskTombstone(db.Model):
+    """
+    A task that left an owner's view at `version`: deleted, or its workflow
+    moved to another owner. Kept for TASK_TOMBSTONE_DAYS so clients can sync
+    deletions with /api/tasks/changes.
+    """
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        db.Index("ix_task_tombstones_version", "version"),
+        db.Index("ix_task_tombstones_owner_version", "owner_user_id", "version"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    workflow_id = db.Column(db.Integer)
+    owner_user_id = db.Column(db.Integer)
+    version = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -1,8 +1,16 @@
-from flask import Blueprint, jsonify, request
+import json
+import queue
+import time
+from datetime import timedelta
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import desc
+from sqlalchemy import func, select
 from ..extensions import db
-from ..models import User, Log, Task, Workflow
+from ..models import User, Activity, NotificationCursor
+from ..pagination import CursorError, parse_cursor, keyset, page
+from ..pubsub import BrokerFull, notification_item, visible
+from .unread import mark_read
 
 notifications_bp = Blueprint("notifications", __name__)
 
@@ -19,37 +27,163 @@ def recent():
     Return recent task log events across all workflows the user can see.
     Optional query params:
       - limit (1..200), default 50
-      - after_id (return items with id > after_id) for incremental polling
+      - after_id (items with id > after_id, oldest first up to limit) for incremental
+        polling; keep polling with next_cursor while has_more is true
+      - before_id for older pages; since/until, status filters
     """
     u = _user()
     if not u:
         return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    try:
+        cursor = parse_cursor(request.args, default_limit=50, max_limit=200)
+    except CursorError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
 
-    limit = max(1, min(int(request.args.get("limit", 50)), 200))
-    after_id = request.args.get("after_id", type=int)
-
-    q = (
-        db.session.query(Log, Task, Workflow)
-        .join(Task, Log.task_id == Task.id)
-        .join(Workflow, Task.workflow_id == Workflow.id)
-    )
+    q = Activity.query
     if u.role != "admin":
-        q = q.filter(Workflow.user_id == u.id)
-    if after_id:
-        q = q.filter(Log.id > after_id)
-
-    q = q.order_by(desc(Log.id)).limit(limit)
-    rows = q.all()
-
-    items = []
-    for log, task, wf in rows:
-        items.append({
-            "id": log.id,
-            "when": log.timestamp.isoformat() if log.timestamp else None,
-            "event": log.event,
-            "status": log.status,
-            "task": {"id": task.id, "name": task.name, "status": task.status},
-            "workflow": {"id": wf.id, "name": wf.name},
-        })
-
-    return jsonify({"ok": True, "items": items})
+        q = q.filter(Activity.owner_user_id == u.id)
+    rows, meta = page(keyset(q, cursor, Activity.id, Activity.timestamp, Activity.status).all(), cursor, lambda a: a.id)
+
+    read = db.session.get(NotificationCursor, u.id)
+    return jsonify({"ok": True, "items": [notification_item(a) for a in rows],
+                    "last_read_id": read.last_read_id if read else 0, **meta})
+
+
+@notifications_bp.get("/unread-count")
+@jwt_required()
+def unread_count():
+    """Badge count: one primary-key read of the caller's cursor, cheap enough to poll every few seconds."""
+    try:
+        uid = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    read = db.session.get(NotificationCursor, uid)
+    return jsonify({"ok": True, "unread": read.unread_count if read else 0,
+                    "last_read_id": read.last_read_id if read else 0})
+
+
+@notifications_bp.post("/read")
+@jwt_required()
+def mark_notifications_read():
+    """
+    Advance the read cursor: body {"up_to_id": N} marks N and everything
+    older as read; without it, everything up to the newest item. The cursor
+    never moves backwards.
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    up_to_id = (request.get_json(silent=True) or {}).get("up_to_id")
+    if up_to_id is not None:
+        try:
+            up_to_id = int(up_to_id)
+        except (TypeError, ValueError):
+            return jsonify({"ok": False, "error": "up_to_id must be an integer"}), 400
+    read = mark_read(u, up_to_id)
+    return jsonify({"ok": True, **read.to_public()})
+
+
+def _sse(item: dict) -> str:
+    return f"id: {item['id']}\nevent: activity\ndata: {json.dumps(item)}\n\n"
+
+
+def _missed(sub, cfg):
+    """
+    Yield what sub has not been sent yet straight from the activity table.
+    Rows just below last_id that were inserted in the last
+    SSE_RESCAN_SECONDS are re-checked first, since they may have committed
+    after last_id was sent; on a resume the client drops the ones it already
+    has by id. Past SSE_CATCHUP_MAX rows, skip to the newest row and emit a
+    `reset` event instead, telling the client to reload its list with /recent.
+    """
+    sent, chunk = 0, 200
+    try:
+        # The database's own clock, which stamped the rows
+        recent = db.session.execute(select(func.current_timestamp())).scalar() - timedelta(
+            seconds=cfg["SSE_RESCAN_SECONDS"])
+        late = db.session.execute(
+            visible(select(Activity), sub.user_id, sub.is_admin)
+            .where(Activity.id > sub.last_id - sub.rescan, Activity.id <= sub.last_id,
+                   Activity.timestamp >= recent)
+            .order_by(Activity.id)
+        ).scalars().all()
+        for a in late:
+            if sub.is_new(a.id):
+                sub.mark_sent(a.id)
+                yield _sse(notification_item(a))
+        while True:
+            rows = db.session.execute(
+                visible(select(Activity), sub.user_id, sub.is_admin)
+                .where(Activity.id > sub.last_id).order_by(Activity.id).limit(chunk)
+            ).scalars().all()
+            for a in rows:
+                sub.mark_sent(a.id)
+                yield _sse(notification_item(a))
+            sent += len(rows)
+            if len(rows) < chunk:
+                return
+            if sent >= cfg["SSE_CATCHUP_MAX"]:
+                sub.last_id = max(sub.last_id, db.session.execute(
+                    visible(select(func.max(Activity.id)), sub.user_id, sub.is_admin)).scalar() or 0)
+                yield f"event: reset\ndata: {json.dumps({'last_id': sub.last_id})}\n\n"
+                return
+    finally:
+        # never hold a pooled connection while the stream is idle
+        db.session.remove()
+
+
+@notifications_bp.get("/stream")
+@jwt_required()
+def stream():
+    """
+    Server-Sent Events feed of the same items as /recent, pushed as they are
+    committed. Resume with the Last-Event-ID header (sent automatically by
+    EventSource on reconnect) or ?last_event_id=; without either only new
+    items are sent. Comment lines keep idle connections open, and the stream
+    ends after SSE_MAX_STREAM_SECONDS so the client reconnects (and
+    re-authenticates) with its last id.
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_id = int(last_id) if last_id not in (None, "") else None
+    except ValueError:
+        return jsonify({"ok": False, "error": "Last-Event-ID must be an integer"}), 400
+
+    cfg = current_app.config
+    broker = current_app.extensions["pubsub"]
+    try:
+        sub = broker.subscribe(u.id, u.role == "admin", last_id)
+    except BrokerFull as e:
+        return jsonify({"ok": False, "error": str(e)}), 503, {"Retry-After": "30"}
+    db.session.remove()
+
+    def events():
+        try:
+            yield f"retry: {cfg['SSE_RETRY_MS']}\n\n"
+            if last_id is not None:
+                yield from _missed(sub, cfg)
+            deadline = time.monotonic() + cfg["SSE_MAX_STREAM_SECONDS"]
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                if sub.lagged:
+                    sub.drain()
+                    yield from _missed(sub, cfg)
+                try:
+                    item = sub.queue.get(timeout=min(cfg["SSE_HEARTBEAT_SECONDS"], remaining))
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if not sub.is_new(item["id"]):
+                    continue
+                sub.mark_sent(item["id"])
+                yield _sse(item)
+        finally:
+            broker.unsubscribe(sub)
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,120 @@
+"""
+Unread counters for the notifications feed (notification_cursors).
+
+Every transaction that inserts task logs adds them to the workflow owner's
+counter, and to every admin's, since admins see the whole feed. It is one
+upsert-add per affected user, so reading the badge count is a single
+primary-key read. Logs deleted with their task or workflow, or archived by
+the retention job, are taken off again if they were past the user's read
+cursor.
+
+The flush hook only tallies the changes in session.info; they are written
+just before the commit. Every log write touches the admins' rows, so taking
+their locks at the first flush would queue all log writes behind the
+longest open transaction (bulk batches, import chunks, rule callouts).
+
+Moving the read cursor recounts the feed items after it under the cursor's
+row lock. That also settles any drift from workflow moves or role changes
+since the last move.
+"""
+from collections import Counter
+
+from sqlalchemy import case, event, func, select, update
+
+from ..changes import on_change
+from ..extensions import db
+from ..models import Activity, NotificationCursor, Task, User, Workflow
+from ..pubsub import visible
+from ..upsert import add_counts
+
+# session.info key for the counter changes waiting for the commit
+PENDING = "unread_changes"
+
+
+@on_change
+def _count_unread(session, changes):
+    if not (changes.new_logs or changes.deleted_logs):
+        return
+    pending = session.info.setdefault(PENDING, {"owners": Counter(), "total": 0, "deleted": []})
+    if changes.deleted_logs:
+        pending["deleted"].extend(_deleted_owners(session, changes))
+    if changes.new_logs:
+        context = changes.log_context(session)
+        counts = Counter(context[l.task_id][0] for l in changes.new_logs if l.task_id in context)
+        pending["owners"].update(counts)
+        pending["total"] += sum(counts.values())
+
+
+def _deleted_owners(session, changes) -> list[tuple[int, int | None]]:
+    # Owners of deleted tasks come from their before-state; any other task still exists
+    owners = {before.task_id: before.owner_user_id for before, after in changes.tasks if before and not after}
+    missing = {tid for _, tid in changes.deleted_logs} - owners.keys()
+    if missing:
+        owners.update(session.execute(select(Task.id, Workflow.user_id)
+                                      .join(Workflow, Task.workflow_id == Workflow.id)
+                                      .where(Task.id.in_(missing))).all())
+    return [(log_id, owners.get(tid)) for log_id, tid in changes.deleted_logs]
+
+
+@event.listens_for(db.session, "before_commit")
+def _write_unread(session):
+    # before_commit runs ahead of commit()'s own flush, so flush first to collect everything
+    session.flush()
+    pending = session.info.pop(PENDING, None)
+    if not pending:
+        return
+    counts = pending["owners"]
+    if pending["total"]:
+        for admin_id in session.execute(select(User.id).where(User.role == "admin")).scalars():
+            counts[admin_id] = pending["total"]
+    if counts:
+        # Sorted so concurrent commits lock the counter rows in the same order
+        add_counts(session, NotificationCursor.__table__, ["user_id"],
+                   [{"user_id": uid, "unread_count": n} for uid, n in sorted(counts.items())], ["unread_count"])
+    uncount_unread(session, pending["deleted"])
+
+
+@event.listens_for(db.session, "after_rollback")
+def _drop_unread(session):
+    session.info.pop(PENDING, None)
+
+
+def uncount_unread(session, logs: list[tuple[int, int | None]]) -> None:
+    """
+    Take deleted logs [(log id, owner id)] off the owner's and every admin's
+    counter, counting only logs past that user's read cursor. The cursor rows
+    are locked first (in user order), as mark_read() does.
+    """
+    if not logs:
+        return
+    admins = set(session.execute(select(User.id).where(User.role == "admin")).scalars())
+    users = sorted({owner for _, owner in logs if owner is not None} | admins)
+    table = NotificationCursor.__table__
+    cursors = session.execute(
+        select(table.c.user_id, table.c.last_read_id).where(table.c.user_id.in_(users))
+        .order_by(table.c.user_id).with_for_update()
+    ).all()
+    for uid, last_read_id in cursors:
+        n = sum(1 for log_id, owner in logs if log_id > last_read_id and (uid in admins or owner == uid))
+        if n:
+            session.execute(update(table).where(table.c.user_id == uid).values(
+                unread_count=case((table.c.unread_count > n, table.c.unread_count - n), else_=0)))
+
+
+def mark_read(user, up_to_id: int | None = None) -> NotificationCursor:
+    """Advance user's cursor to up_to_id (default: the newest visible item) and recount. Commits."""
+    is_admin = user.role == "admin"
+    add_counts(db.session, NotificationCursor.__table__, ["user_id"],
+               [{"user_id": user.id, "unread_count": 0}], ["unread_count"])
+    cursor = db.session.execute(
+        select(NotificationCursor).where(NotificationCursor.user_id == user.id).with_for_update()
+    ).scalar_one()
+    newest = db.session.execute(visible(select(func.max(Activity.id)), user.id, is_admin)).scalar() or 0
+    target = newest if up_to_id is None else min(up_to_id, newest)
+    cursor.last_read_id = max(cursor.last_read_id, target)
+    cursor.unread_count = db.session.execute(
+        visible(select(func.count()).select_from(Activity), user.id, is_admin)
+        .where(Activity.id > cursor.last_read_id)
+    ).scalar()
+    db.session.commit()
+    return cursor
@@ -0,0 +1,252 @@
+"""
+In-process pub/sub behind the notifications SSE stream.
+
+Each worker process runs one Broker: a single tail of the activity table
+(one query per wake-up, however many clients are connected) that fans new
+rows out to the subscribers allowed to see them. A commit that adds task
+logs in this process wakes the tail at once; writes from other workers and
+pods are picked up on the next SSE_POLL_SECONDS tick. With no subscribers the
+tail does not query at all.
+
+Every subscriber has a bounded queue (SSE_QUEUE_MAX). A client that does
+not keep up is not allowed to grow it: the overflowing item is dropped, the
+subscriber is flagged as lagged, and its stream re-reads what it missed
+from the table, starting after the last id it sent. Ids are activity (=
+log) ids, which is also what Last-Event-ID resumes from.
+
+Ids are allocated at insert but become visible at commit, so on MySQL a row
+can appear after rows with higher ids. The tail therefore re-reads the ids
+of the last SSE_RESCAN_IDS rows below its high-water mark on every pass and
+sends the ones it has not sent yet. Each subscriber keeps the ids it sent in
+that window too, so a row arriving from both the tail and a re-read is sent
+once.
+"""
+import os
+import queue
+import threading
+
+from flask import has_app_context, current_app
+from sqlalchemy import event, func, select
+
+from .changes import on_change
+from .extensions import db
+from .models import Activity
+
+
+class BrokerFull(Exception):
+    pass
+
+
+def notification_item(a: Activity) -> dict:
+    return {
+        "id": a.id,
+        "when": a.timestamp.isoformat() if a.timestamp else None,
+        "event": a.event,
+        "status": a.status,
+        "task": {"id": a.task_id, "name": a.task_name, "status": a.task_status},
+        "workflow": {"id": a.workflow_id, "name": a.workflow_name},
+    }
+
+
+def visible(query, user_id: int, is_admin: bool):
+    return query if is_admin else query.where(Activity.owner_user_id == user_id)
+
+
+def _prune(ids: set, floor: int) -> set:
+    return {i for i in ids if i > floor}
+
+
+class Subscriber:
+    def __init__(self, user_id: int, is_admin: bool, last_id: int, maxsize: int, rescan: int):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.last_id = last_id
+        self.rescan = rescan
+        self.sent = set()  # ids sent that are within `rescan` of last_id
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.lagged = False
+
+    def is_new(self, item_id: int) -> bool:
+        return item_id > self.last_id - self.rescan and item_id not in self.sent
+
+    def mark_sent(self, item_id: int) -> None:
+        self.sent.add(item_id)
+        self.last_id = max(self.last_id, item_id)
+        if len(self.sent) > self.rescan:
+            self.sent = _prune(self.sent, self.last_id - self.rescan)
+
+    def offer(self, item: dict) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.lagged = True
+
+    def drain(self) -> None:
+        self.lagged = False
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class Broker:
+    def __init__(self, app):
+        cfg = app.config
+        self.app = app
+        self.poll = cfg["SSE_POLL_SECONDS"]
+        self.queue_max = cfg["SSE_QUEUE_MAX"]
+        self.max_connections = cfg["SSE_MAX_CONNECTIONS"]
+        self.rescan = cfg["SSE_RESCAN_IDS"]
+        self.high_water = None
+        self._seen: set = set()  # ids fanned out (or present at start) within `rescan` of high_water
+        self._by_user: dict[int, set] = {}
+        self._admins: set = set()
+        self._count = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    # ---------- subscribers ----------
+
+    def subscribe(self, user_id: int, is_admin: bool, last_id: int | None) -> Subscriber:
+        """
+        Register a stream (call inside an app context). Without last_id it
+        starts at the tail's current position, i.e. only new rows.
+        """
+        with self._lock:
+            if self._count >= self.max_connections:
+                raise BrokerFull("Too many open notification streams")
+            if self.high_water is None:
+                self.high_water = self.latest_id()
+                self._seen = set(self._ids_after(self.high_water - self.rescan))
+            sub = Subscriber(user_id, is_admin, self.high_water if last_id is None else last_id,
+                             self.queue_max, self.rescan)
+            (self._admins if is_admin else self._by_user.setdefault(user_id, set())).add(sub)
+            self._count += 1
+        self._ensure_thread()
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            bucket = self._admins if sub.is_admin else self._by_user.get(sub.user_id, set())
+            if sub in bucket:
+                bucket.discard(sub)
+                self._count -= 1
+            if not sub.is_admin and not bucket:
+                self._by_user.pop(sub.user_id, None)
+            if not self._count:
+                # Nobody listening: stop tailing and start from "now" on the next subscribe
+                self.high_water = None
+                self._seen = set()
+
+    def connections(self) -> int:
+        return self._count
+
+    # ---------- publishing ----------
+
+    def poke(self) -> None:
+        """Something was committed that may be in the feed; run the tail now."""
+        self._wake.set()
+
+    def _fan_out(self, rows: list[Activity]) -> None:
+        with self._lock:
+            admins = list(self._admins)
+            by_user = {uid: list(subs) for uid, subs in self._by_user.items()}
+        for a in rows:
+            targets = admins + by_user.get(a.owner_user_id, [])
+            if not targets:
+                continue
+            item = notification_item(a)
+            for sub in targets:
+                sub.offer(item)
+
+    @staticmethod
+    def latest_id() -> int:
+        return db.session.execute(select(func.max(Activity.id))).scalar() or 0
+
+    @staticmethod
+    def _ids_after(floor: int, limit: int | None = None) -> list[int]:
+        stmt = select(Activity.id).where(Activity.id > floor).order_by(Activity.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return db.session.execute(stmt).scalars().all()
+
+    def _tail_once(self, batch: int = 500) -> None:
+        with self.app.app_context():
+            try:
+                while True:
+                    start = self.high_water
+                    if start is None:
+                        return
+                    # Ids only, from `rescan` below the mark: also finds rows that committed late
+                    limit = self.rescan + batch
+                    ids = self._ids_after(start - self.rescan, limit)
+                    unsent = [i for i in ids if i not in self._seen]
+                    fresh = unsent[:batch]
+                    rows = []
+                    if fresh:
+                        rows = db.session.execute(
+                            select(Activity).where(Activity.id.in_(fresh)).order_by(Activity.id)
+                        ).scalars().all()
+                    with self._lock:
+                        if self.high_water != start:
+                            return  # reset by the last unsubscribe meanwhile
+                        if fresh:
+                            self.high_water = max(start, fresh[-1])
+                            self._seen.update(fresh)
+                            if len(self._seen) > self.rescan:
+                                self._seen = _prune(self._seen, self.high_water - self.rescan)
+                    self._fan_out(rows)
+                    if len(ids) < limit and len(unsent) <= batch:
+                        return
+            finally:
+                db.session.remove()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll)
+            self._wake.clear()
+            if not self._count:
+                continue
+            try:
+                self._tail_once()
+            except Exception:
+                self.app.logger.exception("Notification tail failed")
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="notification-tail", daemon=True)
+                self._thread.start()
+
+
+def init_app(app) -> Broker:
+    broker = Broker(app)
+    app.extensions["pubsub"] = broker
+    return broker
+
+
+# ---------- publishers: task and log writes ----------
+
+@on_change
+def _mark_feed_change(session, changes):
+    if changes.new_logs or changes.tasks:
+        session.info["feed_changed"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def _publish_on_commit(session):
+    if session.info.pop("feed_changed", False) and has_app_context():
+        broker = current_app.extensions.get("pubsub")
+        if broker is not None:
+            broker.poke()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("feed_changed", None)
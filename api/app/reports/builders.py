@@ -0,0 +1,111 @@
+"""
+Report builders and snapshot generation.
+
+Each builder takes the owner's Scope and the definition's params and returns
+a JSON-serializable dict. generate_snapshot() runs one, stores the result as
+a gzip-compressed ReportSnapshot and prunes old snapshots of that report.
+"""
+import gzip
+import json
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from ..analytics.cache import Scope
+from ..analytics.flow import stream_flow_metrics
+from ..analytics.series import BUCKETS, METRICS, series
+from ..extensions import db
+from ..models import Task, Workflow, ReportSnapshot
+
+
+def _int(params: dict, key: str, default: int, lo: int, hi: int) -> int:
+    try:
+        return max(lo, min(int(params.get(key, default)), hi))
+    except (TypeError, ValueError):
+        return default
+
+
+def _scoped(stmt, scope):
+    return stmt if scope.role == "admin" else stmt.where(Workflow.user_id == scope.id)
+
+
+def status_breakdown(scope, params: dict) -> dict:
+    """Per-workflow task counts by status, plus the oldest overdue tasks of each workflow."""
+    per_workflow = _int(params, "overdue_limit", 10, 1, 100)
+    today = date.today()
+
+    counts = db.session.execute(_scoped(
+        select(Workflow.id, Workflow.name, Task.status, func.count())
+        .join(Task, Task.workflow_id == Workflow.id)
+        .group_by(Workflow.id, Workflow.name, Task.status), scope)).all()
+
+    rn = func.row_number().over(partition_by=Task.workflow_id, order_by=(Task.due_date, Task.id)).label("rn")
+    ranked = _scoped(
+        select(Task.id, Task.workflow_id, Task.name, Task.assigned_to, Task.due_date, rn)
+        .join(Workflow, Task.workflow_id == Workflow.id)
+        .where(Task.due_date < today, Task.status != "done"), scope).subquery()
+    overdue = db.session.execute(select(ranked).where(ranked.c.rn <= per_workflow)).all()
+
+    workflows = {}
+    for wf_id, wf_name, status, n in counts:
+        wf = workflows.setdefault(wf_id, {"id": wf_id, "name": wf_name, "total": 0, "by_status": {},
+                                          "overdue_tasks": []})
+        wf["total"] += n
+        wf["by_status"][status or "unknown"] = n
+    for tid, wf_id, name, assignee, due, _ in overdue:
+        if wf_id in workflows:
+            workflows[wf_id]["overdue_tasks"].append({
+                "id": tid, "name": name, "assigned_to": assignee,
+                "due_date": due.isoformat(), "days_overdue": (today - due).days,
+            })
+    return {"as_of": today.isoformat(), "workflows": sorted(workflows.values(), key=lambda w: w["id"])}
+
+
+def flow(scope, params: dict) -> dict:
+    days = _int(params, "days", 90, 1, 730)
+    return {"days": days, **stream_flow_metrics(scope, date.today() - timedelta(days=days),
+                                                params.get("workflow_id"))}
+
+
+def time_series(scope, params: dict) -> dict:
+    metric = params.get("metric") if params.get("metric") in METRICS else "created"
+    bucket = params.get("bucket") if params.get("bucket") in BUCKETS else "week"
+    days = _int(params, "days", 90, 1, 730)
+    end = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+    return {"metric": metric, "bucket": bucket,
+            "items": series(scope, metric, bucket, end - timedelta(days=days), end, params.get("workflow_id"))}
+
+
+KINDS = {
+    "status_breakdown": status_breakdown,
+    "flow": flow,
+    "series": time_series,
+}
+
+
+def generate_snapshot(defn, trigger: str, keep: int) -> ReportSnapshot:
+    """Build defn now, store it compressed, prune beyond `keep` and commit."""
+    started = time.monotonic()
+    owner = defn.owner
+    data = KINDS[defn.kind](Scope(owner.id, owner.role), defn.params_dict())
+    now = datetime.utcnow()
+    body = json.dumps({"report": defn.to_public(), "generated_at": now.isoformat(), "data": data},
+                      default=str).encode("utf-8")
+    payload = gzip.compress(body, compresslevel=6)
+
+    snap = ReportSnapshot(report_id=defn.id, created_at=now, trigger=trigger, payload=payload,
+                          size_bytes=len(payload), duration_ms=int((time.monotonic() - started) * 1000))
+    defn.last_run_at = now
+    db.session.add(snap)
+    db.session.flush()
+
+    cutoff = db.session.execute(
+        select(ReportSnapshot.id).where(ReportSnapshot.report_id == defn.id)
+        .order_by(ReportSnapshot.id.desc()).offset(keep).limit(1)
+    ).scalar()
+    if cutoff is not None:
+        db.session.execute(delete(ReportSnapshot.__table__).where(
+            ReportSnapshot.report_id == defn.id, ReportSnapshot.id <= cutoff))
+    db.session.commit()
+    return snap
@@ -0,0 +1,255 @@
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
+
+from ..extensions import db
+from ..models import User, ReportDefinition, ReportSnapshot
+from ..workflows.routes import _cron_matches
+from .builders import KINDS, generate_snapshot
+
+reports_bp = Blueprint("reports", __name__)
+
+# Caps concurrent generations in this process (manual refreshes fail fast, the scheduler waits)
+_slots = None
+_slots_lock = threading.Lock()
+
+def _generation_slots() -> threading.BoundedSemaphore:
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(current_app.config["REPORT_MAX_CONCURRENT"])
+        return _slots
+
+def _user():
+    try:
+        return User.query.get(int(get_jwt_identity()))
+    except Exception:
+        return None
+
+def _visible(u):
+    q = ReportDefinition.query
+    if u.role != "admin":
+        q = q.filter(ReportDefinition.owner_user_id == u.id)
+    return q
+
+def _latest_meta(report_ids) -> dict:
+    if not report_ids:
+        return {}
+    latest_ids = (db.session.query(func.max(ReportSnapshot.id))
+                  .filter(ReportSnapshot.report_id.in_(report_ids))
+                  .group_by(ReportSnapshot.report_id))
+    snaps = ReportSnapshot.query.filter(ReportSnapshot.id.in_(latest_ids)).all()
+    return {s.report_id: s.to_public() for s in snaps}
+
+def _validate(data: dict, partial: bool = False):
+    """-> error message or None"""
+    if not partial or "name" in data:
+        if not (data.get("name") or "").strip():
+            return "name is required"
+    if not partial or "kind" in data:
+        if data.get("kind") not in KINDS:
+            return f"kind must be one of: {', '.join(KINDS)}"
+    if "params" in data and not isinstance(data["params"], dict):
+        return "params must be an object"
+    cron = data.get("cron_expr")
+    if cron and len(cron.split()) != 5:
+        return "cron_expr must have 5 fields (m h dom mon dow)"
+    return None
+
+@reports_bp.get("/")
+@jwt_required()
+def list_reports():
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    defs = _visible(u).order_by(ReportDefinition.id).all()
+    latest = _latest_meta([d.id for d in defs])
+    items = [{**d.to_public(), "latest": latest.get(d.id)} for d in defs]
+    return jsonify({"ok": True, "items": items, "kinds": list(KINDS)})
+
+@reports_bp.post("/")
+@jwt_required()
+def create_report():
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    data = request.get_json(silent=True) or {}
+    err = _validate(data)
+    if err:
+        return jsonify({"ok": False, "error": err}), 400
+    defn = ReportDefinition(
+        owner_user_id=u.id,
+        name=data["name"].strip(),
+        kind=data["kind"],
+        params=json.dumps(data.get("params") or {}),
+        cron_expr=(data.get("cron_expr") or "").strip() or None,
+    )
+    db.session.add(defn)
+    db.session.commit()
+    return jsonify({"ok": True, "item": defn.to_public()}), 201
+
+@reports_bp.patch("/<int:report_id>")
+@jwt_required()
+def update_report(report_id):
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    defn = _visible(u).filter(ReportDefinition.id == report_id).first()
+    if not defn:
+        return jsonify({"ok": False, "error": "Not found"}), 404
+    data = request.get_json(silent=True) or {}
+    err = _validate(data, partial=True)
+    if err:
+        return jsonify({"ok": False, "error": err}), 400
+    if "name" in data:
+        defn.name = data["name"].strip()
+    if "kind" in data:
+        defn.kind = data["kind"]
+    if "params" in data:
+        defn.params = json.dumps(data["params"] or {})
+    if "cron_expr" in data:
+        defn.cron_expr = (data["cron_expr"] or "").strip() or None
+    db.session.commit()
+    return jsonify({"ok": True, "item": defn.to_public()})
+
+@reports_bp.delete("/<int:report_id>")
+@jwt_required()
+def delete_report(report_id):
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    defn = _visible(u).filter(ReportDefinition.id == report_id).first()
+    if not defn:
+        return jsonify({"ok": False, "error": "Not found"}), 404
+    db.session.delete(defn)
+    db.session.commit()
+    return jsonify({"ok": True, "deleted": report_id})
+
+@reports_bp.get("/<int:report_id>/snapshots")
+@jwt_required()
+def list_snapshots(report_id):
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    if not _visible(u).filter(ReportDefinition.id == report_id).first():
+        return jsonify({"ok": False, "error": "Not found"}), 404
+    snaps = (ReportSnapshot.query.filter_by(report_id=report_id)
+             .order_by(ReportSnapshot.id.desc()).all())
+    return jsonify({"ok": True, "items": [s.to_public() for s in snaps]})
+
+def _serve_snapshot(snap: ReportSnapshot):
+    """The stored gzip bytes as-is when the client accepts gzip, else inflated."""
+    resp = Response(mimetype="application/json")
+    resp.set_etag(f"snapshot-{snap.id}")
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.headers["X-Snapshot-Created-At"] = snap.created_at.isoformat()
+    if request.if_none_match.contains(f"snapshot-{snap.id}"):
+        resp.status_code = 304
+        return resp
+    if "gzip" in request.accept_encodings:
+        resp.set_data(snap.payload)
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        resp.set_data(gzip.decompress(snap.payload))
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+@reports_bp.get("/<int:report_id>/latest")
+@jwt_required()
+def latest_snapshot(report_id):
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    if not _visible(u).filter(ReportDefinition.id == report_id).first():
+        return jsonify({"ok": False, "error": "Not found"}), 404
+    snap = (ReportSnapshot.query.filter_by(report_id=report_id)
+            .order_by(ReportSnapshot.id.desc()).first())
+    if not snap:
+        return jsonify({"ok": False, "error": "No snapshot yet"}), 404
+    return _serve_snapshot(snap)
+
+@reports_bp.get("/<int:report_id>/snapshots/<int:snapshot_id>")
+@jwt_required()
+def get_snapshot(report_id, snapshot_id):
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    if not _visible(u).filter(ReportDefinition.id == report_id).first():
+        return jsonify({"ok": False, "error": "Not found"}), 404
+    snap = ReportSnapshot.query.filter_by(report_id=report_id, id=snapshot_id).first()
+    if not snap:
+        return jsonify({"ok": False, "error": "Not found"}), 404
+    return _serve_snapshot(snap)
+
+@reports_bp.post("/<int:report_id>/refresh")
+@jwt_required()
+def refresh_report(report_id):
+    """Generate a snapshot now; throttled per report and by REPORT_MAX_CONCURRENT."""
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    defn = _visible(u).filter(ReportDefinition.id == report_id).first()
+    if not defn:
+        return jsonify({"ok": False, "error": "Not found"}), 404
+
+    min_interval = current_app.config["REPORT_REFRESH_MIN_INTERVAL"]
+    last = (db.session.query(func.max(ReportSnapshot.created_at))
+            .filter(ReportSnapshot.report_id == report_id).scalar())
+    if last and datetime.utcnow() - last < timedelta(seconds=min_interval):
+        retry = min_interval - int((datetime.utcnow() - last).total_seconds())
+        resp = jsonify({"ok": False, "error": "Refreshed too recently", "retry_after": retry})
+        resp.headers["Retry-After"] = str(retry)
+        return resp, 429
+
+    slots = _generation_slots()
+    if not slots.acquire(blocking=False):
+        resp = jsonify({"ok": False, "error": "Report generation is busy, try again shortly", "retry_after": 30})
+        resp.headers["Retry-After"] = "30"
+        return resp, 429
+    try:
+        snap = generate_snapshot(defn, "manual", current_app.config["REPORT_SNAPSHOTS_KEEP"])
+    finally:
+        slots.release()
+    return jsonify({"ok": True, "snapshot": snap.to_public()}), 201
+
+@reports_bp.post("/run-scheduled")
+def run_scheduled_reports():
+    """
+    Generate snapshots for definitions whose cron_expr matches this minute.
+    Protect with REPORTS_CRON_SECRET; intended for an external CronJob.
+    """
+    secret = os.environ.get("REPORTS_CRON_SECRET")
+    provided = request.args.get("secret") or request.headers.get("X-Cron-Secret")
+    if not secret:
+        return jsonify({"ok": False, "error": "REPORTS_CRON_SECRET not set"}), 400
+    if secret != provided:
+        return jsonify({"ok": False, "error": "Forbidden"}), 403
+
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    keep = current_app.config["REPORT_SNAPSHOTS_KEEP"]
+    due = [d for d in ReportDefinition.query.filter(ReportDefinition.cron_expr.isnot(None))
+                                          .order_by(ReportDefinition.id).all()
+           if _cron_matches(d.cron_expr, now)
+           and not (d.last_run_at and d.last_run_at.replace(second=0, microsecond=0) == now)]
+
+    generated, failed = 0, 0
+    slots = _generation_slots()
+    for defn in due:
+        # One at a time, sharing the cap with manual refreshes
+        with slots:
+            try:
+                generate_snapshot(defn, "scheduled", keep)
+                generated += 1
+            except Exception:
+                db.session.rollback()
+                failed += 1
+                current_app.logger.exception("Report %s failed", defn.id)
+
+    current_app.logger.info("Scheduled reports run", extra={"due": len(due), "generated": generated, "failed": failed})
+    return jsonify({"ok": True, "due": len(due), "generated": generated, "failed": failed}), 200
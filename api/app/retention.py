@@ -0,0 +1,187 @@
+"""
+Retention for the append-only tables (logs, api_events, login_attempts).
+
+archive_table() moves rows older than the retention window into monthly
+gzip JSONL files (<ARCHIVE_DIR>/<table>/<table>-YYYY-MM.jsonl.gz) and then
+deletes them, a chunk at a time in primary-key order. Ids grow with time, so
+each chunk is a short range scan from the oldest row and the run stops at
+the first row inside the window; no chunk holds locks for longer than one
+small DELETE by primary key. Each chunk is appended (as a new gzip member)
+and fsynced before its DELETE commits, so a crash can at worst duplicate a
+chunk in the archive. read_archive() skips such duplicates by id.
+
+Archived log rows carry the owner/workflow/task context so they can still
+be scoped per user after the task itself is gone. Each archived chunk of
+logs is also added to archived_log_counts, per hour and /series metric, in
+the same transaction as its DELETE.
+"""
+import gzip
+import json
+import os
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from .extensions import db
+from .models import Activity, ApiEvent, ArchivedLogCount, Log, LoginAttempt, Task, Workflow
+from .notifications.unread import uncount_unread
+from .upsert import add_counts
+
+# table -> (model, timestamp column)
+TABLES = {
+    "logs": (Log, Log.timestamp),
+    "api_events": (ApiEvent, ApiEvent.created_at),
+    "login_attempts": (LoginAttempt, LoginAttempt.timestamp),
+}
+
+
+def _columns(table: str) -> list:
+    model, _ = TABLES[table]
+    cols = list(model.__table__.c)
+    if table == "logs":
+        cols += [Workflow.user_id.label("owner_user_id"), Workflow.id.label("workflow_id"),
+                 Workflow.name.label("workflow_name"), Task.name.label("task_name")]
+    return cols
+
+
+def _oldest(table: str, limit: int):
+    model, _ = TABLES[table]
+    stmt = select(*_columns(table)).order_by(model.id).limit(limit)
+    if table == "logs":
+        stmt = (stmt.outerjoin(Task, Log.task_id == Task.id)
+                .outerjoin(Workflow, Task.workflow_id == Workflow.id))
+    return db.session.execute(stmt).mappings().all()
+
+
+def _ts_field(table: str) -> str:
+    return TABLES[table][1].key
+
+
+def _path(archive_dir: str, table: str, month: str) -> str:
+    return os.path.join(archive_dir, table, f"{table}-{month}.jsonl.gz")
+
+
+def _encode(row) -> str:
+    return json.dumps({k: (v.isoformat() if isinstance(v, (date, datetime)) else v) for k, v in row.items()})
+
+
+def _append(path: str, lines: list[str]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as gz:
+            gz.write("".join(line + "\n" for line in lines).encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_table(table: str, days: int, archive_dir: str, chunk_size: int = 2000, log=print) -> int:
+    """Archive and delete rows of `table` older than `days` days. Returns the number moved."""
+    model, ts_col = TABLES[table]
+    ts_key = _ts_field(table)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    moved = 0
+    while True:
+        rows = _oldest(table, chunk_size)
+        old = []
+        for row in rows:
+            if row[ts_key] is None or row[ts_key] >= cutoff:
+                break
+            old.append(row)
+        if not old:
+            break
+
+        by_month = {}
+        for row in old:
+            by_month.setdefault(row[ts_key].strftime("%Y-%m"), []).append(_encode(row))
+        for month, lines in by_month.items():
+            _append(_path(archive_dir, table, month), lines)
+
+        ids = [row["id"] for row in old]
+        if table == "logs":
+            # ON DELETE CASCADE covers this on MySQL; explicit for engines without FK enforcement
+            db.session.execute(delete(Activity.__table__).where(Activity.id.in_(ids)))
+            uncount_unread(db.session, [(row["id"], row["owner_user_id"]) for row in old])
+            count_archived_logs(db.session, old)
+        db.session.execute(delete(model.__table__).where(model.id.in_(ids)))
+        db.session.commit()
+
+        moved += len(ids)
+        log(f"  archived {table} up to #{ids[-1]} ({moved} so far)")
+        if len(old) < len(rows) or len(rows) < chunk_size:
+            break
+    return moved
+
+
+def _log_metrics(row) -> list[str]:
+    """The /series metrics a log counts towards (the same rules as series._metric_query)."""
+    metrics = ["events"]
+    if row["status"] == "done" and "status" in (row["event"] or ""):
+        metrics.append("completed")
+    if row["error_message"] is not None or row["status"] == "failed":
+        metrics.append("errors")
+    return metrics
+
+
+def count_archived_logs(session, rows) -> None:
+    """Add archived log rows (dicts with datetime timestamps) to archived_log_counts."""
+    counts = Counter()
+    for row in rows:
+        if row["owner_user_id"] is None or row["timestamp"] is None:
+            continue  # no task or workflow: never in the series either
+        hour = row["timestamp"].replace(minute=0, second=0, microsecond=0)
+        for metric in _log_metrics(row):
+            counts[(row["owner_user_id"], row["workflow_id"], hour, metric)] += 1
+    add_counts(session, ArchivedLogCount.__table__, ["owner_user_id", "workflow_id", "hour", "metric"],
+               [{"owner_user_id": o, "workflow_id": w, "hour": h, "metric": m, "log_count": n}
+                for (o, w, h, m), n in sorted(counts.items())], ["log_count"])
+
+
+def recount_archived_logs(archive_dir: str, log=print) -> int:
+    """
+    Rebuild archived_log_counts from the log archive files, one month per
+    transaction (for archives written before the table existed). Returns
+    the number of logs counted.
+    """
+    db.session.execute(delete(ArchivedLogCount.__table__))
+    db.session.commit()
+    folder = os.path.join(archive_dir, "logs")
+    months = sorted(name[len("logs-"):len("logs-YYYY-MM")] for name in os.listdir(folder)
+                    if name.startswith("logs-")) if os.path.isdir(folder) else []
+    done = 0
+    for month in months:
+        start = datetime.strptime(month, "%Y-%m")
+        end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+        rows = [dict(row, timestamp=datetime.fromisoformat(row["timestamp"]))
+                for row in read_archive("logs", start, end, archive_dir)]
+        count_archived_logs(db.session, rows)
+        db.session.commit()
+        done += len(rows)
+        log(f"  counted archived logs for {month} ({done} so far)")
+    return done
+
+
+def _months(since: datetime, until: datetime):
+    y, m = since.year, since.month
+    while (y, m) <= (until.year, until.month):
+        yield f"{y:04d}-{m:02d}"
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+def read_archive(table: str, since: datetime, until: datetime, archive_dir: str, where=None):
+    """Yield archived rows (dicts) with since <= timestamp < until, oldest month first."""
+    ts_key = _ts_field(table)
+    for month in _months(since, until):
+        path = _path(archive_dir, table, month)
+        if not os.path.exists(path):
+            continue
+        seen = set()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                if row["id"] in seen:
+                    continue
+                seen.add(row["id"])
+                ts = datetime.fromisoformat(row[ts_key])
+                if since <= ts < until and (where is None or where(row)):
+                    yield row
@@ -0,0 +1,33 @@
+import argparse
+from app import create_app
+from app.retention import TABLES, archive_table, recount_archived_logs
+from app.analytics.sketches import prune_service_stats
+from app.tasks.sync import prune_tombstones
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old logs/api_events/login_attempts rows into monthly gzip JSONL archives.")
+    parser.add_argument("--table", choices=list(TABLES), action="append", help="repeatable; default all")
+    parser.add_argument("--days", type=int, help="keep this many days in the database (default RETENTION_DAYS)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="rows per transaction")
+    parser.add_argument("--recount-logs", action="store_true",
+                        help="only rebuild archived_log_counts from the logs archive files")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.recount_logs:
+            n = recount_archived_logs(app.config["ARCHIVE_DIR"])
+            print(f"Counted {n} archived logs.")
+            return
+        days = args.days if args.days is not None else app.config["RETENTION_DAYS"]
+        for table in args.table or list(TABLES):
+            n = archive_table(table, days, app.config["ARCHIVE_DIR"], chunk_size=max(args.chunk_size, 1))
+            print(f"Archived {n} {table} rows older than {days} days.")
+        if not args.table:
+            # Aggregates only; not archived
+            print(f"Pruned {prune_service_stats(days)} service_stats buckets older than {days} days.")
+            tomb_days = app.config["TASK_TOMBSTONE_DAYS"]
+            print(f"Pruned {prune_tombstones(tomb_days)} task tombstones older than {tomb_days} days.")
+
+if __name__ == "__main__":
+    main()
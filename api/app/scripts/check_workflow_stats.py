@@ -0,0 +1,17 @@
+import argparse
+from app import create_app
+from app.analytics.counters import check_workflow_stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare workflow_stats counters with tasks and optionally repair drift.")
+    parser.add_argument("--repair", action="store_true", help="rewrite drifted/missing rows")
+    parser.add_argument("--chunk-size", type=int, default=500, help="workflows per transaction")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        summary = check_workflow_stats(repair=args.repair, chunk_size=max(args.chunk_size, 1))
+    print("workflow_stats: " + ", ".join(f"{k}={v}" for k, v in summary.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import sys
+
+from app import create_app
+from app.extensions import db
+from app.models import User, Workflow
+from app.tasks.importer import TaskImportError, import_rows, read_rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Import tasks into a workflow from a CSV or NDJSON file.")
+    parser.add_argument("path", help="file to import, or - for stdin")
+    parser.add_argument("--workflow-id", type=int, required=True)
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from the file extension")
+    parser.add_argument("--actor-email", help="user recorded on the created logs")
+    parser.add_argument("--rules", action="store_true", help="run the workflow's rules on the new tasks")
+    parser.add_argument("--chunk-size", type=int, help="rows per transaction (default TASK_IMPORT_CHUNK)")
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    app = create_app()
+    with app.app_context():
+        wf = db.session.get(Workflow, args.workflow_id)
+        if not wf:
+            sys.exit(f"Workflow #{args.workflow_id} not found.")
+        actor_id = None
+        if args.actor_email:
+            actor = User.query.filter_by(email=args.actor_email.lower()).first()
+            if not actor:
+                sys.exit(f"User {args.actor_email} not found.")
+            actor_id = actor.id
+
+        stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+        with stream:
+            try:
+                rows = read_rows(stream, fmt)
+            except TaskImportError as e:
+                sys.exit(str(e))
+            chunk_size = max(args.chunk_size or app.config["TASK_IMPORT_CHUNK"], 1)
+            for ev in import_rows(wf, rows, actor_id=actor_id, run_rules=args.rules, chunk_size=chunk_size):
+                if ev["type"] == "error":
+                    print(f"  line {ev['line']}: {ev['error']}")
+                elif ev["type"] == "progress":
+                    print(f"  {ev['rows']} rows read, {ev['created']} created, {ev['failed']} failed")
+                else:
+                    print(f"Imported {ev['created']} of {ev['rows']} rows into workflow #{args.workflow_id} ({ev['failed']} failed).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import argparse
+from app import create_app
+from app.activity import rebuild_activity
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill/rebuild the activity feed table from logs.")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="logs per transaction")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        n = rebuild_activity(chunk_size=max(args.chunk_size, 1))
+        print(f"Rebuilt activity for {n} logs.")
+
+if __name__ == "__main__":
+    main()
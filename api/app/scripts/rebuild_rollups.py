@@ -0,0 +1,16 @@
+import argparse
+from app import create_app
+from app.analytics.rollup import rebuild_daily_rollup
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill/rebuild the task_daily_rollup table from tasks.")
+    parser.add_argument("--chunk-size", type=int, default=200, help="workflows per transaction")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        n = rebuild_daily_rollup(chunk_size=max(args.chunk_size, 1))
+        print(f"Rebuilt task_daily_rollup for {n} workflows.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import argparse
+from app import create_app
+from app.analytics.sketches import rebuild_service_stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill/rebuild service_stats and service_duration_bins from logs.")
+    parser.add_argument("--days", type=int, default=30, help="how far back to count logs")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="logs per transaction")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        n = rebuild_service_stats(days=max(args.days, 1), chunk_size=max(args.chunk_size, 1))
+        print(f"Rebuilt service stats from {n} logs.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Re-encrypt Fernet-encrypted integration credentials under the primary key.
+
+Rotation procedure:
+  1. Deploy with INTEGRATION_KEY="<new key>,<old key>" (new key first).
+  2. Run: python -m app.scripts.rotate_integration_key
+  3. Deploy with INTEGRATION_KEY="<new key>" once the run reports no failures.
+
+The integrations table is streamed in primary-key order and every chunk is
+committed on its own, so the API keeps serving traffic while this runs.
+Progress is checkpointed to a file; re-running under the same primary key
+resumes after the last committed id and keeps the earlier totals, so the
+final report always covers the whole table. A checkpoint written under a
+different primary key is ignored, and a completed run removes it. Rows
+holding plain JSON (GitHub, Jira) are left untouched.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy import bindparam, select, update
+
+from app import create_app
+from app.extensions import db
+from app.models import Integration, _fernet, _integration_keys
+
+DEFAULT_CHECKPOINT = ".rotate_integration_key.checkpoint"
+
+
+def _key_fingerprint(key) -> str:
+    """Identifies the primary key in the checkpoint without storing it."""
+    raw = key.encode() if isinstance(key, str) else key
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def _load_checkpoint(path: str, fingerprint: str) -> tuple[int, dict | None]:
+    """-> (last_id, totals so far); (0, None) without a checkpoint for this primary key."""
+    try:
+        with open(path) as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return 0, None
+    if not isinstance(data, dict) or data.get("key") != fingerprint:
+        print(f"Ignoring {path}: it was written under a different primary key")
+        return 0, None
+    try:
+        return int(data.get("last_id") or 0), dict(data.get("totals") or {})
+    except (TypeError, ValueError):
+        return 0, None
+
+
+def _save_checkpoint(path: str, fingerprint: str, last_id: int, totals: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump({"key": fingerprint, "last_id": last_id, "totals": totals, "updated_at": time.time()}, fh)
+    os.replace(tmp, path)
+
+
+def _clear_checkpoint(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _rotate_row(fernet, primary, row):
+    """Returns (id, old_blob, new_blob_or_None, outcome)."""
+    rid, blob = row
+    if not blob or blob.lstrip().startswith("{"):
+        return rid, blob, None, "plaintext"
+    token = blob.encode()
+    try:
+        primary.decrypt(token)
+        return rid, blob, None, "current"
+    except InvalidToken:
+        pass
+    try:
+        return rid, blob, fernet.rotate(token).decode(), "rotated"
+    except InvalidToken:
+        return rid, blob, None, "unreadable"
+
+
+def rotate(chunk_size: int, workers: int, checkpoint: str, pause: float = 0.0) -> dict:
+    fernet = _fernet()
+    primary_key = _integration_keys()[0]
+    primary = Fernet(primary_key)
+    fingerprint = _key_fingerprint(primary_key)
+    table = Integration.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"), table.c.credentials == bindparam("b_old"))
+        .values(credentials=bindparam("b_new"))
+    )
+
+    last_id, previous = _load_checkpoint(checkpoint, fingerprint)
+    totals = {"scanned": 0, "rotated": 0, "current": 0, "plaintext": 0, "unreadable": 0, "raced": 0}
+    scanned_before = 0
+    if last_id and previous is not None:
+        # Resuming: the earlier runs' counts are part of this rotation's report
+        for k in totals:
+            totals[k] = int(previous.get(k) or 0)
+        scanned_before = totals["scanned"]
+    started = time.monotonic()
+    print(f"Starting after id {last_id} (chunk={chunk_size}, workers={workers})")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            # Each chunk is its own short primary-key range read, so no read
+            # view or cursor stays open across the whole table.
+            with db.engine.connect() as reader:
+                chunk = reader.execute(
+                    select(table.c.id, table.c.credentials)
+                    .where(table.c.id > last_id)
+                    .order_by(table.c.id)
+                    .limit(chunk_size)
+                ).all()
+            if not chunk:
+                break
+            chunk_started = time.monotonic()
+            outcomes = list(pool.map(lambda r: _rotate_row(fernet, primary, tuple(r)), chunk))
+
+            params = [{"b_id": rid, "b_old": old, "b_new": new}
+                      for rid, old, new, outcome in outcomes if outcome == "rotated"]
+            updated = 0
+            if params:
+                # Short transaction per chunk; rows the API rewrote meanwhile are
+                # skipped by the credentials match and already use a live key.
+                with db.engine.begin() as conn:
+                    updated = conn.execute(stmt, params).rowcount
+
+            for _, _, _, outcome in outcomes:
+                totals[outcome] += 1
+            totals["scanned"] += len(outcomes)
+            if 0 <= updated < len(params):
+                totals["raced"] += len(params) - updated
+                totals["rotated"] -= len(params) - updated
+
+            last_id = outcomes[-1][0]
+            _save_checkpoint(checkpoint, fingerprint, last_id, totals)
+
+            elapsed = max(time.monotonic() - chunk_started, 1e-6)
+            print(f"  up to id {last_id}: {len(outcomes)} rows, {len(params)} re-encrypted "
+                  f"({len(outcomes) / elapsed:.0f} rows/s)")
+            if pause:
+                time.sleep(pause)
+
+    # Completed: the next rotation (with a new key) must start from the beginning
+    _clear_checkpoint(checkpoint)
+    elapsed = max(time.monotonic() - started, 1e-6)
+    totals["rows_per_sec"] = round((totals["scanned"] - scanned_before) / elapsed, 1)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between chunks")
+    parser.add_argument("--reset", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    if args.reset and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    app = create_app()
+    with app.app_context():
+        totals = rotate(max(args.chunk_size, 1), max(args.workers, 1), args.checkpoint, args.pause)
+
+    print("Done: " + ", ".join(f"{k}={v}" for k, v in totals.items()))
+    if totals["unreadable"]:
+        print("Some rows could not be decrypted with any configured key; keep the old key until they are fixed.")
+    else:
+        print("Every row is readable under the primary key; the old key can be removed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Full-text search over task log events (via the activity feed table) and API
+error messages.
+
+MySQL uses FULLTEXT indexes (ft_activity_text, ft_api_events_error) and
+MATCH ... AGAINST in boolean mode; InnoDB keeps them current on insert.
+SQLite (dev/tests) uses external-content FTS5 tables kept in step by
+triggers. Both are created right after their base table by create_all().
+Existing MySQL databases get them from the migration; existing SQLite ones
+from ensure_fts_tables() at startup, which also indexes the rows already
+there. Other dialects fall back to LIKE, unranked.
+
+Results are ordered by relevance (then id) and keyset-paginated on that
+pair, or newest first with sort=recent.
+"""
+import re
+
+from sqlalchemy import DDL, and_, column, event, literal_column, or_
+from sqlalchemy import table as sa_table
+from sqlalchemy.dialects.mysql import match
+
+from .extensions import db
+from .models import Activity, ApiEvent
+
+MAX_TERMS = 8
+
+# table -> (fts table, indexed columns)
+INDEXED = {
+    "activity": ("activity_fts", ["event", "error_message"]),
+    "api_events": ("api_events_fts", ["error_message"]),
+}
+
+
+def _sqlite_ddl(table_name: str) -> list[str]:
+    """FTS5 table and sync triggers for table_name; every statement is IF NOT EXISTS."""
+    fts, cols = INDEXED[table_name]
+    listed = ", ".join(cols)
+    new = ", ".join(f"new.{c}" for c in cols)
+    old = ", ".join(f"old.{c}" for c in cols)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({listed}, content='{table_name}', "
+        f"content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {listed}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {listed}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {listed} ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {listed}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {listed}) VALUES (new.id, {new}); END",
+    ]
+
+
+def _register_ddl(model, fulltext_name: str):
+    table = model.__table__
+    listed = ", ".join(INDEXED[table.name][1])
+    event.listen(table, "after_create",
+                 DDL(f"ALTER TABLE {table.name} ADD FULLTEXT INDEX {fulltext_name} ({listed})").execute_if(dialect="mysql"))
+    for stmt in _sqlite_ddl(table.name):
+        event.listen(table, "after_create", DDL(stmt).execute_if(dialect="sqlite"))
+
+
+_register_ddl(Activity, "ft_activity_text")
+_register_ddl(ApiEvent, "ft_api_events_error")
+
+
+def ensure_fts_tables(connection) -> None:
+    """
+    Create missing FTS5 tables and triggers on an existing SQLite database
+    (after_create only fires for new tables), then index the rows already
+    in their base table.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    for table_name, (fts, _) in INDEXED.items():
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)).first()
+        for stmt in _sqlite_ddl(table_name):
+            connection.exec_driver_sql(stmt)
+        if not exists:
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+class SearchError(ValueError):
+    pass
+
+
+def terms(q: str) -> list[str]:
+    words = re.findall(r"\w+", q or "")[:MAX_TERMS]
+    if not words:
+        raise SearchError("q must contain at least one word")
+    return words
+
+
+def _text_match(model, query, words: list[str]):
+    """-> (query restricted to rows containing every word as a prefix, score or None)"""
+    table = model.__table__
+    fts, cols = INDEXED[table.name]
+    columns = [table.c[c] for c in cols]
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "mysql":
+        score = match(*columns, against=" ".join(f"+{w}*" for w in words)).in_boolean_mode()
+        return query.where(score > 0), score
+    if dialect == "sqlite":
+        ft = sa_table(fts, column("rowid"), column("rank"))
+        query = (query.join(ft, ft.c.rowid == table.c.id)
+                 .where(literal_column(fts).op("MATCH")(" ".join(f'"{w}"*' for w in words))))
+        return query, -ft.c.rank  # FTS5 rank is bm25(), lower is better
+    return query.where(and_(*(or_(*(c.contains(w, autoescape=True) for c in columns)) for w in words))), None
+
+
+def search(model, query, words: list[str], cursor: dict, sort: str = "rank"):
+    """
+    Apply the text match, the cursor's ordering/keyset and limit (+1) to a
+    select over `model`. -> (select, has_score). Cursor keys: limit,
+    before_id, rank (the last row's rank when sort=rank).
+    """
+    query, score = _text_match(model, query, words)
+    id_col = model.__table__.c.id
+    if sort == "rank" and score is not None:
+        query = query.add_columns(score.label("rank"))
+        if cursor.get("rank") is not None and cursor.get("before_id"):
+            query = query.where(or_(score < cursor["rank"],
+                                    and_(score == cursor["rank"], id_col < cursor["before_id"])))
+        query = query.order_by(score.desc(), id_col.desc())
+    else:
+        if cursor.get("before_id"):
+            query = query.where(id_col < cursor["before_id"])
+        query = query.order_by(id_col.desc())
+    return query.limit(cursor["limit"] + 1), sort == "rank" and score is not None
@@ -0,0 +1,170 @@
+"""
+Bulk task writes (POST /api/tasks/bulk).
+
+A batch is a list of create/update/delete operations whose fields are the
+single task routes' bodies. Each operation is validated and authorized up
+front; tasks and workflows are loaded with one query each. Rejected
+operations are reported by index and do not stop the rest. The accepted
+ones are applied in one transaction:
+
+  - the task rows are written in one flush;
+  - their `created`/change logs are added together;
+  - each touched workflow's rules are loaded once and evaluated once per task
+    the batch created or updated;
+  - there is a single commit.
+
+After the commit every workflow owner gets one Slack message that
+summarizes the batch and quotes the rules' notify_slack messages.
+"""
+from collections import Counter, defaultdict
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..extensions import db
+from ..models import Log, Task, Workflow, WorkflowRule
+from ..workflows.routes import _apply_rules, _change_text, _notify, _task_fields, _task_snapshot
+
+OPS = ("create", "update", "delete")
+# Rule messages quoted in one summary before it says "and N more"
+MAX_NOTES = 10
+
+
+def _positive_int(value) -> int | None:
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+        return None
+    return value
+
+
+def _check_op(op) -> tuple[dict | None, tuple[int, str] | None]:
+    """-> (parsed op, None) or (None, (status, error)) without touching the database"""
+    if not isinstance(op, dict):
+        return None, (422, "each operation must be a JSON object")
+    kind = op.get("op")
+    if kind not in OPS:
+        return None, (422, f"op must be one of: {', '.join(OPS)}")
+    key = "workflow_id" if kind == "create" else "id"
+    target = _positive_int(op.get(key))
+    if target is None:
+        return None, (422, f"{key} is required")
+    fields = {}
+    if kind != "delete":
+        fields, error = _task_fields(op, partial=kind == "update")
+        if error:
+            return None, (422, error)
+    return {"op": kind, "target": target, "fields": fields}, None
+
+
+def _summary(wf: Workflow, counts: Counter) -> str:
+    parts = [f"{counts[op]} {label}" for op, label in
+             (("create", "created"), ("update", "updated"), ("delete", "deleted")) if counts[op]]
+    return f"*{wf.name}*: {', '.join(parts)}"
+
+
+def apply_ops(user, ops: list) -> dict:
+    """Apply a batch for `user`; returns the response body with a result per operation, by index."""
+    results, parsed = [], []
+    for index, op in enumerate(ops):
+        item, err = _check_op(op)
+        if err:
+            results.append({"index": index, "ok": False, "status": err[0], "error": err[1]})
+        else:
+            parsed.append((index, item))
+
+    task_ids = {p["target"] for _, p in parsed if p["op"] != "create"}
+    tasks = {t.id: t for t in Task.query.filter(Task.id.in_(task_ids))} if task_ids else {}
+    wf_ids = {p["target"] for _, p in parsed if p["op"] == "create"} | {t.workflow_id for t in tasks.values()}
+    workflows = {w.id: w for w in Workflow.query.filter(Workflow.id.in_(wf_ids))} if wf_ids else {}
+
+    def allowed(wf):
+        return user.role == "admin" or wf.user_id == user.id
+
+    # (index, op, task, log event, status at that point)
+    applied, deleted, counts = [], set(), defaultdict(Counter)
+    for index, p in parsed:
+        if p["op"] == "create":
+            wf = workflows.get(p["target"])
+            if wf is None:
+                results.append({"index": index, "ok": False, "status": 404, "error": "Workflow not found"})
+                continue
+        else:
+            t = tasks.get(p["target"])
+            if t is None or t.id in deleted:
+                results.append({"index": index, "ok": False, "status": 404, "error": "Task not found"})
+                continue
+            wf = workflows[t.workflow_id]
+        if not allowed(wf):
+            results.append({"index": index, "ok": False, "status": 403, "error": "Forbidden"})
+            continue
+
+        if p["op"] == "create":
+            t = Task(workflow_id=wf.id, **p["fields"])
+            db.session.add(t)
+            applied.append((index, "create", t, "created", t.status))
+        elif p["op"] == "update":
+            before = _task_snapshot(t)
+            for key, value in p["fields"].items():
+                setattr(t, key, value)
+            applied.append((index, "update", t, _change_text(before, _task_snapshot(t)), t.status))
+        else:
+            db.session.delete(t)
+            deleted.add(t.id)
+            applied.append((index, "delete", t, None, None))
+        counts[wf.id][p["op"]] += 1
+
+    if not applied:
+        results.sort(key=lambda r: r["index"])
+        return {"ok": True, "applied": 0, "rejected": len(results), "items": results}
+
+    notes, texts = defaultdict(list), defaultdict(list)
+    try:
+        db.session.flush()  # ids for the created tasks
+        live = [a for a in applied if a[1] != "delete" and a[2].id not in deleted]
+        db.session.add_all([Log(task_id=t.id, event=event, status=status, actor_id=user.id)
+                            for _, _, t, event, status in live])
+
+        rules = defaultdict(list)
+        rule_wf_ids = {t.workflow_id for _, _, t, _, _ in live}
+        if rule_wf_ids:
+            for rule in WorkflowRule.query.filter(WorkflowRule.workflow_id.in_(rule_wf_ids)).order_by(WorkflowRule.id):
+                rules[rule.workflow_id].append(rule)
+        events = {}
+        for _, op, t, _, _ in live:
+            events.setdefault(t, "created" if op == "create" else "updated")
+        for t, event in events.items():
+            _apply_rules(t, event=event, rules=rules[t.workflow_id], notes=notes[workflows[t.workflow_id].user_id])
+
+        db.session.flush()  # rule changes, so the returned items carry the final values
+        for index, op, t, _, _ in applied:
+            item = {"index": index, "ok": True, "op": op, "id": t.id}
+            if op != "delete" and t.id not in deleted:
+                item["item"] = t.to_public()
+            results.append(item)
+        for wf_id, n in counts.items():
+            texts[workflows[wf_id].user_id].append(_summary(workflows[wf_id], n))
+        db.session.commit()
+        # Versions are stamped at commit (tasks/sync.py)
+        items = {r["id"]: r["item"] for r in results if r["ok"] and "item" in r}
+        if items:
+            for task_id, version in db.session.execute(select(Task.id, Task.version).where(Task.id.in_(items))):
+                items[task_id]["version"] = version
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception("Bulk task write failed")
+        results = [r for r in results if not r["ok"]]
+        results.extend({"index": index, "ok": False, "status": 500, "error": "write failed"}
+                       for index, *_ in applied)
+        texts.clear()
+
+    for owner, lines in texts.items():
+        quoted = notes[owner][:MAX_NOTES]
+        if len(notes[owner]) > MAX_NOTES:
+            quoted.append(f"…and {len(notes[owner]) - MAX_NOTES} more rule notifications")
+        _notify(owner, "\n".join([":package: Bulk task changes", *lines, *quoted]))
+
+    results.sort(key=lambda r: r["index"])
+    ok = sum(1 for r in results if r["ok"])
+    return {"ok": True, "applied": ok, "rejected": len(results) - ok, "items": results}
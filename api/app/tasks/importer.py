@@ -0,0 +1,185 @@
+"""
+Streaming task import into one workflow (POST /api/tasks/import and
+python -m app.scripts.import_tasks).
+
+The input is CSV (header row, columns name,status,assigned_to,due_date) or
+NDJSON (one object per line), read row by row. Each row is validated like a
+create_task body. Valid rows are buffered up to `chunk_size` and then written
+in one transaction per chunk:
+
+  - one multi-row INSERT for the tasks;
+  - one for their `created` logs;
+  - the flush hooks run once for the whole chunk via changes.dispatch().
+
+MySQL cannot return the ids of a multi-row INSERT. Each chunk therefore
+first locks the workflow row, then reads MAX(tasks.id), then selects
+`workflow_id = wf AND id > that max`. While the lock is held, the foreign key
+check stops any other transaction from adding a task to the workflow, so
+those are exactly the chunk's rows, in insert order.
+
+With run_rules the workflow's rules are loaded once and evaluated for every
+chunk's new tasks before it commits. import_rows() yields progress and
+per-row errors as it goes; memory stays flat however large the file is.
+"""
+import csv
+import io
+import json
+
+from flask import current_app
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..changes import ChangeSet, TaskState, dispatch
+from ..extensions import db
+from ..models import Log, Task, Workflow, WorkflowRule
+from ..workflows.routes import _apply_rules, _notify, _task_fields
+
+FORMATS = ("csv", "ndjson")
+# Rule messages quoted in the final summary before it says "and N more"
+MAX_NOTES = 10
+
+
+class TaskImportError(ValueError):
+    pass
+
+
+def read_rows(stream, fmt: str):
+    """
+    (line number, row dict or error string) pairs from a binary stream. The
+    CSV header is checked right away (raises TaskImportError); rows are
+    read lazily.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        try:
+            fieldnames = reader.fieldnames
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise TaskImportError(f"unreadable CSV header: {e}")
+        if not fieldnames or "name" not in fieldnames:
+            raise TaskImportError("CSV needs a header row with at least a name column")
+        return _csv_rows(reader)
+    return _ndjson_rows(text)
+
+
+def _csv_rows(reader):
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield reader.line_num + 1, f"unreadable CSV, import stopped: {e}"
+
+
+def _ndjson_rows(text):
+    line_no = 0
+    try:
+        for line_no, line in enumerate(text, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, "invalid JSON"
+                continue
+            yield line_no, row if isinstance(row, dict) else "each line must be a JSON object"
+    except UnicodeDecodeError as e:
+        yield line_no + 1, f"not UTF-8, import stopped: {e}"
+
+
+def _insert_chunk(workflow_id: int, owner_id: int, chunk: list, actor_id: int | None) -> list[int]:
+    """Insert chunk [(line, fields)] and its logs; returns the new task ids in chunk order."""
+    session = db.session
+    session.execute(select(Workflow.id).where(Workflow.id == workflow_id).with_for_update())
+    last_id = session.execute(select(func.max(Task.id))).scalar() or 0
+
+    session.execute(insert(Task.__table__), [dict(fields, workflow_id=workflow_id) for _, fields in chunk])
+    rows = session.execute(select(Task.id, Task.created_at).where(Task.workflow_id == workflow_id, Task.id > last_id)
+                           .order_by(Task.id)).all()
+    ids = [tid for tid, _ in rows]
+    if len(ids) != len(chunk):
+        raise RuntimeError(f"expected {len(chunk)} new tasks in workflow {workflow_id}, found {len(ids)}")
+
+    session.execute(insert(Log.__table__), [{"task_id": tid, "actor_id": actor_id, "event": "created",
+                                             "status": fields["status"]} for tid, (_, fields) in zip(ids, chunk)])
+
+    # Inserted outside the unit of work, so hand the hooks the changes ourselves
+    changes = ChangeSet()
+    changes.tasks = [(None, TaskState(task_id=tid, workflow_id=workflow_id, owner_user_id=owner_id,
+                                      name=fields["name"], status=fields["status"],
+                                      assigned_to=fields["assigned_to"], due_date=fields["due_date"],
+                                      day=created_at.date() if created_at else None))
+                     for (tid, created_at), (_, fields) in zip(rows, chunk)]
+    changes.new_logs = session.execute(select(Log).where(Log.task_id.in_(ids))).scalars().all()
+    dispatch(session, changes)
+    return ids
+
+
+def import_rows(workflow: Workflow, rows, actor_id: int | None = None, run_rules: bool = False,
+                chunk_size: int = 1000, max_rows: int | None = None):
+    """
+    Import (line, row) pairs into `workflow`, committing every chunk_size
+    valid rows; a chunk that fails to write is rolled back and reported
+    without stopping the import. Yields {"type": "error", "line", "error"}
+    for every rejected row, {"type": "progress", ...} after every chunk and
+    a final {"type": "done", ...}.
+    """
+    workflow_id, owner_id, workflow_name = workflow.id, workflow.user_id, workflow.name
+    rules = []
+    if run_rules:
+        rules = WorkflowRule.query.filter_by(workflow_id=workflow_id).order_by(WorkflowRule.id).all()
+    notes, note_count = [], 0
+    totals = {"rows": 0, "created": 0, "failed": 0}
+
+    def flush(chunk):
+        nonlocal note_count
+        try:
+            ids = _insert_chunk(workflow_id, owner_id, chunk, actor_id)
+            if rules:
+                chunk_notes = []
+                for t in Task.query.filter(Task.id.in_(ids)).order_by(Task.id):
+                    _apply_rules(t, event="created", rules=rules, notes=chunk_notes)
+                note_count += len(chunk_notes)
+                notes.extend(chunk_notes[:MAX_NOTES - len(notes)])
+            db.session.commit()
+        except (SQLAlchemyError, RuntimeError):
+            db.session.rollback()
+            current_app.logger.exception("Task import chunk failed")
+            totals["failed"] += len(chunk)
+            for line, _ in chunk:
+                yield {"type": "error", "line": line, "error": "write failed"}
+            return
+        totals["created"] += len(chunk)
+
+    chunk, truncated = [], False
+    for line, row in rows:
+        if max_rows is not None and totals["rows"] >= max_rows:
+            truncated = True
+            break
+        totals["rows"] += 1
+        fields, error = (_task_fields(row) if isinstance(row, dict) else ({}, row))
+        if error:
+            totals["failed"] += 1
+            yield {"type": "error", "line": line, "error": error}
+            continue
+        chunk.append((line, fields))
+        if len(chunk) >= chunk_size:
+            yield from flush(chunk)
+            chunk = []
+            yield {"type": "progress", **totals}
+    if chunk:
+        yield from flush(chunk)
+
+    if totals["created"]:
+        text = f":inbox_tray: Imported {totals['created']} tasks into *{workflow_name}*"
+        if totals["failed"]:
+            text += f" ({totals['failed']} rows rejected)"
+        if note_count > len(notes):
+            notes.append(f"…and {note_count - len(notes)} more rule notifications")
+        _notify(owner_id, "\n".join([text, *notes]))
+
+    done = {"type": "done", **totals}
+    if truncated:
+        done["truncated"] = True
+        done["error"] = f"Stopped after {max_rows} rows"
+    yield done
@@ -0,0 +1,187 @@
+"""
+Filtered, projected, keyset-paginated task listing (GET /api/tasks).
+
+Sort orders and the indexes that serve them (InnoDB appends the primary key
+to every secondary index, so each of these is effectively (..., id)):
+
+    due      due_date, id; undated tasks last   ix_tasks_due_date,
+             ix_tasks_workflow_due (one workflow_id), ix_tasks_assigned_due
+    created  created_at DESC, id DESC           ix_tasks_created_at,
+             ix_tasks_workflow_created (one workflow_id)
+    id       id DESC                            primary key
+
+A page reads limit + 1 rows from one index range that starts right after
+the cursor's key (for `due`: dated tasks first, then undated ones by id, two
+ranges). Status and due-date filters narrow the same scan. Non-admins are
+scoped with workflow_id IN (their workflows), so the workflows table is only
+joined when the `workflow` field is requested.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from ..extensions import db
+from ..models import Task, Workflow
+from ..pagination import CursorError, after_key, decode_token, encode_token
+
+FIELDS = ("id", "name", "status", "assigned_to", "due_date", "created_at", "workflow", "version")
+SORTS = ("due", "created", "id")
+MAX_FILTER_VALUES = 50
+
+
+class ListError(ValueError):
+    pass
+
+
+def _multi(args, name: str) -> list[str]:
+    """?name=a,b&name=c -> [a, b, c] (deduplicated, order kept)."""
+    values = []
+    for raw in args.getlist(name):
+        for v in raw.split(","):
+            v = v.strip()
+            if v and v not in values:
+                values.append(v)
+    if len(values) > MAX_FILTER_VALUES:
+        raise ListError(f"at most {MAX_FILTER_VALUES} {name} values")
+    return values
+
+
+def _day(value: str | None, name: str) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ListError(f"{name} must be an ISO date (YYYY-MM-DD)")
+
+
+def parse_list_args(args) -> dict:
+    """Read limit/sort/cursor/fields and the filters; raises ListError or CursorError."""
+    try:
+        limit = int(args.get("limit", 50))
+    except (TypeError, ValueError):
+        raise ListError("limit must be an integer")
+    sort = args.get("sort", "due")
+    if sort not in SORTS:
+        raise ListError(f"sort must be one of: {', '.join(SORTS)}")
+    fields = _multi(args, "fields") or list(FIELDS)
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise ListError(f"unknown fields: {', '.join(unknown)} (allowed: {', '.join(FIELDS)})")
+    try:
+        workflow_ids = [int(w) for w in _multi(args, "workflow_id")]
+    except ValueError:
+        raise ListError("workflow_id must be integers")
+
+    cursor = None
+    if args.get("cursor"):
+        cursor = decode_token(args["cursor"])
+        if not cursor or cursor[0] != sort:
+            raise CursorError("cursor belongs to a different sort")
+        cursor = cursor[1:]
+
+    return {
+        "limit": max(1, min(limit, 500)),
+        "sort": sort,
+        "cursor": cursor,
+        "fields": fields,
+        "statuses": _multi(args, "status"),
+        "assigned_to": (args.get("assigned_to") or "").strip() or None,
+        "workflow_ids": workflow_ids,
+        "due_from": _day(args.get("due_from"), "due_from"),
+        "due_to": _day(args.get("due_to"), "due_to"),
+    }
+
+
+def _base(scope, opts):
+    # The sort keys are always selected (for the cursor) even when not returned
+    cols = [Task.id, Task.due_date, Task.created_at]
+    cols += [getattr(Task, f) for f in opts["fields"] if f not in ("workflow", "id", "due_date", "created_at")]
+    if "workflow" in opts["fields"]:
+        stmt = (select(Task.workflow_id, Workflow.name.label("workflow_name"), *cols)
+                .join(Workflow, Task.workflow_id == Workflow.id))
+    else:
+        stmt = select(*cols)
+    if scope.role != "admin":
+        stmt = stmt.where(Task.workflow_id.in_(select(Workflow.id).where(Workflow.user_id == scope.id)))
+    if opts["workflow_ids"]:
+        stmt = stmt.where(Task.workflow_id.in_(opts["workflow_ids"]))
+    if opts["statuses"]:
+        stmt = stmt.where(Task.status.in_(opts["statuses"]))
+    if opts["assigned_to"]:
+        stmt = stmt.where(Task.assigned_to == opts["assigned_to"])
+    if opts["due_from"]:
+        stmt = stmt.where(Task.due_date >= opts["due_from"])
+    if opts["due_to"]:
+        stmt = stmt.where(Task.due_date <= opts["due_to"])
+    return stmt
+
+
+def _cursor_values(cursor: list, kinds: str) -> list:
+    """Validate/convert cursor values; kinds: d = date or None, t = datetime, i = int."""
+    if len(cursor) != len(kinds):
+        raise CursorError("cursor is malformed")
+    try:
+        out = []
+        for v, k in zip(cursor, kinds):
+            if k == "i":
+                out.append(int(v))
+            elif k == "d":
+                out.append(None if v is None else date.fromisoformat(v))
+            else:
+                out.append(datetime.fromisoformat(v))
+        return out
+    except (TypeError, ValueError):
+        raise CursorError("cursor is malformed")
+
+
+def _run(stmt, n: int) -> list:
+    return db.session.execute(stmt.limit(n)).all()
+
+
+def list_page(scope, opts) -> tuple[list, dict]:
+    """-> (rows, {"next_cursor", "has_more"})"""
+    stmt, limit, cursor = _base(scope, opts), opts["limit"], opts["cursor"]
+
+    if opts["sort"] == "due":
+        due, last_id = _cursor_values(cursor, "di") if cursor else (None, None)
+        rows = []
+        if cursor is None or due is not None:
+            dated = stmt.where(Task.due_date.isnot(None))
+            if cursor:
+                dated = dated.where(after_key([Task.due_date, Task.id], [due, last_id]))
+            rows = _run(dated.order_by(Task.due_date, Task.id), limit + 1)
+        if len(rows) <= limit and not (opts["due_from"] or opts["due_to"]):
+            undated = stmt.where(Task.due_date.is_(None))
+            if cursor and due is None:
+                undated = undated.where(Task.id > last_id)
+            rows += _run(undated.order_by(Task.id), limit + 1 - len(rows))
+        key = ("due_date", "id")
+    elif opts["sort"] == "created":
+        if cursor:
+            stmt = stmt.where(after_key([Task.created_at, Task.id], _cursor_values(cursor, "ti"), descending=True))
+        rows = _run(stmt.order_by(Task.created_at.desc(), Task.id.desc()), limit + 1)
+        key = ("created_at", "id")
+    else:
+        if cursor:
+            stmt = stmt.where(Task.id < _cursor_values(cursor, "i")[0])
+        rows = _run(stmt.order_by(Task.id.desc()), limit + 1)
+        key = ("id",)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    nxt = encode_token([opts["sort"], *(getattr(rows[-1], k) for k in key)]) if has_more else None
+    return rows, {"next_cursor": nxt, "has_more": has_more}
+
+
+def project(row, fields: list[str]) -> dict:
+    out = {}
+    for f in fields:
+        if f == "workflow":
+            out["workflow"] = {"id": row.workflow_id, "name": row.workflow_name}
+        elif f in ("due_date", "created_at"):
+            v = getattr(row, f)
+            out[f] = v.isoformat() if v else None
+        else:
+            out[f] = getattr(row, f)
+    return out
@@ -1,7 +1,13 @@
-from flask import Blueprint, jsonify, request
+import json
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..extensions import db
 from ..models import User, Task, Workflow
+from ..pagination import CursorError
+from .bulk import apply_ops
+from .importer import FORMATS, TaskImportError, import_rows, read_rows
+from .listing import ListError, list_page, parse_list_args, project
+from .sync import SyncError, SyncExpired, changes_since, parse_cursor
 
 tasks_bp = Blueprint("tasks", __name__)
 
@@ -14,27 +20,130 @@ def _user():
 @tasks_bp.get("/")
 @jwt_required()
 def list_tasks():
+    """
+    One page of the tasks the caller can see (see tasks/listing.py).
+    Query params: limit (1..500, default 50), sort=due|created|id, cursor
+    (next_cursor of the previous page), fields=id,name,... (projection),
+    and filters status (repeatable or comma-separated), assigned_to,
+    workflow_id (repeatable), due_from/due_to (ISO dates, inclusive).
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    try:
+        opts = parse_list_args(request.args)
+        rows, meta = list_page(u, opts)
+    except (ListError, CursorError) as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    return jsonify({"ok": True, "items": [project(r, opts["fields"]) for r in rows], **meta})
+
+
+def _task_item(t: Task, workflow_name: str) -> dict:
+    return {
+        "id": t.id,
+        "name": t.name,
+        "status": t.status,
+        "assigned_to": t.assigned_to,
+        "due_date": t.due_date.isoformat() if t.due_date else None,
+        "workflow": {"id": t.workflow_id, "name": workflow_name},
+        "version": t.version,
+    }
+
+
+@tasks_bp.get("/changes")
+@jwt_required()
+def task_changes():
+    """
+    Delta sync. Without `since`: a full snapshot of the caller's tasks. With
+    `since=<version>` (the `version` of an earlier response): only tasks
+    created or updated after it in `items`, and tasks deleted or moved out
+    of the caller's view in `deleted`; apply `deleted` first. While has_more
+    is true, pass next_cursor as `cursor` (with the same since) for the
+    rest; afterwards keep `version` for the next call. 410 means since is
+    older than the kept tombstones and the client must resync from scratch.
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    limit = max(1, min(request.args.get("limit", 500, type=int), 2000))
+    since = request.args.get("since")
+    try:
+        since = int(since) if since not in (None, "") else None
+    except ValueError:
+        return jsonify({"ok": False, "error": "since must be an integer"}), 400
+    try:
+        out = changes_since(u, parse_cursor(request.args.get("cursor"), since), limit)
+    except SyncExpired as e:
+        return jsonify({"ok": False, "error": str(e)}), 410
+    except SyncError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    return jsonify({
+        "ok": True,
+        "items": [_task_item(t, wf_name) for t, wf_name in out["rows"]],
+        "deleted": [{"id": d.task_id, "version": d.version} for d in out["tombstones"]],
+        "version": out["version"],
+        "has_more": out["has_more"],
+        "next_cursor": out["next_cursor"],
+    })
+
+
+@tasks_bp.post("/bulk")
+@jwt_required()
+def bulk_tasks():
+    """
+    Apply many task changes in one transaction: a JSON array (or {"items":
+    [...]}) of {"op": "create", "workflow_id", ...fields}, {"op": "update",
+    "id", ...fields} or {"op": "delete", "id"}, with the fields of the single
+    task routes. Rules run once per task; each owner gets one Slack summary.
+    Returns a result per operation, by index (see tasks/bulk.py).
+    """
+    u = _user()
+    if not u:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    max_items = current_app.config["TASK_BULK_MAX_ITEMS"]
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        return jsonify({"ok": False, "error": "Body must be a JSON array of task operations"}), 400
+    if len(data) > max_items:
+        return jsonify({"ok": False, "error": f"At most {max_items} operations per batch"}), 413
+    return jsonify(apply_ops(u, data))
+
+
+_IMPORT_MIMETYPES = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+
+@tasks_bp.post("/import")
+@jwt_required()
+def import_tasks():
+    """
+    Stream a CSV (Content-Type: text/csv; header name,status,assigned_to,due_date)
+    or NDJSON body of new tasks into ?workflow_id=. Rows are validated like
+    create_task's body and inserted TASK_IMPORT_CHUNK at a time; ?rules=1 also
+    runs the workflow's rules on them. The response is NDJSON, written as the
+    import goes: an {"type": "error", "line", "error"} per rejected row, a
+    progress line per chunk and a final {"type": "done", ...}.
+    """
     u = _user()
     if not u:
         return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    wf = Workflow.query.get(request.args.get("workflow_id", type=int) or 0)
+    if not wf:
+        return jsonify({"ok": False, "error": "Workflow not found"}), 404
+    if u.role != "admin" and wf.user_id != u.id:
+        return jsonify({"ok": False, "error": "Forbidden"}), 403
+    fmt = request.args.get("format") or _IMPORT_MIMETYPES.get(request.mimetype)
+    if fmt not in FORMATS:
+        return jsonify({"ok": False, "error": "Send text/csv or application/x-ndjson (or pass format=csv|ndjson)"}), 415
+    try:
+        rows = read_rows(request.stream, fmt)
+    except TaskImportError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
 
-    status = (request.args.get("status") or "").strip() or None
-    q = (db.session.query(Task, Workflow)
-         .join(Workflow, Task.workflow_id == Workflow.id))
-    if u.role != "admin":
-        q = q.filter(Workflow.user_id == u.id)
-    if status:
-        q = q.filter(Task.status == status)
-    q = q.order_by(Task.due_date.is_(None), Task.due_date.asc(), Task.id.desc())
-
-    items = []
-    for t, wf in q.all():
-        items.append({
-            "id": t.id,
-            "name": t.name,
-            "status": t.status,
-            "assigned_to": t.assigned_to,
-            "due_date": t.due_date.isoformat() if t.due_date else None,
-            "workflow": {"id": wf.id, "name": wf.name}
-        })
-    return jsonify({"ok": True, "items": items})
+    cfg = current_app.config
+    events = import_rows(wf, rows, actor_id=u.id, run_rules=request.args.get("rules") in ("1", "true"),
+                         chunk_size=cfg["TASK_IMPORT_CHUNK"], max_rows=cfg["TASK_IMPORT_MAX_ROWS"])
+    return Response(stream_with_context(json.dumps(ev) + "\n" for ev in events),
+                    mimetype="application/x-ndjson", headers={"Cache-Control": "no-store"})
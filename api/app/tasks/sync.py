@@ -0,0 +1,193 @@
+"""
+Change versions and tombstones for task delta sync (/api/tasks/changes).
+
+Every flush that creates, updates or deletes tasks (or moves or renames a
+workflow) records what it touched in session.info. Just before the
+transaction commits, the next value of the "tasks" change counter is taken
+and stamped on those rows in one UPDATE; removed rows leave a TaskTombstone
+with the same version. The counter row is incremented with an upsert-add,
+which locks it until the transaction ends, so versions become visible in
+commit order: once a reader sees counter value C, every change <= C is
+committed. A client that stores the version it synced to and asks for
+`version > it` therefore never misses a change, and only reads what changed.
+
+Taking the version at commit rather than at the first flush keeps the
+counter lock to the stamping statements and the COMMIT itself. Work done
+between flushes (Slack/GitHub calls, rule evaluation, bulk and import
+chunks) no longer holds up other transactions' task writes.
+
+Tombstones older than TASK_TOMBSTONE_DAYS are pruned; the newest pruned
+version is kept as the "task_tombstones_pruned" counter, and a client whose
+version is older than that has to start over from a full snapshot.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, event, func, insert, literal, or_, select, true, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..changes import on_change
+from ..extensions import db
+from ..models import ChangeCounter, Task, TaskTombstone, Workflow
+from ..upsert import add_counts
+
+COUNTER = "tasks"
+PRUNED = "task_tombstones_pruned"
+# session.info key for the changes waiting for a version
+PENDING = "task_versions"
+
+# Merge order inside one version: tombstones first, then rows
+TOMBSTONE, ROW = 0, 1
+
+
+class SyncError(ValueError):
+    pass
+
+
+class SyncExpired(SyncError):
+    pass
+
+
+def next_version(session) -> int:
+    """Increment the task change counter (row-locked until commit) and return the new value."""
+    add_counts(session, ChangeCounter.__table__, ["name"], [{"name": COUNTER, "value": 1}], ["value"])
+    return session.execute(select(ChangeCounter.value).where(ChangeCounter.name == COUNTER)).scalar_one()
+
+
+def counter(name: str) -> int:
+    return db.session.execute(select(ChangeCounter.value).where(ChangeCounter.name == name)).scalar() or 0
+
+
+@on_change
+def _collect_versioned(session, changes):
+    """Remember which tasks this flush touched; they get their version in _stamp_versions()."""
+    if not (changes.tasks or changes.moved_workflows or changes.renamed_workflows):
+        return
+    pending = session.info.setdefault(PENDING, {"changed": set(), "tombstones": [], "moved": [], "resent": set()})
+    for before, after in changes.tasks:
+        if after is not None:
+            pending["changed"].add(after.task_id)
+        if before is not None and (after is None or before.owner_user_id != after.owner_user_id):
+            pending["tombstones"].append({"task_id": before.task_id, "workflow_id": before.workflow_id,
+                                          "owner_user_id": before.owner_user_id})
+    pending["moved"].extend((wid, old_owner) for wid, old_owner, _ in changes.moved_workflows)
+    # Items carry the workflow name, so renamed and moved workflows re-send their tasks
+    pending["resent"].update(wid for wid, _, _ in changes.moved_workflows)
+    pending["resent"].update(wid for wid, _, _ in changes.renamed_workflows)
+
+
+@event.listens_for(db.session, "before_commit")
+def _stamp_versions(session):
+    # before_commit runs ahead of commit()'s own flush, so flush first to collect everything
+    session.flush()
+    pending = session.info.pop(PENDING, None)
+    if not pending:
+        return
+    version = next_version(session)
+    changed, resent = pending["changed"], pending["resent"]
+    if changed:
+        session.execute(update(Task.__table__).where(Task.id.in_(changed)).values(version=version))
+    if pending["tombstones"]:
+        session.execute(insert(TaskTombstone.__table__), [dict(t, version=version) for t in pending["tombstones"]])
+    for workflow_id, old_owner in pending["moved"]:
+        session.execute(insert(TaskTombstone.__table__).from_select(
+            ["task_id", "workflow_id", "owner_user_id", "version", "deleted_at"],
+            select(Task.id, Task.workflow_id, literal(old_owner), literal(version), literal(datetime.utcnow()))
+            .where(Task.workflow_id == workflow_id)))
+    if resent:
+        session.execute(update(Task.__table__).where(Task.workflow_id.in_(resent)).values(version=version))
+
+    # Keep loaded instances in step without marking them dirty again
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Task) and (obj.id in changed or obj.workflow_id in resent):
+            set_committed_value(obj, "version", version)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(PENDING, None)
+
+
+# ---------- reading ----------
+
+def parse_cursor(token: str | None, since: int | None) -> tuple[int, int, int] | None:
+    """-> (version, kind, id) to resume after, or None for a full snapshot."""
+    if token:
+        try:
+            version, kind, last_id = (int(p) for p in token.split(":"))
+        except ValueError:
+            raise SyncError("cursor is malformed")
+        return version, kind, last_id
+    if since is None:
+        return None
+    if since < 0:
+        raise SyncError("since must be >= 0")
+    return since, ROW, 2 ** 62  # everything after version `since`
+
+
+def _after(version_col, id_col, kind: int, pos):
+    """Keyset condition: (version, kind, id) > pos for rows of this kind."""
+    if pos is None:
+        return true()
+    v, k, i = pos
+    if kind > k:
+        return version_col >= v
+    if kind < k:
+        return version_col > v
+    return or_(version_col > v, and_(version_col == v, id_col > i))
+
+
+def changes_since(scope, pos, limit: int) -> dict:
+    """
+    Rows and tombstones after `pos` (None = full snapshot without tombstones),
+    in (version, tombstones first, id) order, up to `limit` of them.
+    """
+    head = counter(COUNTER)
+    if pos is not None and pos[0] < counter(PRUNED):
+        raise SyncExpired("since is older than the kept change history; sync again without since")
+
+    rows_q = (select(Task, Workflow.name)
+              .join(Workflow, Task.workflow_id == Workflow.id)
+              .where(Task.version <= head, _after(Task.version, Task.id, ROW, pos))
+              .order_by(Task.version, Task.id).limit(limit + 1))
+    if scope.role != "admin":
+        rows_q = rows_q.where(Workflow.user_id == scope.id)
+    rows = [(t.version, ROW, t.id, (t, wf_name)) for t, wf_name in db.session.execute(rows_q)]
+
+    dead = []
+    if pos is not None:
+        dead_q = (select(TaskTombstone)
+                  .where(TaskTombstone.version <= head, _after(TaskTombstone.version, TaskTombstone.id, TOMBSTONE, pos))
+                  .order_by(TaskTombstone.version, TaskTombstone.id).limit(limit + 1))
+        if scope.role != "admin":
+            dead_q = dead_q.where(TaskTombstone.owner_user_id == scope.id)
+        else:
+            # Admins see every workflow, so a move is not a removal for them
+            dead_q = dead_q.where(~select(Task.id).where(Task.id == TaskTombstone.task_id).exists())
+        dead = [(d.version, TOMBSTONE, d.id, d) for d in db.session.execute(dead_q).scalars()]
+
+    merged = sorted(rows + dead, key=lambda r: r[:3])
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+    last = merged[-1][:3] if merged else None
+    return {
+        "rows": [r[3] for r in merged if r[1] == ROW],
+        "tombstones": [r[3] for r in merged if r[1] == TOMBSTONE],
+        "version": head,
+        "has_more": has_more,
+        "next_cursor": ":".join(str(p) for p in last) if has_more else None,
+    }
+
+
+def prune_tombstones(days: int) -> int:
+    """Drop tombstones older than `days` and remember the newest pruned version. Commits."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    newest = db.session.execute(
+        select(func.max(TaskTombstone.version)).where(TaskTombstone.deleted_at < cutoff)).scalar()
+    if newest is None:
+        return 0
+    n = db.session.execute(delete(TaskTombstone.__table__).where(TaskTombstone.version <= newest)).rowcount
+    add_counts(db.session, ChangeCounter.__table__, ["name"], [{"name": PRUNED, "value": 0}], ["value"])
+    db.session.execute(update(ChangeCounter.__table__).where(ChangeCounter.name == PRUNED,
+                                                            ChangeCounter.value < newest).values(value=newest))
+    db.session.commit()
+    return n
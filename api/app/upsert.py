@@ -0,0 +1,44 @@
+"""
+Dialect-aware "insert or add to counters" used by the maintained read tables.
+"""
+from sqlalchemy import and_, insert, update
+
+
+def add_counts(session, table, key_cols: list[str], rows: list[dict], count_cols: list[str]) -> None:
+    """
+    For each row, insert it or add its count_cols onto the existing row with
+    the same key_cols. Runs as a single executemany where the dialect allows.
+    """
+    if not rows:
+        return
+    dialect = session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update({c: table.c[c] + stmt.inserted[c] for c in count_cols})
+        session.execute(stmt, rows)
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[k] for k in key_cols],
+            set_={c: table.c[c] + stmt.excluded[c] for c in count_cols},
+        )
+        session.execute(stmt, rows)
+        return
+
+    # Generic fallback: update, then insert the rows that did not exist yet.
+    for row in rows:
+        res = session.execute(
+            update(table)
+            .where(and_(*[table.c[k] == row[k] for k in key_cols]))
+            .values({c: table.c[c] + row[c] for c in count_cols})
+        )
+        if not res.rowcount:
+            session.execute(insert(table).values(**row))
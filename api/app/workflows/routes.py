@@ -39,12 +39,16 @@ def _notify(user_id: int, text: str) -> None:
         # current_app.logger.exception("Slack notify failed")
         pass
 
-def _apply_rules(task: Task, event: str = "updated", rules: list[WorkflowRule] | None = None) -> list[str]:
+def _apply_rules(task: Task, event: str = "updated", rules: list[WorkflowRule] | None = None,
+                 notes: list[str] | None = None) -> list[str]:
     """
     Evaluate workflow rules for a task. Returns list of actions applied.
+    Pass `rules` when they are already loaded (an empty list means none), and
+    `notes` to collect notify_slack messages instead of posting each one.
     """
     actions_applied: list[str] = []
-    rules = rules or WorkflowRule.query.filter_by(workflow_id=task.workflow_id).all()
+    if rules is None:
+        rules = WorkflowRule.query.filter_by(workflow_id=task.workflow_id).all()
     if not rules:
         return actions_applied
 
@@ -66,7 +70,11 @@ def _apply_rules(task: Task, event: str = "updated", rules: list[WorkflowRule] |
             actions_applied.append(f"rule[{rule.name}]: assigned_to {old}->{task.assigned_to}")
         elif rule.action_type == "notify_slack":
             msg = rule.action_value or f"Rule '{rule.name}' matched on task #{task.id}"
-            _notify(task.workflow.user_id, f":robot_face: {msg} • Task “{task.name}” (#{task.id}) [{event}]")
+            text = f":robot_face: {msg} • Task “{task.name}” (#{task.id}) [{event}]"
+            if notes is None:
+                _notify(task.workflow.user_id, text)
+            else:
+                notes.append(text)
             actions_applied.append(f"rule[{rule.name}]: notified slack")
         elif rule.action_type == "github_issue":
             integ = Integration.query.filter_by(user_id=task.workflow.user_id, type="github").first()
@@ -92,6 +100,53 @@ def _apply_rules(task: Task, event: str = "updated", rules: list[WorkflowRule] |
         db.session.add(Log(task_id=task.id, event="; ".join(actions_applied), status=task.status))
     return actions_applied
 
+# Column sizes, checked up front so one bad value cannot fail a whole batch
+_TASK_FIELD_SIZES = {"name": 100, "status": 50, "assigned_to": 100}
+
+def _task_fields(data: dict, partial: bool = False) -> tuple[dict, str | None]:
+    """
+    Validate a task create (partial=False) or update (partial=True) body.
+    Returns (fields to set, None) or ({}, error). Updates only set the keys
+    present; an empty name or status keeps the old value, an empty due_date
+    clears it.
+    """
+    fields = {}
+    for key in ("name", "status", "assigned_to"):
+        value = data.get(key)
+        if isinstance(value, str):
+            value = value.strip()
+            if len(value) > _TASK_FIELD_SIZES[key]:
+                return {}, f"{key} is longer than {_TASK_FIELD_SIZES[key]} characters"
+            if value or key == "assigned_to":
+                fields[key] = value
+    if not partial:
+        if not fields.get("name"):
+            return {}, "name is required"
+        fields.setdefault("status", "pending")
+        fields.setdefault("assigned_to", "")
+
+    if not partial or "due_date" in data:
+        raw = data.get("due_date")
+        raw = raw.strip() if isinstance(raw, str) else ""
+        fields["due_date"] = None
+        if raw:
+            try:
+                fields["due_date"] = date.fromisoformat(raw)  # "YYYY-MM-DD"
+            except ValueError:
+                return {}, "due_date must be YYYY-MM-DD"
+    return fields, None
+
+def _task_snapshot(t: Task) -> dict:
+    return {
+        "name": t.name,
+        "status": t.status,
+        "assigned_to": t.assigned_to,
+        "due_date": t.due_date.isoformat() if t.due_date else None,
+    }
+
+def _change_text(before: dict, after: dict) -> str:
+    return ", ".join(f"{k}: '{before[k]}'→'{after[k]}'" for k in before if before[k] != after[k]) or "updated"
+
 # ---------- workflows CRUD ----------
 
 @workflows_bp.get("")
@@ -420,22 +475,11 @@ def create_task(wf_id):
         return jsonify({"ok": False, "error": "Forbidden"}), 403
 
     data = request.get_json(silent=True) or {}
-    name = (data.get("name") or "").strip()
-    status = (data.get("status") or "pending").strip()
-    assigned_to = (data.get("assigned_to") or "").strip()
-    due = (data.get("due_date") or "").strip()
+    fields, error = _task_fields(data)
+    if error:
+        return jsonify({"ok": False, "error": error}), 422
 
-    if not name:
-        return jsonify({"ok": False, "error": "name is required"}), 422
-
-    due_date = None
-    if due:
-        try:
-            due_date = date.fromisoformat(due)  # "YYYY-MM-DD"
-        except ValueError:
-            return jsonify({"ok": False, "error": "due_date must be YYYY-MM-DD"}), 422
-
-    t = Task(workflow_id=wf_id, name=name, status=status, assigned_to=assigned_to, due_date=due_date)
+    t = Task(workflow_id=wf_id, **fields)
     db.session.add(t)
     db.session.flush()  # get t.id
     db.session.add(Log(task_id=t.id, event="created", status=t.status, actor_id=user.id))
@@ -462,39 +506,15 @@ def update_task(task_id):
         return jsonify({"ok": False, "error": "Forbidden"}), 403
 
     data = request.get_json(silent=True) or {}
+    fields, error = _task_fields(data, partial=True)
+    if error:
+        return jsonify({"ok": False, "error": error}), 422
 
-    before = {
-        "name": t.name,
-        "status": t.status,
-        "assigned_to": t.assigned_to,
-        "due_date": t.due_date.isoformat() if t.due_date else None,
-    }
-
-    if "name" in data and isinstance(data["name"], str):
-        t.name = data["name"].strip() or t.name
-    if "status" in data and isinstance(data["status"], str):
-        t.status = data["status"].strip() or t.status
-    if "assigned_to" in data and isinstance(data["assigned_to"], str):
-        t.assigned_to = data["assigned_to"].strip()
-    if "due_date" in data:
-        raw = (data.get("due_date") or "").strip()
-        if raw:
-            try:
-                t.due_date = date.fromisoformat(raw)
-            except ValueError:
-                return jsonify({"ok": False, "error": "due_date must be YYYY-MM-DD"}), 422
-        else:
-            t.due_date = None
-
+    before = _task_snapshot(t)
+    for key, value in fields.items():
+        setattr(t, key, value)
     db.session.flush()
-
-    after = {
-        "name": t.name,
-        "status": t.status,
-        "assigned_to": t.assigned_to,
-        "due_date": t.due_date.isoformat() if t.due_date else None,
-    }
-    changes = ", ".join(f"{k}: '{before[k]}'→'{after[k]}'" for k in before if before[k] != after[k]) or "updated"
+    changes = _change_text(before, _task_snapshot(t))
 
     db.session.add(Log(task_id=t.id, event=changes, status=t.status, actor_id=user.id))
     _apply_rules(t, event="updated")
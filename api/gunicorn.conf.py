@@ -0,0 +1,18 @@
+"""
+Gunicorn settings for the API container.
+
+gevent workers serve each request on a greenlet, so an open notifications
+stream (GET /api/notifications/stream) costs a few KB instead of a whole
+sync worker; worker_connections caps the streams plus regular requests one
+worker holds at once. PyMySQL is pure Python and cooperates once gevent has
+patched the socket module (the worker does this before loading the app).
+"""
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5050")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "2000"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 75
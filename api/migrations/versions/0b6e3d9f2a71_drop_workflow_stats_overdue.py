@@ -0,0 +1,30 @@
+"""drop workflow_stats.overdue_count
+
+Revision ID: 0b6e3d9f2a71
+Revises: f5d9b2c7e014
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e3d9f2a71'
+down_revision: Union[str, Sequence[str], None] = 'f5d9b2c7e014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Overdue depends on the date, not on writes; it is counted at read time now
+    op.drop_column('workflow_stats', 'overdue_count')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('workflow_stats', sa.Column('overdue_count', sa.Integer(), nullable=False, server_default='0'))
+    # Refill with: python -m app.scripts.check_workflow_stats --repair
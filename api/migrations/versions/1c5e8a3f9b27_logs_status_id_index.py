@@ -0,0 +1,28 @@
+"""index logs (status, id) for keyset feeds
+
+Revision ID: 1c5e8a3f9b27
+Revises: 7f3b9d21e6a4
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c5e8a3f9b27'
+down_revision: Union[str, Sequence[str], None] = '7f3b9d21e6a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_logs_status_id', 'logs', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_logs_status_id', table_name='logs')
@@ -0,0 +1,40 @@
+"""notification read cursors and unread counters
+
+Revision ID: 2e8f4a6c1d93
+Revises: 6d1e3b8a4c57
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8f4a6c1d93'
+down_revision: Union[str, Sequence[str], None] = '6d1e3b8a4c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_cursors',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_read_id', sa.Integer(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Everything that already exists starts out read
+    op.execute(
+        "INSERT INTO notification_cursors (user_id, last_read_id, unread_count, updated_at) "
+        "SELECT id, COALESCE((SELECT MAX(id) FROM logs), 0), 0, CURRENT_TIMESTAMP FROM users"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_cursors')
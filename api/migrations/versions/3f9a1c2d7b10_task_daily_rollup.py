@@ -0,0 +1,47 @@
+"""task daily rollup
+
+Revision ID: 3f9a1c2d7b10
+Revises: c73327cd3cae
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2d7b10'
+down_revision: Union[str, Sequence[str], None] = 'c73327cd3cae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_daily_rollup',
+    sa.Column('owner_user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('workflow_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('task_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('owner_user_id', 'workflow_id', 'day', 'status')
+    )
+    op.create_index('ix_task_daily_rollup_owner_day', 'task_daily_rollup', ['owner_user_id', 'day'], unique=False)
+    op.create_index('ix_task_daily_rollup_day', 'task_daily_rollup', ['day'], unique=False)
+    # Count the existing tasks; app.scripts.rebuild_rollups repairs drift later
+    op.execute(
+        "INSERT INTO task_daily_rollup (owner_user_id, workflow_id, day, status, task_count) "
+        "SELECT workflows.user_id, tasks.workflow_id, DATE(tasks.created_at), COALESCE(tasks.status, ''), COUNT(*) "
+        "FROM tasks JOIN workflows ON tasks.workflow_id = workflows.id "
+        "WHERE tasks.created_at IS NOT NULL "
+        "GROUP BY workflows.user_id, tasks.workflow_id, DATE(tasks.created_at), COALESCE(tasks.status, '')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_daily_rollup_day', table_name='task_daily_rollup')
+    op.drop_index('ix_task_daily_rollup_owner_day', table_name='task_daily_rollup')
+    op.drop_table('task_daily_rollup')
@@ -0,0 +1,51 @@
+"""service stats and duration sketch bins
+
+Revision ID: 4a9c6e2f8d13
+Revises: b7d2f5e81a49
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a9c6e2f8d13'
+down_revision: Union[str, Sequence[str], None] = 'b7d2f5e81a49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('service_stats',
+    sa.Column('owner_user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('service', sa.String(length=100), nullable=False),
+    sa.Column('event_count', sa.Integer(), nullable=False),
+    sa.Column('error_count', sa.Integer(), nullable=False),
+    sa.Column('duration_count', sa.Integer(), nullable=False),
+    sa.Column('duration_sum', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('owner_user_id', 'bucket', 'service')
+    )
+    op.create_index('ix_service_stats_bucket', 'service_stats', ['bucket'], unique=False)
+    op.create_table('service_duration_bins',
+    sa.Column('owner_user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('service', sa.String(length=100), nullable=False),
+    sa.Column('bin', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('owner_user_id', 'bucket', 'service', 'bin')
+    )
+    op.create_index('ix_service_duration_bins_bucket', 'service_duration_bins', ['bucket'], unique=False)
+    # Backfill with: python -m app.scripts.rebuild_service_stats
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_service_duration_bins_bucket', table_name='service_duration_bins')
+    op.drop_table('service_duration_bins')
+    op.drop_index('ix_service_stats_bucket', table_name='service_stats')
+    op.drop_table('service_stats')
@@ -0,0 +1,53 @@
+"""api error series and anomalies
+
+Revision ID: 6d1e3b8a4c57
+Revises: 4a9c6e2f8d13
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d1e3b8a4c57'
+down_revision: Union[str, Sequence[str], None] = '4a9c6e2f8d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('api_error_series',
+    sa.Column('method', sa.String(length=10), nullable=False),
+    sa.Column('route', sa.String(length=255), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=True),
+    sa.Column('bucket_count', sa.Integer(), nullable=False),
+    sa.Column('mean', sa.Float(), nullable=False),
+    sa.Column('var', sa.Float(), nullable=False),
+    sa.Column('buckets_seen', sa.Integer(), nullable=False),
+    sa.Column('alerted_bucket', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('method', 'route')
+    )
+    op.create_table('api_anomalies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('method', sa.String(length=10), nullable=False),
+    sa.Column('route', sa.String(length=255), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('expected', sa.Float(), nullable=False),
+    sa.Column('std', sa.Float(), nullable=False),
+    sa.Column('zscore', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_api_anomalies_created_at'), 'api_anomalies', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_api_anomalies_created_at'), table_name='api_anomalies')
+    op.drop_table('api_anomalies')
+    op.drop_table('api_error_series')
@@ -0,0 +1,55 @@
+"""report definitions and snapshots
+
+Revision ID: 7f3b9d21e6a4
+Revises: e2b6d0f47c93
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3b9d21e6a4'
+down_revision: Union[str, Sequence[str], None] = 'e2b6d0f47c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('report_definitions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('params', sa.Text(), nullable=True),
+    sa.Column('cron_expr', sa.String(length=120), nullable=True),
+    sa.Column('last_run_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_definitions_owner_user_id'), 'report_definitions', ['owner_user_id'], unique=False)
+    op.create_table('report_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('report_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('trigger', sa.String(length=20), nullable=False),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('size_bytes', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.LargeBinary(length=16777215), nullable=False),
+    sa.ForeignKeyConstraint(['report_id'], ['report_definitions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_report_snapshots_report_id', 'report_snapshots', ['report_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_report_snapshots_report_id', table_name='report_snapshots')
+    op.drop_table('report_snapshots')
+    op.drop_index(op.f('ix_report_definitions_owner_user_id'), table_name='report_definitions')
+    op.drop_table('report_definitions')
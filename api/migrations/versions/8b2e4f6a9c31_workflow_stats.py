@@ -0,0 +1,57 @@
+"""workflow stats counters
+
+Revision ID: 8b2e4f6a9c31
+Revises: 3f9a1c2d7b10
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4f6a9c31'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('workflow_stats',
+    sa.Column('workflow_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner_user_id', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('open_count', sa.Integer(), nullable=False),
+    sa.Column('done_count', sa.Integer(), nullable=False),
+    sa.Column('overdue_count', sa.Integer(), nullable=False),
+    sa.Column('checked_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['workflow_id'], ['workflows.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('workflow_id')
+    )
+    op.create_index('ix_workflow_stats_owner_open', 'workflow_stats',
+                    ['owner_user_id', sa.text('open_count DESC'), 'workflow_id'], unique=False)
+    op.create_index('ix_workflow_stats_open', 'workflow_stats',
+                    [sa.text('open_count DESC'), 'workflow_id'], unique=False)
+    # Count the existing tasks; every workflow gets a row, as new ones do
+    op.execute(
+        "INSERT INTO workflow_stats "
+        "(workflow_id, owner_user_id, total_count, open_count, done_count, overdue_count, checked_at) "
+        "SELECT workflows.id, workflows.user_id, COUNT(tasks.id), "
+        "COALESCE(SUM(CASE WHEN tasks.status <> 'done' THEN 1 ELSE 0 END), 0), "
+        "COALESCE(SUM(CASE WHEN tasks.status = 'done' THEN 1 ELSE 0 END), 0), "
+        "COALESCE(SUM(CASE WHEN tasks.status <> 'done' AND tasks.due_date < CURRENT_DATE THEN 1 ELSE 0 END), 0), "
+        "CURRENT_TIMESTAMP "
+        "FROM workflows LEFT JOIN tasks ON tasks.workflow_id = workflows.id "
+        "WHERE workflows.user_id IS NOT NULL "
+        "GROUP BY workflows.id, workflows.user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_workflow_stats_open', table_name='workflow_stats')
+    op.drop_index('ix_workflow_stats_owner_open', table_name='workflow_stats')
+    op.drop_table('workflow_stats')
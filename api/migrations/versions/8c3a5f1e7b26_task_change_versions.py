@@ -0,0 +1,51 @@
+"""task change versions and tombstones
+
+Revision ID: 8c3a5f1e7b26
+Revises: 2e8f4a6c1d93
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3a5f1e7b26'
+down_revision: Union[str, Sequence[str], None] = '2e8f4a6c1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows stay at version 0: part of every full snapshot, never of a delta
+    op.add_column('tasks', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_tasks_version'), 'tasks', ['version'], unique=False)
+    op.create_table('change_counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('task_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('workflow_id', sa.Integer(), nullable=True),
+    sa.Column('owner_user_id', sa.Integer(), nullable=True),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_tombstones_version', 'task_tombstones', ['version'], unique=False)
+    op.create_index('ix_task_tombstones_owner_version', 'task_tombstones', ['owner_user_id', 'version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_tombstones_owner_version', table_name='task_tombstones')
+    op.drop_index('ix_task_tombstones_version', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_table('change_counters')
+    op.drop_index(op.f('ix_tasks_version'), table_name='tasks')
+    op.drop_column('tasks', 'version')
@@ -0,0 +1,65 @@
+"""activity feed read model
+
+Revision ID: 9e4a7c1d5b62
+Revises: 1c5e8a3f9b27
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a7c1d5b62'
+down_revision: Union[str, Sequence[str], None] = '1c5e8a3f9b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activity',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner_user_id', sa.Integer(), nullable=False),
+    sa.Column('workflow_id', sa.Integer(), nullable=False),
+    sa.Column('workflow_name', sa.String(length=100), nullable=True),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('task_name', sa.String(length=100), nullable=True),
+    sa.Column('task_status', sa.String(length=50), nullable=True),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('actor_name', sa.String(length=100), nullable=True),
+    sa.Column('actor_email', sa.String(length=120), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('event', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('service', sa.String(length=100), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['id'], ['logs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_activity_owner_id', 'activity', ['owner_user_id', 'id'], unique=False)
+    op.create_index('ix_activity_task_id', 'activity', ['task_id'], unique=False)
+    op.create_index('ix_activity_workflow_id', 'activity', ['workflow_id'], unique=False)
+    # Copy existing logs so the feed is complete as soon as this revision is live;
+    # app.scripts.rebuild_activity re-syncs it later if it ever drifts.
+    op.execute(
+        "INSERT INTO activity (id, owner_user_id, workflow_id, workflow_name, task_id, task_name, task_status, "
+        "actor_id, actor_name, actor_email, timestamp, event, status, duration_ms, service, error_message) "
+        "SELECT logs.id, workflows.user_id, workflows.id, workflows.name, tasks.id, tasks.name, tasks.status, "
+        "logs.actor_id, users.name, users.email, logs.timestamp, logs.event, logs.status, logs.duration_ms, "
+        "logs.service, logs.error_message "
+        "FROM logs JOIN tasks ON logs.task_id = tasks.id "
+        "JOIN workflows ON tasks.workflow_id = workflows.id "
+        "LEFT JOIN users ON logs.actor_id = users.id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activity_workflow_id', table_name='activity')
+    op.drop_index('ix_activity_task_id', table_name='activity')
+    op.drop_index('ix_activity_owner_id', table_name='activity')
+    op.drop_table('activity')
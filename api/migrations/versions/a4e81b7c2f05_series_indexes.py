@@ -0,0 +1,32 @@
+"""range indexes for analytics series
+
+Revision ID: a4e81b7c2f05
+Revises: 5d7c2e9b4a18
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e81b7c2f05'
+down_revision: Union[str, Sequence[str], None] = '5d7c2e9b4a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_created_at', 'tasks', ['created_at'], unique=False)
+    op.create_index('ix_tasks_workflow_created', 'tasks', ['workflow_id', 'created_at'], unique=False)
+    op.create_index('ix_logs_timestamp', 'logs', ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_logs_timestamp', table_name='logs')
+    op.drop_index('ix_tasks_workflow_created', table_name='tasks')
+    op.drop_index('ix_tasks_created_at', table_name='tasks')
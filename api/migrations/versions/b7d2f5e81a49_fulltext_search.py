@@ -0,0 +1,35 @@
+"""fulltext indexes for log and api error search
+
+Revision ID: b7d2f5e81a49
+Revises: 9e4a7c1d5b62
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f5e81a49'
+down_revision: Union[str, Sequence[str], None] = '9e4a7c1d5b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # MySQL only; SQLite dev databases get FTS5 tables from create_all() (see app/search.py)
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index('ft_activity_text', 'activity', ['event', 'error_message'], unique=False, mysql_prefix='FULLTEXT')
+    op.create_index('ft_api_events_error', 'api_events', ['error_message'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_api_events_error', table_name='api_events')
+    op.drop_index('ft_activity_text', table_name='activity')
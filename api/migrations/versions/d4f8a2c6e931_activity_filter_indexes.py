@@ -0,0 +1,34 @@
+"""activity indexes for status and time-range feed filters
+
+Revision ID: d4f8a2c6e931
+Revises: 0b6e3d9f2a71
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8a2c6e931'
+down_revision: Union[str, Sequence[str], None] = '0b6e3d9f2a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_activity_owner_status_id', 'activity', ['owner_user_id', 'status', 'id'], unique=False)
+    op.create_index('ix_activity_status_id', 'activity', ['status', 'id'], unique=False)
+    op.create_index('ix_activity_owner_timestamp', 'activity', ['owner_user_id', 'timestamp'], unique=False)
+    op.create_index('ix_activity_timestamp', 'activity', ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activity_timestamp', table_name='activity')
+    op.drop_index('ix_activity_owner_timestamp', table_name='activity')
+    op.drop_index('ix_activity_status_id', table_name='activity')
+    op.drop_index('ix_activity_owner_status_id', table_name='activity')
@@ -0,0 +1,40 @@
+"""archived_log_counts for /series over archived logs
+
+Revision ID: e7a3c9f15b28
+Revises: d4f8a2c6e931
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9f15b28'
+down_revision: Union[str, Sequence[str], None] = 'd4f8a2c6e931'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archived_log_counts',
+    sa.Column('owner_user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('workflow_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('metric', sa.String(length=20), nullable=False),
+    sa.Column('log_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('owner_user_id', 'workflow_id', 'hour', 'metric')
+    )
+    op.create_index('ix_archived_log_counts_owner_metric_hour', 'archived_log_counts', ['owner_user_id', 'metric', 'hour'], unique=False)
+    op.create_index('ix_archived_log_counts_metric_hour', 'archived_log_counts', ['metric', 'hour'], unique=False)
+    # Logs archived before this revision: python -m app.scripts.archive_old_rows --recount-logs
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_archived_log_counts_metric_hour', table_name='archived_log_counts')
+    op.drop_index('ix_archived_log_counts_owner_metric_hour', table_name='archived_log_counts')
+    op.drop_table('archived_log_counts')
@@ -0,0 +1,30 @@
+"""task listing indexes
+
+Revision ID: f5d9b2c7e014
+Revises: 8c3a5f1e7b26
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5d9b2c7e014'
+down_revision: Union[str, Sequence[str], None] = '8c3a5f1e7b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_workflow_due', 'tasks', ['workflow_id', 'due_date'], unique=False)
+    op.create_index('ix_tasks_assigned_due', 'tasks', ['assigned_to', 'due_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_assigned_due', table_name='tasks')
+    op.drop_index('ix_tasks_workflow_due', table_name='tasks')
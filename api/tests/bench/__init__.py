@@ -0,0 +1 @@
+# Benchmark harnesses that drive the API against local fakes.
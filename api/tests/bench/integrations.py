@@ -0,0 +1,219 @@
+"""
+Benchmark integration-heavy API flows against the local fakes.
+
+Starts the fake Slack/GitHub/Jira servers and the API in-process, seeds a
+user with Slack, GitHub and Jira integrations that point at the fakes,
+then drives the API over HTTP and reports throughput and tail latency.
+
+  cd api && python -m tests.bench.integrations --requests 500 --concurrency 16 \\
+      --latency-ms 120 --jitter-ms 80 --error-rate 0.01
+
+Scenarios:
+  update_task  PATCH /api/workflows/tasks/<id> (rules -> GitHub issue, Slack notify)
+  webhook      POST /api/integrations/jira/webhook/<uid> (forwarded to Slack)
+
+Uses a throwaway SQLite database unless --database-url is given; point it at
+MySQL for numbers that resemble production.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from tests.fakes.servers import add_behavior_args, behavior_from_args, start_all
+
+PASSWORD = "bench-password"
+STATUSES = ["in-progress", "blocked", "review", "done"]
+
+
+def _percentile(sorted_vals: list, pct: float) -> float:
+  if not sorted_vals:
+    return 0.0
+  idx = min(len(sorted_vals) - 1, max(0, int(round(pct / 100.0 * (len(sorted_vals) - 1)))))
+  return sorted_vals[idx]
+
+
+def _boot_api(database_url: str):
+  os.environ["DATABASE_URL"] = database_url
+  os.environ.setdefault("INTEGRATION_KEY", _fernet_key())
+  from werkzeug.serving import make_server
+  from app import create_app
+
+  app = create_app()
+  logging.getLogger("werkzeug").setLevel(logging.WARNING)
+  server = make_server("127.0.0.1", 0, app, threaded=True)
+  threading.Thread(target=server.serve_forever, name="api", daemon=True).start()
+  return app, server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _fernet_key() -> str:
+  from cryptography.fernet import Fernet
+  return Fernet.generate_key().decode()
+
+
+def _seed(app, fakes: dict, tasks: int) -> dict:
+  from app.extensions import db
+  from app.models import User, Workflow, Task, WorkflowRule, Integration
+
+  with app.app_context():
+    email = f"bench-{secrets.token_hex(4)}@example.com"
+    user = User(name="Bench User", email=email, role="manager")
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.flush()
+
+    wf = Workflow(user_id=user.id, name="Bench Workflow", description="integration benchmark")
+    db.session.add(wf)
+    db.session.flush()
+
+    db.session.add_all([
+      Task(workflow_id=wf.id, name=f"bench task {i}", status="pending", assigned_to="bench")
+      for i in range(tasks)
+    ])
+    db.session.add_all([
+      WorkflowRule(workflow_id=wf.id, name="open issue when blocked", when_status="blocked",
+                   action_type="github_issue"),
+      WorkflowRule(workflow_id=wf.id, name="ping on done", when_status="done",
+                   action_type="notify_slack", action_value="bench task done"),
+    ])
+
+    slack = Integration(user_id=user.id, type="slack", credentials="")
+    slack.set_slack_webhook(f"{fakes['slack'].base_url}/services/TBENCH/BBENCH/XBENCH")
+    github = Integration(user_id=user.id, type="github", credentials="")
+    github.set_github(fakes["github"].base_url, "fake-token", "acme/bench")
+    webhook_secret = secrets.token_urlsafe(24)
+    jira = Integration(user_id=user.id, type="jira", credentials=json.dumps({
+      "base_url": fakes["jira"].base_url,
+      "email": email,
+      "api_token": "fake-token",
+      "default_project": "DEM",
+      "webhook_secret": webhook_secret,
+    }))
+    db.session.add_all([slack, github, jira])
+    db.session.commit()
+
+    task_ids = [t.id for t in Task.query.filter_by(workflow_id=wf.id).all()]
+    return {"email": email, "user_id": user.id, "task_ids": task_ids, "webhook_secret": webhook_secret}
+
+
+def _login(base_url: str, email: str) -> requests.Session:
+  s = requests.Session()
+  r = s.post(f"{base_url}/api/auth/login", json={"email": email, "password": PASSWORD}, timeout=15)
+  r.raise_for_status()
+  csrf = s.cookies.get("csrf_access_token")
+  if csrf:
+    s.headers["X-CSRF-TOKEN"] = csrf
+  return s
+
+
+def _jira_payload(i: int) -> dict:
+  return {
+    "webhookEvent": "jira:issue_updated",
+    "issue_event_type_name": "issue_updated",
+    "timestamp": int(time.time() * 1000),
+    "user": {"displayName": "Bench Bot"},
+    "issue": {"key": f"DEM-{i}", "fields": {"summary": f"bench issue {i}", "status": {"name": "In Progress"}}},
+  }
+
+
+def run_scenario(name: str, base_url: str, seed: dict, total: int, concurrency: int) -> dict:
+  local = threading.local()
+
+  def session():
+    if not hasattr(local, "s"):
+      local.s = _login(base_url, seed["email"])
+    return local.s
+
+  def one(i: int):
+    s = session()
+    started = time.perf_counter()
+    if name == "update_task":
+      tid = random.choice(seed["task_ids"])
+      r = s.patch(f"{base_url}/api/workflows/tasks/{tid}", json={"status": random.choice(STATUSES)}, timeout=60)
+    else:
+      r = s.post(
+        f"{base_url}/api/integrations/jira/webhook/{seed['user_id']}",
+        params={"secret": seed["webhook_secret"]},
+        json=_jira_payload(i),
+        timeout=60,
+      )
+    return time.perf_counter() - started, r.status_code
+
+  started = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    results = list(pool.map(one, range(total)))
+  wall = time.perf_counter() - started
+
+  latencies = sorted(lat * 1000.0 for lat, _ in results)
+  statuses: dict[str, int] = {}
+  for _, code in results:
+    statuses[str(code)] = statuses.get(str(code), 0) + 1
+  return {
+    "scenario": name,
+    "requests": total,
+    "concurrency": concurrency,
+    "wall_s": round(wall, 3),
+    "throughput_rps": round(total / wall, 1) if wall else None,
+    "latency_ms": {
+      "p50": round(_percentile(latencies, 50), 1),
+      "p90": round(_percentile(latencies, 90), 1),
+      "p99": round(_percentile(latencies, 99), 1),
+      "max": round(latencies[-1], 1) if latencies else 0.0,
+    },
+    "status_codes": statuses,
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--scenario", choices=["update_task", "webhook", "all"], default="all")
+  parser.add_argument("--requests", type=int, default=200)
+  parser.add_argument("--concurrency", type=int, default=8)
+  parser.add_argument("--tasks", type=int, default=50, help="tasks seeded into the bench workflow")
+  parser.add_argument("--database-url", default=None)
+  parser.add_argument("--json", action="store_true", help="print results as JSON")
+  add_behavior_args(parser)
+  args = parser.parse_args()
+
+  tmpdir = None
+  database_url = args.database_url
+  if not database_url:
+    tmpdir = tempfile.mkdtemp(prefix="iwas-bench-")
+    database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+  fakes = start_all(behavior_from_args(args))
+  app, api_server, base_url = _boot_api(database_url)
+  seed = _seed(app, fakes, max(args.tasks, 1))
+
+  scenarios = ["update_task", "webhook"] if args.scenario == "all" else [args.scenario]
+  results = [run_scenario(name, base_url, seed, args.requests, args.concurrency) for name in scenarios]
+  fake_stats = {kind: {k: v for k, v in srv.stats().items() if k != "recent"} for kind, srv in fakes.items()}
+
+  api_server.shutdown()
+  for srv in fakes.values():
+    srv.stop()
+
+  if args.json:
+    json.dump({"results": results, "fakes": fake_stats}, sys.stdout, indent=2)
+    print()
+    return
+
+  for r in results:
+    lat = r["latency_ms"]
+    print(f"{r['scenario']:12s} {r['requests']} req @ c={r['concurrency']}: {r['throughput_rps']} req/s  "
+          f"p50={lat['p50']}ms p90={lat['p90']}ms p99={lat['p99']}ms max={lat['max']}ms  codes={r['status_codes']}")
+  for kind, st in fake_stats.items():
+    print(f"  fake {kind:7s} requests={st['requests']} by_status={st['by_status']}")
+
+
+if __name__ == "__main__":
+  main()
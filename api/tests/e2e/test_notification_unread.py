@@ -0,0 +1,88 @@
+import os
+import subprocess
+import time
+import unittest
+import uuid
+
+import requests
+
+BASE_URL = (os.getenv("IWAS_BASE_URL") or "http://localhost:5050").rstrip("/")
+JWT_TOKEN = os.getenv("IWAS_JWT")
+# Shell command that archives every log, run against the server's database,
+# e.g. "python -m app.scripts.archive_old_rows --table logs --days 0"
+ARCHIVE_CMD = os.getenv("IWAS_ARCHIVE_CMD")
+
+
+def auth_headers():
+  return {"Authorization": f"Bearer {JWT_TOKEN}"}
+
+
+def api_url(path: str) -> str:
+  return f"{BASE_URL}{path}"
+
+
+class E2ENotificationUnread(unittest.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    if not JWT_TOKEN:
+      raise unittest.SkipTest("IWAS_JWT not set; skipping unread counter E2E tests.")
+    resp = requests.post(api_url("/api/workflows"), headers=auth_headers(),
+                         json={"name": f"iwas-e2e-unread-{uuid.uuid4().hex[:6]}"}, timeout=15)
+    assert resp.status_code == 201, resp.text
+    cls.workflow_id = resp.json()["item"]["id"]
+
+  @classmethod
+  def tearDownClass(cls):
+    requests.delete(api_url(f"/api/workflows/{cls.workflow_id}"), headers=auth_headers(), timeout=15)
+
+  def unread(self):
+    resp = requests.get(api_url("/api/notifications/unread-count"), headers=auth_headers(), timeout=15)
+    self.assertEqual(resp.status_code, 200, resp.text)
+    return resp.json()["unread"]
+
+  def mark_all_read(self):
+    resp = requests.post(api_url("/api/notifications/read"), headers=auth_headers(), json={}, timeout=15)
+    self.assertEqual(resp.status_code, 200, resp.text)
+    self.assertEqual(resp.json()["unread"], 0)
+
+  def create_task(self, name):
+    resp = requests.post(api_url(f"/api/workflows/{self.workflow_id}/tasks"), headers=auth_headers(),
+                         json={"name": name, "status": "pending"}, timeout=15)
+    self.assertEqual(resp.status_code, 201, resp.text)
+    return resp.json()["item"]["id"]
+
+  def delete_task(self, task_id):
+    resp = requests.delete(api_url(f"/api/workflows/tasks/{task_id}"), headers=auth_headers(), timeout=15)
+    self.assertEqual(resp.status_code, 200, resp.text)
+
+  def test_unread_after_delete(self):
+    """Deleting a task takes its unread logs off the counter, and never goes below zero."""
+    self.mark_all_read()
+    task_id = self.create_task("unread-delete")
+    self.assertEqual(self.unread(), 1)
+    self.delete_task(task_id)
+    self.assertEqual(self.unread(), 0)
+
+    task_id = self.create_task("read-delete")
+    self.mark_all_read()
+    self.delete_task(task_id)
+    self.assertEqual(self.unread(), 0)
+
+  def test_unread_after_archive(self):
+    """Archived logs leave the counter, as they leave the feed."""
+    if not ARCHIVE_CMD:
+      self.skipTest("IWAS_ARCHIVE_CMD not set; skipping archive test.")
+    self.mark_all_read()
+    self.create_task("unread-archive")
+    self.assertEqual(self.unread(), 1)
+    time.sleep(2)  # past the second the log was stamped in, so --days 0 picks it up
+    subprocess.run(ARCHIVE_CMD, shell=True, check=True, timeout=300)
+    self.assertEqual(self.unread(), 0)
+
+    resp = requests.get(api_url("/api/notifications/recent"), headers=auth_headers(), timeout=15)
+    self.assertEqual(resp.status_code, 200, resp.text)
+    self.assertEqual(resp.json()["items"], [])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,92 @@
+import os
+import unittest
+import uuid
+
+import requests
+
+BASE_URL = (os.getenv("IWAS_BASE_URL") or "http://localhost:5050").rstrip("/")
+JWT_TOKEN = os.getenv("IWAS_JWT")
+
+
+def auth_headers():
+  return {"Authorization": f"Bearer {JWT_TOKEN}"}
+
+
+def api_url(path: str) -> str:
+  return f"{BASE_URL}{path}"
+
+
+class E2ETaskBulk(unittest.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    if not JWT_TOKEN:
+      raise unittest.SkipTest("IWAS_JWT not set; skipping bulk task E2E tests.")
+    resp = requests.post(api_url("/api/workflows"), headers=auth_headers(),
+                         json={"name": f"iwas-e2e-bulk-{uuid.uuid4().hex[:6]}"}, timeout=15)
+    assert resp.status_code == 201, resp.text
+    cls.workflow_id = resp.json()["item"]["id"]
+
+  @classmethod
+  def tearDownClass(cls):
+    requests.delete(api_url(f"/api/workflows/{cls.workflow_id}"), headers=auth_headers(), timeout=15)
+
+  def bulk(self, ops):
+    resp = requests.post(api_url("/api/tasks/bulk"), headers=auth_headers(), json=ops, timeout=30)
+    self.assertEqual(resp.status_code, 200, resp.text)
+    return resp.json()
+
+  def workflow_task_ids(self):
+    resp = requests.get(api_url("/api/tasks/"), headers=auth_headers(),
+                        params={"workflow_id": self.workflow_id, "fields": "id", "limit": 500}, timeout=15)
+    self.assertEqual(resp.status_code, 200, resp.text)
+    return {i["id"] for i in resp.json()["items"]}
+
+  def test_partial_failure(self):
+    """Rejected operations are reported by index; the valid ones are still applied."""
+    body = self.bulk([{"op": "create", "workflow_id": self.workflow_id, "name": "bulk-keep", "status": "pending"},
+                      {"op": "create", "workflow_id": self.workflow_id, "name": "bulk-drop", "status": "pending"}])
+    self.assertEqual(body["applied"], 2, body)
+    keep, drop = (i["id"] for i in body["items"])
+
+    body = self.bulk([
+      {"op": "update", "id": keep, "status": "done"},
+      {"op": "update", "id": 2 ** 31 - 1, "status": "done"},
+      {"op": "create", "workflow_id": self.workflow_id},
+      {"op": "rename", "id": keep},
+      {"op": "delete", "id": drop},
+      {"op": "update", "id": drop, "status": "done"},
+      {"op": "create", "workflow_id": self.workflow_id, "name": "bulk-new", "status": "pending"},
+    ])
+    items = {i["index"]: i for i in body["items"]}
+    self.assertEqual((body["applied"], body["rejected"]), (3, 4), body)
+    self.assertEqual(sorted(items), list(range(7)))
+    self.assertEqual(items[0]["item"]["status"], "done")
+    self.assertIn("version", items[0]["item"])
+    self.assertEqual(items[1]["status"], 404)
+    self.assertEqual(items[2]["status"], 422)
+    self.assertEqual(items[3]["status"], 422)
+    self.assertTrue(items[4]["ok"])
+    # Deleted earlier in the same batch
+    self.assertEqual(items[5]["status"], 404)
+    self.assertTrue(items[6]["ok"])
+
+    ids = self.workflow_task_ids()
+    self.assertIn(keep, ids)
+    self.assertNotIn(drop, ids)
+    self.assertIn(items[6]["id"], ids)
+
+  def test_all_rejected(self):
+    """A batch with nothing valid writes nothing and still answers per index."""
+    before = self.workflow_task_ids()
+    body = self.bulk([{"op": "create", "workflow_id": self.workflow_id}, "not an object"])
+    self.assertEqual((body["applied"], body["rejected"]), (0, 2), body)
+    self.assertEqual([i["status"] for i in body["items"]], [422, 422])
+    self.assertEqual(self.workflow_task_ids(), before)
+
+  def test_body_must_be_a_list(self):
+    resp = requests.post(api_url("/api/tasks/bulk"), headers=auth_headers(), json={"op": "create"}, timeout=15)
+    self.assertEqual(resp.status_code, 400, resp.text)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,91 @@
+import os
+import unittest
+import uuid
+
+import requests
+
+BASE_URL = (os.getenv("IWAS_BASE_URL") or "http://localhost:5050").rstrip("/")
+JWT_TOKEN = os.getenv("IWAS_JWT")
+
+
+def auth_headers():
+  return {"Authorization": f"Bearer {JWT_TOKEN}"}
+
+
+def api_url(path: str) -> str:
+  return f"{BASE_URL}{path}"
+
+
+def fetch_changes(since=None, limit=500):
+  """Follow next_cursor until has_more is false; returns (items, deleted, version)."""
+  items, deleted, cursor = [], [], None
+  while True:
+    params = {"limit": limit}
+    if since is not None:
+      params["since"] = since
+    if cursor:
+      params["cursor"] = cursor
+    resp = requests.get(api_url("/api/tasks/changes"), headers=auth_headers(), params=params, timeout=15)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    items += body["items"]
+    deleted += body["deleted"]
+    if not body["has_more"]:
+      return items, deleted, body["version"]
+    cursor = body["next_cursor"]
+
+
+class E2ETaskSync(unittest.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    if not JWT_TOKEN:
+      raise unittest.SkipTest("IWAS_JWT not set; skipping task sync E2E tests.")
+    resp = requests.post(api_url("/api/workflows"), headers=auth_headers(),
+                         json={"name": f"iwas-e2e-sync-{uuid.uuid4().hex[:6]}"}, timeout=15)
+    assert resp.status_code == 201, resp.text
+    cls.workflow_id = resp.json()["item"]["id"]
+
+  @classmethod
+  def tearDownClass(cls):
+    requests.delete(api_url(f"/api/workflows/{cls.workflow_id}"), headers=auth_headers(), timeout=15)
+
+  def create_task(self, name):
+    resp = requests.post(api_url(f"/api/workflows/{self.workflow_id}/tasks"), headers=auth_headers(),
+                         json={"name": name, "status": "pending"}, timeout=15)
+    self.assertEqual(resp.status_code, 201, resp.text)
+    return resp.json()["item"]["id"]
+
+  def test_cursor_roundtrip(self):
+    """Paging a delta with limit=1 returns every change once, and the next delta is empty."""
+    _, _, version = fetch_changes()
+    created = {self.create_task(f"sync-{i}") for i in range(3)}
+    resp = requests.patch(api_url(f"/api/workflows/tasks/{min(created)}"), headers=auth_headers(),
+                          json={"status": "done"}, timeout=15)
+    self.assertEqual(resp.status_code, 200, resp.text)
+
+    items, deleted, next_version = fetch_changes(since=version, limit=1)
+    ids = [i["id"] for i in items]
+    self.assertEqual(len(ids), len(set(ids)), "a task was returned twice across pages")
+    self.assertTrue(created <= set(ids))
+    self.assertEqual(next(i for i in items if i["id"] == min(created))["status"], "done")
+    self.assertGreater(next_version, version)
+
+    items, deleted, _ = fetch_changes(since=next_version)
+    self.assertFalse({i["id"] for i in items} & created)
+    self.assertFalse({d["id"] for d in deleted} & created)
+
+  def test_tombstone_after_delete(self):
+    """A deleted task comes back in `deleted`, not in `items`."""
+    task_id = self.create_task("sync-delete")
+    _, _, version = fetch_changes()
+    resp = requests.delete(api_url(f"/api/workflows/tasks/{task_id}"), headers=auth_headers(), timeout=15)
+    self.assertEqual(resp.status_code, 200, resp.text)
+
+    items, deleted, next_version = fetch_changes(since=version)
+    self.assertIn(task_id, [d["id"] for d in deleted])
+    self.assertNotIn(task_id, [i["id"] for i in items])
+    self.assertGreater(next_version, version)
+
+
+if __name__ == "__main__":
+  unittest.main()
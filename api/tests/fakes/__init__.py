@@ -0,0 +1 @@
+# Local stand-in servers for Slack, GitHub and Jira.
@@ -0,0 +1,295 @@
+"""
+Local stand-ins for the Slack, GitHub and Jira endpoints the API calls.
+
+Each server speaks just enough of the real API for app/integrations/* and
+can inject latency, random 5xx errors and 429 rate limiting, so integration
+heavy flows can be benchmarked without network access or real tokens.
+
+Run standalone:
+  python -m tests.fakes.servers --latency-ms 150 --jitter-ms 50 --error-rate 0.02
+
+Control endpoints (all servers):
+  GET  /__stats   request counts, error/429 counts, recent payloads
+  POST /__config  update behaviour at runtime, e.g. {"latency_ms": 500}
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class Behavior:
+  latency_ms: float = 0.0      # fixed delay added to every response
+  jitter_ms: float = 0.0       # extra uniform random delay in [0, jitter_ms]
+  error_rate: float = 0.0      # probability of answering 503
+  rate_limit: float = 0.0      # allowed requests/second (0 = unlimited)
+  retry_after: int = 1         # Retry-After seconds sent with 429s
+
+
+class _TokenBucket:
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.tokens = None
+    self.stamp = time.monotonic()
+
+  def take(self, rate: float) -> bool:
+    if rate <= 0:
+      return True
+    with self.lock:
+      now = time.monotonic()
+      if self.tokens is None:
+        self.tokens = rate  # start with a full bucket
+      self.tokens = min(rate, self.tokens + (now - self.stamp) * rate)
+      self.stamp = now
+      if self.tokens >= 1:
+        self.tokens -= 1
+        return True
+      return False
+
+
+# ---- per-service routes: (method, regex) -> handler(server, match, body) -> (status, json) ----
+
+def _slack_webhook(server, m, body):
+  if not isinstance(body, dict) or not body.get("text"):
+    return 400, "invalid_payload"
+  return 200, "ok"
+
+
+def _gh_user(server, m, body):
+  return 200, {"id": 1, "login": "fake-bot", "name": "Fake Bot"}
+
+
+def _gh_repos(server, m, body):
+  return 200, [
+    {"id": i, "full_name": f"acme/repo-{i}", "html_url": f"http://fake/acme/repo-{i}", "private": False}
+    for i in range(1, 6)
+  ]
+
+
+def _gh_create_issue(server, m, body):
+  if not isinstance(body, dict) or not body.get("title"):
+    return 422, {"message": "Validation Failed"}
+  number = server.next_id()
+  owner, repo = m.group(1), m.group(2)
+  return 201, {
+    "id": 100000 + number,
+    "number": number,
+    "title": body["title"],
+    "state": "open",
+    "html_url": f"http://fake/{owner}/{repo}/issues/{number}",
+  }
+
+
+def _jira_projects(server, m, body):
+  return 200, {"total": 1, "values": [{"id": "10000", "key": "DEM", "name": "Demo"}]}
+
+
+def _jira_create_issue(server, m, body):
+  fields = (body or {}).get("fields") or {}
+  if not fields.get("summary"):
+    return 400, {"errorMessages": ["summary is required"]}
+  number = server.next_id()
+  key = f"{(fields.get('project') or {}).get('key') or 'DEM'}-{number}"
+  return 201, {"id": str(10000 + number), "key": key, "self": f"http://fake/rest/api/3/issue/{key}"}
+
+
+ROUTES = {
+  "slack": [
+    ("POST", re.compile(r"^/services/[^/]+/[^/]+/[^/]+$"), _slack_webhook),
+  ],
+  "github": [
+    ("GET", re.compile(r"^/user$"), _gh_user),
+    ("GET", re.compile(r"^/user/repos$"), _gh_repos),
+    ("POST", re.compile(r"^/repos/([^/]+)/([^/]+)/issues$"), _gh_create_issue),
+  ],
+  "jira": [
+    ("GET", re.compile(r"^/rest/api/3/project/search$"), _jira_projects),
+    ("POST", re.compile(r"^/rest/api/3/issue$"), _jira_create_issue),
+  ],
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+
+  def log_message(self, fmt, *args):  # keep benchmark output clean
+    pass
+
+  def _send(self, status: int, payload, headers: dict | None = None):
+    raw = payload if isinstance(payload, str) else json.dumps(payload)
+    data = raw.encode()
+    self.send_response(status)
+    self.send_header("Content-Type", "text/plain" if isinstance(payload, str) else "application/json")
+    self.send_header("Content-Length", str(len(data)))
+    for k, v in (headers or {}).items():
+      self.send_header(k, str(v))
+    self.end_headers()
+    self.wfile.write(data)
+
+  def _body(self):
+    length = int(self.headers.get("Content-Length") or 0)
+    if not length:
+      return None
+    try:
+      return json.loads(self.rfile.read(length) or b"null")
+    except ValueError:
+      return None
+
+  def _dispatch(self, method: str):
+    server: FakeServer = self.server
+    path = self.path.split("?", 1)[0]
+    body = self._body()
+
+    if path == "/__stats" and method == "GET":
+      return self._send(200, server.stats())
+    if path == "/__config" and method == "POST":
+      server.configure(**(body or {}))
+      return self._send(200, asdict(server.behavior))
+
+    for route_method, pattern, fn in ROUTES[server.kind]:
+      m = pattern.match(path)
+      if route_method == method and m:
+        break
+    else:
+      server.record(path, 404)
+      return self._send(404, {"message": "Not Found"})
+
+    b = server.behavior
+    if not server.bucket.take(b.rate_limit):
+      server.record(path, 429)
+      return self._send(429, {"message": "rate limited"}, {"Retry-After": b.retry_after})
+
+    delay = b.latency_ms + (random.uniform(0, b.jitter_ms) if b.jitter_ms else 0.0)
+    if delay > 0:
+      time.sleep(delay / 1000.0)
+
+    if b.error_rate and random.random() < b.error_rate:
+      server.record(path, 503)
+      return self._send(503, {"message": "injected failure"})
+
+    status, payload = fn(server, m, body)
+    server.record(path, status, body)
+    return self._send(status, payload)
+
+  def do_GET(self):
+    self._dispatch("GET")
+
+  def do_POST(self):
+    self._dispatch("POST")
+
+
+class FakeServer(ThreadingHTTPServer):
+  daemon_threads = True
+
+  def __init__(self, kind: str, host: str = "127.0.0.1", port: int = 0, behavior: Behavior | None = None):
+    if kind not in ROUTES:
+      raise ValueError(f"kind must be one of {', '.join(ROUTES)}")
+    super().__init__((host, port), _Handler)
+    self.kind = kind
+    self.behavior = behavior or Behavior()
+    self.bucket = _TokenBucket()
+    self._lock = threading.Lock()
+    self._seq = 0
+    self._counts: dict[str, int] = {}
+    self._recent: list = []
+    self._thread: threading.Thread | None = None
+
+  @property
+  def base_url(self) -> str:
+    host, port = self.server_address[:2]
+    return f"http://{host}:{port}"
+
+  def next_id(self) -> int:
+    with self._lock:
+      self._seq += 1
+      return self._seq
+
+  def configure(self, **changes):
+    for k, v in changes.items():
+      if hasattr(self.behavior, k):
+        setattr(self.behavior, k, type(getattr(self.behavior, k))(v))
+
+  def record(self, path: str, status: int, body=None):
+    with self._lock:
+      key = str(status)
+      self._counts[key] = self._counts.get(key, 0) + 1
+      if body is not None:
+        self._recent.append({"path": path, "status": status, "body": body})
+        del self._recent[:-20]
+
+  def stats(self) -> dict:
+    with self._lock:
+      return {
+        "kind": self.kind,
+        "behavior": asdict(self.behavior),
+        "requests": sum(self._counts.values()),
+        "by_status": dict(self._counts),
+        "recent": list(self._recent),
+      }
+
+  def start(self) -> "FakeServer":
+    self._thread = threading.Thread(target=self.serve_forever, name=f"fake-{self.kind}", daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    self.shutdown()
+    self.server_close()
+
+
+def start_all(behavior: Behavior | None = None, host: str = "127.0.0.1", ports: dict | None = None) -> dict:
+  """Start one fake per service; returns {"slack": FakeServer, ...}."""
+  ports = ports or {}
+  return {
+    kind: FakeServer(kind, host, ports.get(kind, 0), Behavior(**asdict(behavior or Behavior()))).start()
+    for kind in ROUTES
+  }
+
+
+def add_behavior_args(parser: argparse.ArgumentParser):
+  parser.add_argument("--latency-ms", type=float, default=0.0)
+  parser.add_argument("--jitter-ms", type=float, default=0.0)
+  parser.add_argument("--error-rate", type=float, default=0.0)
+  parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/second per service (0 = unlimited)")
+
+
+def behavior_from_args(args) -> Behavior:
+  return Behavior(
+    latency_ms=args.latency_ms,
+    jitter_ms=args.jitter_ms,
+    error_rate=args.error_rate,
+    rate_limit=args.rate_limit,
+  )
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Run fake Slack/GitHub/Jira servers.")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--slack-port", type=int, default=5061)
+  parser.add_argument("--github-port", type=int, default=5062)
+  parser.add_argument("--jira-port", type=int, default=5063)
+  add_behavior_args(parser)
+  args = parser.parse_args()
+
+  servers = start_all(
+    behavior_from_args(args),
+    host=args.host,
+    ports={"slack": args.slack_port, "github": args.github_port, "jira": args.jira_port},
+  )
+  for kind, srv in servers.items():
+    print(f"{kind:7s} {srv.base_url}")
+  try:
+    while True:
+      time.sleep(3600)
+  except KeyboardInterrupt:
+    for srv in servers.values():
+      srv.stop()
+
+
+if __name__ == "__main__":
+  main()
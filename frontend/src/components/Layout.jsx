@@ -1,6 +1,7 @@
 import { NavLink, Outlet, useNavigate, useLocation } from 'react-router-dom';
 import { useAuth } from '../state/auth.jsx';
 import { useEffect, useMemo, useState } from 'react';
+import { NotificationsAPI, NOTIFICATIONS_READ_EVENT } from '../lib/notifications';
 
 const navItems = [
   { to: '/',             label: 'Dashboard',        short: 'DB' },
@@ -14,6 +15,33 @@ const navItems = [
   { to: '/settings',     label: 'Settings',         short: 'ST' },
 ];
 
+const UNREAD_POLL_MS = 5000;
+
+// Unread badge: a cheap server-side counter, polled while the tab is visible
+function useUnreadCount(enabled) {
+  const [unread, setUnread] = useState(0);
+  useEffect(() => {
+    if (!enabled) return;
+    let cancelled = false;
+    const poll = async () => {
+      if (document.visibilityState !== 'visible') return;
+      try {
+        const data = await NotificationsAPI.unreadCount();
+        if (!cancelled) setUnread(data.unread || 0);
+      } catch {}
+    };
+    poll();
+    const id = setInterval(poll, UNREAD_POLL_MS);
+    window.addEventListener(NOTIFICATIONS_READ_EVENT, poll);
+    return () => {
+      cancelled = true;
+      clearInterval(id);
+      window.removeEventListener(NOTIFICATIONS_READ_EVENT, poll);
+    };
+  }, [enabled]);
+  return unread;
+}
+
 function initials(name = '') {
   return name
     .split(/\s+/).filter(Boolean).slice(0, 2)
@@ -45,6 +73,7 @@ export default function Layout() {
     setOpen(isDesktop);
   }, [isDesktop, location.pathname]);
 
+  const unread = useUnreadCount(!!user);
   const userInitials = useMemo(() => initials(user?.name), [user?.name]);
   const currentNav = navItems.find(n => location.pathname === n.to || location.pathname.startsWith(`${n.to}/`));
 
@@ -74,6 +103,11 @@ export default function Layout() {
             >
               <span className="nav-icon" aria-hidden>{i.short}</span>
               {i.label}
+              {i.to === '/notifications' && unread > 0 && (
+                <span className="badge" style={{ marginLeft: 'auto' }} title={`${unread} unread`}>
+                  {unread > 99 ? '99+' : unread}
+                </span>
+              )}
             </NavLink>
           ))}
         </nav>
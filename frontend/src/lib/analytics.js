@@ -10,4 +10,12 @@ export const AnalyticsAPI = {
   overdue: (limit = 8) => api.get(`/analytics/overdue?limit=${limit}`).then(r => r.data),
   recent: (limit = 10) => api.get(`/analytics/recent?limit=${limit}`).then(r => r.data),
   topWorkflows: (limit = 5) => api.get(`/analytics/workflows/top?limit=${limit}`).then(r => r.data),
+  // One round trip for several sections; params are per section, e.g. { daily: { days: 30 } }
+  dashboard: async (sections, params = {}) => {
+    const query = { sections: sections.join(',') };
+    Object.entries(params).forEach(([section, opts]) => {
+      Object.entries(opts).forEach(([k, v]) => { query[`${section}.${k}`] = v; });
+    });
+    return (await api.get('/analytics/dashboard', { params: query })).data.sections;
+  },
 };
\ No newline at end of file
@@ -0,0 +1,18 @@
+import { api } from './api';
+
+// Exports stream straight to a file, so they are plain links (cookie auth) rather than XHRs.
+export const ExportsAPI = {
+  url: (dataset, params = {}) => {
+    const query = new URLSearchParams(
+      Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== '')
+    );
+    return `${api.defaults.baseURL}/exports/${dataset}?${query}`;
+  },
+  download: (dataset, params = {}) => {
+    const a = document.createElement('a');
+    a.href = ExportsAPI.url(dataset, params);
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+  },
+};
@@ -1,5 +1,16 @@
 import { api } from './api';
 
+// Fired after the read cursor moves so the nav badge refreshes right away
+export const NOTIFICATIONS_READ_EVENT = 'iwas:notifications-read';
+
 export const NotificationsAPI = {
   recent: async (params = {}) => (await api.get('/notifications/recent', { params })).data,
+  unreadCount: async () => (await api.get('/notifications/unread-count')).data,
+  markRead: async (upToId) => (await api.post('/notifications/read', upToId ? { up_to_id: upToId } : {})).data,
+  // Server-Sent Events; the browser resends Last-Event-ID itself on reconnect
+  stream: (lastEventId) => {
+    const qs = lastEventId ? `?last_event_id=${encodeURIComponent(lastEventId)}` : '';
+    return new EventSource(`${api.defaults.baseURL}/notifications/stream${qs}`, { withCredentials: true });
+  },
+  refreshSession: async () => api.post('/auth/refresh'),
 };
@@ -0,0 +1,10 @@
+import { api } from './api';
+
+export const ReportsAPI = {
+  list: () => api.get('/reports/').then(r => r.data),
+  create: (payload) => api.post('/reports/', payload).then(r => r.data),
+  update: (id, patch) => api.patch(`/reports/${id}`, patch).then(r => r.data),
+  remove: (id) => api.delete(`/reports/${id}`).then(r => r.data),
+  latest: (id) => api.get(`/reports/${id}/latest`).then(r => r.data),
+  refresh: (id) => api.post(`/reports/${id}/refresh`).then(r => r.data),
+};
@@ -9,4 +9,16 @@ export const TasksAPI = {
     api.patch(`/workflows/tasks/${taskId}`, patch).then(r => r.data),  
   remove: (taskId) =>
     api.delete(`/workflows/tasks/${taskId}`).then(r => r.data),        
+  // [{ op: 'create'|'update'|'delete', id | workflow_id, ...fields }] -> result per op, by index
+  bulk: (ops) =>
+    api.post('/tasks/bulk', ops).then(r => r.data),
+  // CSV (name,status,assigned_to,due_date) or NDJSON file -> the import's NDJSON events, parsed
+  importFile: (wfId, file, { rules = false } = {}) => {
+    const ndjson = /\.(ndjson|jsonl)$/i.test(file.name);
+    return api.post('/tasks/import', file, {
+      params: { workflow_id: wfId, rules: rules ? 1 : undefined },
+      headers: { 'Content-Type': ndjson ? 'application/x-ndjson' : 'text/csv' },
+      responseType: 'text',
+    }).then(r => String(r.data).split('\n').filter(Boolean).map(line => JSON.parse(line)));
+  },
 };
@@ -2,12 +2,17 @@ import { useEffect, useState } from 'react';
 import Section from './_scaffold.jsx';
 import { AnalyticsAPI } from '../lib/analytics';
 import { subscribeTaskChanges } from '../state/taskSync';
+import { useAuth } from '../state/auth.jsx';
 
 export default function Analytics() {
   const [busy, setBusy] = useState(false);
   const [err, setErr] = useState('');
   const [lastUpdated, setLastUpdated] = useState(null);
   const [autoRefresh, setAutoRefresh] = useState(true);
+  const { user } = useAuth();
+  const isAdmin = user?.role === 'admin';
+  // Admin-wide counts default to fast estimates; exact ones on demand
+  const [exact, setExact] = useState(false);
 
   const [summary, setSummary] = useState(null);
   const [statuses, setStatuses] = useState({ total: 0, breakdown: [] });
@@ -19,20 +24,24 @@ export default function Analytics() {
   async function load() {
     setBusy(true); setErr('');
     try {
-      const [s, st, d, od, rc, tw] = await Promise.all([
-        AnalyticsAPI.summary(),
-        AnalyticsAPI.statuses(),
-        AnalyticsAPI.daily(30),
-        AnalyticsAPI.overdue(8),
-        AnalyticsAPI.recent(10),
-        AnalyticsAPI.topWorkflows(5),
-      ]);
-      setSummary(s.summary || null);
-      setStatuses(st);
-      setDaily(d);
-      setOverdue(od);
-      setRecent(rc);
-      setTop(tw);
+      const approx = isAdmin && !exact ? { approx: 'true' } : {};
+      const d = await AnalyticsAPI.dashboard(
+        ['summary', 'statuses', 'daily', 'overdue', 'recent', 'top_workflows'],
+        {
+          summary: approx,
+          statuses: approx,
+          daily: { days: 30 },
+          overdue: { limit: 8, ...approx },
+          recent: { limit: 10 },
+          top_workflows: { limit: 5 },
+        },
+      );
+      setSummary(d.summary?.summary || null);
+      setStatuses(d.statuses);
+      setDaily(d.daily);
+      setOverdue(d.overdue);
+      setRecent(d.recent);
+      setTop(d.top_workflows);
       setLastUpdated(new Date());
     } catch (e) {
       setErr(e?.response?.data?.error || 'Failed to load analytics');
@@ -45,13 +54,13 @@ export default function Analytics() {
     load();
     const off = subscribeTaskChanges(() => load());
     return () => { if (off) off(); };
-  }, []); // eslint-disable-line react-hooks/exhaustive-deps
+  }, [exact]); // eslint-disable-line react-hooks/exhaustive-deps
 
   useEffect(() => {
     if (!autoRefresh) return;
     const id = setInterval(() => load(), 30000);
     return () => clearInterval(id);
-  }, [autoRefresh]); // eslint-disable-line react-hooks/exhaustive-deps
+  }, [autoRefresh, exact]); // eslint-disable-line react-hooks/exhaustive-deps
 
   return (
     <Section title="Analytics" subtitle="Trends and operational insights">
@@ -63,6 +72,17 @@ export default function Analytics() {
           <input type="checkbox" checked={autoRefresh} onChange={e => setAutoRefresh(e.target.checked)} />
           Auto-refresh (30s)
         </label>
+        {isAdmin && (
+          <label style={{ display:'inline-flex', alignItems:'center', gap:6, fontSize:14 }}>
+            <input type="checkbox" checked={exact} onChange={e => setExact(e.target.checked)} />
+            Exact counts
+          </label>
+        )}
+        {(statuses.approx || overdue.approx) && (
+          <span style={{ fontSize:13, color:'#6b7280' }}>
+            Estimated from a {statuses.sample_size || overdue.bounds?.sample_size}-task sample (95% bounds)
+          </span>
+        )}
         {lastUpdated && (
           <span style={{ fontSize:13, color:'#6b7280' }}>
             Updated at {lastUpdated.toLocaleTimeString()}
@@ -50,12 +50,9 @@ export default function Dashboard() {
   async function loadAll() {
     setErr('');
     try {
-      const [{ summary }, dailyRes] = await Promise.all([
-        AnalyticsAPI.summary(),
-        AnalyticsAPI.daily({ days: 30 }),
-      ]);
-      setSummary(summary);
-      setDaily(dailyRes.items || []);
+      const d = await AnalyticsAPI.dashboard(['summary', 'daily'], { daily: { days: 30 } });
+      setSummary(d.summary?.summary || null);
+      setDaily(d.daily?.items || []);
 
       // recent activity (remove this block if you don’t want the feed)
       try {
@@ -17,6 +17,9 @@ export default function Logs() {
   const [sortDir, setSortDir] = useState('desc');     // 'asc' | 'desc'
   const [page, setPage] = useState(1);
   const [pageSize, setPageSize] = useState(25);       // 25 / 50 / 100
+  const [older, setOlder] = useState(null);           // server cursor for the next batch (recent or search)
+  const [query, setQuery] = useState('');
+  const [searched, setSearched] = useState('');       // query the current items came from ('' = recent feed)
   const canSeeAttempts = useCan(['admin']);
 
   useEffect(() => {
@@ -25,6 +28,7 @@ export default function Logs() {
         // increase limit if you want more client-side history (e.g., 500)
         const res = await api.get('/logs/recent?limit=100');
         setItems(res.data.items || []);
+        setOlder(res.data.next_cursor || null);
         setErr('');
         setPage(1);
         if (canSeeAttempts) {
@@ -37,6 +41,36 @@ export default function Logs() {
     })();
   }, [canSeeAttempts]);
 
+  async function loadOlder() {
+    try {
+      const res = searched
+        ? await api.get('/logs/search', { params: { q: searched, limit: 100, ...older } })
+        : await api.get('/logs/recent', { params: { limit: 100, ...older } });
+      setItems(prev => [...prev, ...(res.data.items || [])]);
+      setOlder(res.data.next_cursor || null);
+    } catch (e) {
+      setErr(e?.response?.data?.error || 'Failed to load');
+    }
+  }
+
+  async function runSearch(e) {
+    e.preventDefault();
+    const q = query.trim();
+    try {
+      // Full-text search ranks by relevance; an empty box goes back to the recent feed
+      const res = q
+        ? await api.get('/logs/search', { params: { q, limit: 100 } })
+        : await api.get('/logs/recent', { params: { limit: 100 } });
+      setItems(res.data.items || []);
+      setOlder(res.data.next_cursor || null);
+      setSearched(q);
+      setErr('');
+      setPage(1);
+    } catch (e) {
+      setErr(e?.response?.data?.error || 'Search failed');
+    }
+  }
+
   // sorting
   const sorted = useMemo(() => {
     const arr = [...items];
@@ -78,6 +112,10 @@ export default function Logs() {
 
       {/* Controls */}
       <div style={{ display:'flex', gap:12, alignItems:'center', flexWrap:'wrap', marginBottom:12 }}>
+        <form onSubmit={runSearch} style={{ display:'inline-flex', gap:6 }}>
+          <input value={query} onChange={e=>setQuery(e.target.value)} placeholder="Search events and errors…" />
+          <button type="submit">Search</button>
+        </form>
         <label>Sort by:&nbsp;
           <select value={sortBy} onChange={e=>setSortBy(e.target.value)}>
             <option value="timestamp">Time</option>
@@ -144,6 +182,7 @@ export default function Logs() {
           <div style={{ opacity:.8 }}>Page {page} of {totalPages}</div>
           <button onClick={()=>setPage(p=>Math.min(totalPages,p+1))} disabled={page>=totalPages}>Next ›</button>
           <button onClick={()=>setPage(totalPages)} disabled={page>=totalPages}>Last »</button>
+          {older && <button onClick={loadOlder}>{searched ? 'Load more results' : 'Load older'}</button>}
         </div>
       )}
 
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useRef, useState } from 'react';
 import Section from './_scaffold.jsx';
-import { NotificationsAPI } from '../lib/notifications';
+import { NotificationsAPI, NOTIFICATIONS_READ_EVENT } from '../lib/notifications';
 import { Link } from 'react-router-dom';
 
 function fmt(ts) {
@@ -32,6 +32,7 @@ export default function Notifications() {
   const [busy, setBusy] = useState(false);
   const [err, setErr] = useState('');
   const [readSet, setReadSet] = useReadSet();
+  const [lastReadId, setLastReadId] = useState(0);   // server-side read cursor
   const [live, setLive] = useState(true);
   const [pageSize, setPageSize] = useState(50);   // acts as fetch limit + page size
   const [page, setPage] = useState(1);            // client-side page
@@ -42,10 +43,16 @@ export default function Notifications() {
   async function load(opts = {}) {
     setErr(''); setBusy(true);
     try {
-      const data = await NotificationsAPI.recent({ limit: pageSize, ...opts });
+      let data = await NotificationsAPI.recent({ limit: pageSize, ...opts });
+      if (data.last_read_id !== undefined) setLastReadId(data.last_read_id);
       if (opts.after_id) {
+        // Catch up in order when more than one page arrived since the last poll
+        let incoming = data.items || [];
+        while (data.has_more && data.next_cursor?.after_id) {
+          data = await NotificationsAPI.recent({ limit: pageSize, after_id: data.next_cursor.after_id });
+          incoming = [...(data.items || []), ...incoming];
+        }
         setItems(prev => {
-          const incoming = data.items || [];
           if (!incoming.length) return prev;
           const have = new Set(prev.map(i => i.id));
           const dedup = incoming.filter(i => !have.has(i.id));
@@ -68,18 +75,42 @@ export default function Notifications() {
     load();
   }, [pageSize]);
 
-  // Live polling (prepend new items if any)
+  // Live updates over SSE (prepend new items as they are pushed)
+  const newestRef = useRef(0);
+  newestRef.current = newestId;
   useEffect(() => {
-    if (!live) {
-      if (timer.current) { clearInterval(timer.current); timer.current = null; }
-      return;
-    }
-    timer.current = setInterval(() => {
-      if (newestId) load({ after_id: newestId });
-      else load();
-    }, 8000);
-    return () => { if (timer.current) clearInterval(timer.current); };
-  }, [live, newestId, pageSize]);
+    if (!live) return;
+    let es = null;
+    let stopped = false;
+    const open = () => {
+      es = NotificationsAPI.stream(newestRef.current);
+      es.addEventListener('activity', (e) => {
+        const item = JSON.parse(e.data);
+        setItems(prev => {
+          if (prev.some(i => i.id === item.id)) return prev;
+          // A late commit can arrive after higher ids; keep the list newest first
+          const at = prev.findIndex(i => i.id < item.id);
+          return at === -1 ? [...prev, item] : [...prev.slice(0, at), item, ...prev.slice(at)];
+        });
+      });
+      // Too much was missed to replay; reload the list instead
+      es.addEventListener('reset', () => load());
+      es.onerror = () => {
+        if (es.readyState !== EventSource.CLOSED || stopped) return;
+        // Rejected (e.g. expired access token): refresh the session, then reconnect
+        timer.current = setTimeout(async () => {
+          try { await NotificationsAPI.refreshSession(); } catch {}
+          if (!stopped) open();
+        }, 3000);
+      };
+    };
+    open();
+    return () => {
+      stopped = true;
+      if (timer.current) { clearTimeout(timer.current); timer.current = null; }
+      if (es) es.close();
+    };
+  }, [live, pageSize]);
 
   // Client-side pagination
   const total = items.length;
@@ -94,10 +125,17 @@ export default function Notifications() {
     [items, start, pageSize]
   );
 
-  function markAllRead() {
-    const s = new Set(readSet);
-    items.forEach(i => s.add(i.id));
-    setReadSet(s);
+  const isRead = (n) => n.id <= lastReadId || readSet.has(n.id);
+
+  async function markAllRead() {
+    try {
+      const data = await NotificationsAPI.markRead(newestId || undefined);
+      setLastReadId(data.last_read_id);
+      setReadSet(new Set());
+      window.dispatchEvent(new Event(NOTIFICATIONS_READ_EVENT));
+    } catch (e) {
+      setErr(e?.response?.data?.error || 'Failed to mark notifications read');
+    }
   }
   function toggleRead(id) {
     const s = new Set(readSet);
@@ -105,7 +143,7 @@ export default function Notifications() {
     setReadSet(s);
   }
 
-  const unreadCount = items.filter(i => !readSet.has(i.id)).length;
+  const unreadCount = items.filter(i => !isRead(i)).length;
   const showingFrom = total === 0 ? 0 : start + 1;
   const showingTo = Math.min(start + pageSize, total);
 
@@ -116,7 +154,7 @@ export default function Notifications() {
           <button onClick={() => load()} disabled={busy}>{busy ? 'Refreshing…' : 'Refresh'}</button>
           <label style={{ display:'flex', alignItems:'center', gap:6 }}>
             <input type="checkbox" checked={live} onChange={e => setLive(e.target.checked)} />
-            Live (8s)
+            Live
           </label>
           <label>
             Show:&nbsp;
@@ -168,7 +206,7 @@ export default function Notifications() {
           ) : (
             <ul style={{ listStyle:'none', margin:0, padding:0 }}>
               {pageItems.map(n => {
-                const unread = !readSet.has(n.id);
+                const unread = !isRead(n);
                 return (
                   <li key={n.id} style={{
                     display:'grid',
@@ -194,9 +232,11 @@ export default function Notifications() {
                     </div>
                     <div style={{ display:'flex', alignItems:'center', gap:8, justifyContent:'space-between' }}>
                       <span>{fmt(n.when)}</span>
-                      <button onClick={() => toggleRead(n.id)} style={{ fontSize:12 }}>
-                        Mark {unread ? 'read' : 'unread'}
-                      </button>
+                      {n.id > lastReadId && (
+                        <button onClick={() => toggleRead(n.id)} style={{ fontSize:12 }}>
+                          Mark {unread ? 'read' : 'unread'}
+                        </button>
+                      )}
                     </div>
                   </li>
                 );
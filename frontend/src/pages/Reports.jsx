@@ -2,6 +2,8 @@ import { useCallback, useEffect, useMemo, useRef, useState } from 'react';
 import Section from './_scaffold.jsx';
 import { WorkflowsAPI } from '../lib/workflows';
 import { TasksAPI } from '../lib/tasks';
+import { ExportsAPI } from '../lib/exports';
+import { ReportsAPI } from '../lib/reports';
 import { Link } from 'react-router-dom';
 import { subscribeTaskChanges } from '../state/taskSync';
 
@@ -15,19 +17,6 @@ function fmt(dateLike) {
   }
 }
 
-function toCSV(rows, headers) {
-  const esc = (v) => {
-    const s = v == null ? '' : String(v);
-    if (/[",\n]/.test(s)) return `"${s.replace(/"/g, '""')}"`;
-    return s;
-  };
-  const head = headers.map(h => esc(h.label)).join(',');
-  const body = rows.map(r =>
-    headers.map(h => esc(h.value(r))).join(',')
-  ).join('\n');
-  return head + '\n' + body;
-}
-
 export default function Reports() {
   const PAGE_SIZE = 18;
   const [busy, setBusy] = useState(false);
@@ -144,26 +133,17 @@ export default function Reports() {
   }, [filtered, todayStr]);
 
   function exportCSV() {
-    const headers = [
-      { label: 'Workflow', value: r => r.workflow_name },
-      { label: 'Task ID', value: r => r.id },
-      { label: 'Task Name', value: r => r.name },
-      { label: 'Status', value: r => r.status },
-      { label: 'Assigned To', value: r => r.assigned_to || '' },
-      { label: 'Due Date', value: r => fmt(r.due_date) },
-      { label: 'Created At', value: r => fmt(r.created_at) },
-    ];
-    const csv = toCSV(filtered, headers);
-    const blob = new Blob([csv], { type: 'text/csv;charset=utf-8' });
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    const dateTag = new Date().toISOString().slice(0, 10);
-    a.href = url;
-    a.download = `iwas-report-${dateTag}.csv`;
-    document.body.appendChild(a);
-    a.click();
-    URL.revokeObjectURL(url);
-    a.remove();
+    // Server-side streaming export with the same filters, so it is not limited to the loaded rows
+    ExportsAPI.download('tasks', {
+      format: 'csv',
+      gzip: 1,
+      workflow_id: wfId !== 'all' ? wfId : '',
+      status: status !== 'all' ? status : '',
+      assigned_to: assignedTo.trim(),
+      q: q.trim(),
+      since: fromDate,
+      until: toDate,
+    });
   }
 
   const headerBtn = (key, label) => {
@@ -329,10 +309,82 @@ export default function Reports() {
         </div>
         {visible.length < filtered.length && <div ref={sentinelRef} />}
       </div>
+
+      <ScheduledReports />
     </Section>
   );
 }
 
+// Precomputed snapshots: shown straight from storage, refresh is throttled server-side
+function ScheduledReports() {
+  const [items, setItems] = useState([]);
+  const [open, setOpen] = useState(null); // { id, body }
+  const [msg, setMsg] = useState('');
+
+  const load = useCallback(async () => {
+    try {
+      const r = await ReportsAPI.list();
+      setItems(r.items || []);
+    } catch { /* reports are optional */ }
+  }, []);
+  useEffect(() => { load(); }, [load]);
+
+  async function view(id) {
+    setMsg('');
+    try {
+      setOpen({ id, body: await ReportsAPI.latest(id) });
+    } catch (e) {
+      setMsg(e?.response?.data?.error || 'Failed to load snapshot');
+    }
+  }
+
+  async function refresh(id) {
+    setMsg('');
+    try {
+      await ReportsAPI.refresh(id);
+      await load();
+      if (open?.id === id) await view(id);
+    } catch (e) {
+      const d = e?.response?.data || {};
+      setMsg(d.retry_after ? `${d.error} (retry in ${d.retry_after}s)` : (d.error || 'Refresh failed'));
+    }
+  }
+
+  if (!items.length) return null;
+  return (
+    <div className="table-wrap" style={{ marginTop: 16 }}>
+      <div className="table-head">
+        <div style={{ fontWeight: 700 }}>Scheduled reports</div>
+        {msg && <div className="muted">{msg}</div>}
+      </div>
+      <table className="table">
+        <thead>
+          <tr><th>Name</th><th>Kind</th><th>Schedule</th><th>Latest snapshot</th><th /></tr>
+        </thead>
+        <tbody>
+          {items.map(r => (
+            <tr key={r.id}>
+              <td>{r.name}</td>
+              <td>{r.kind}</td>
+              <td><code>{r.cron_expr || 'on demand'}</code></td>
+              <td>{r.latest ? new Date(r.latest.created_at + 'Z').toLocaleString() : '—'}</td>
+              <td style={{ display: 'flex', gap: 6 }}>
+                <button className="btn outline btn-sm" onClick={() => view(r.id)} disabled={!r.latest}>View</button>
+                <button className="btn btn-sm" onClick={() => refresh(r.id)}>Refresh</button>
+              </td>
+            </tr>
+          ))}
+        </tbody>
+      </table>
+      {open && (
+        <pre style={{ maxHeight: 360, overflow: 'auto', fontSize: 12, padding: 12 }}>
+          {JSON.stringify(open.body.data, null, 2)}
+        </pre>
+      )}
+    </div>
+  );
+}
+
 function Stat({ label, value, tone }) {
   const colors = {
     success: { bg: 'linear-gradient(135deg, #ecfdf3, #d1fae5)', text: '#15803d' },
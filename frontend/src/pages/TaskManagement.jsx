@@ -1,11 +1,11 @@
 import { useCallback, useEffect, useMemo, useState } from 'react';
 import Section from './_scaffold.jsx';
-import { api } from '../lib/api';
-import { subscribeTaskChanges } from '../state/taskSync';
+import { subscribeTaskChanges, syncTasks } from '../state/taskSync';
+import { TasksAPI } from '../lib/tasks';
 
 export default function TaskManagement() {
   const [items, setItems] = useState([]);
-  const [filter, setFilter] = useState('');        // server-side status filter (optional)
+  const [filter, setFilter] = useState('');        // status filter (optional)
   const [search, setSearch] = useState('');        // client-side search
   const [page, setPage] = useState(1);
   const [pageSize, setPageSize] = useState(20);
@@ -18,9 +18,9 @@ export default function TaskManagement() {
   const load = useCallback(async () => {
     setBusy(true); setErr('');
     try {
-      const url = filter ? `/tasks?status=${encodeURIComponent(filter)}` : '/tasks';
-      const res = await api.get(url);
-      setItems(res.data.items || []);
+      // Delta sync: only tasks changed since the last call come over the wire
+      const all = await syncTasks();
+      setItems(filter ? all.filter(x => x.status === filter) : all);
     } catch (e) {
       setErr(e?.response?.data?.error || 'Failed to load');
     } finally {
@@ -28,7 +28,27 @@ export default function TaskManagement() {
     }
   }, [filter]);
 
-  // Load on mount + whenever server-side status filter changes
+  // One bulk request (one commit, one Slack summary) per 500 tasks
+  const markDone = useCallback(async (tasks) => {
+    const open = tasks.filter(t => (t.status || '').toLowerCase() !== 'done');
+    if (!open.length || !window.confirm(`Mark ${open.length} task(s) as done?`)) return;
+    setBusy(true); setErr('');
+    try {
+      let rejected = 0;
+      for (let i = 0; i < open.length; i += 500) {
+        const res = await TasksAPI.bulk(open.slice(i, i + 500).map(t => ({ op: 'update', id: t.id, status: 'done' })));
+        rejected += res.rejected || 0;
+      }
+      if (rejected) setErr(`${rejected} task(s) could not be updated`);
+    } catch (e) {
+      setErr(e?.response?.data?.error || 'Bulk update failed');
+    } finally {
+      setBusy(false);
+    }
+    load();
+  }, [load]);
+
+  // Load on mount + whenever the status filter changes
   useEffect(() => { setPage(1); load(); }, [filter, load]);
   useEffect(() => {
     const off = subscribeTaskChanges(() => load());
@@ -153,6 +173,10 @@ export default function TaskManagement() {
           </select>
         </label>
 
+        <button onClick={() => markDone(filtered)} disabled={busy || stats.pendingCount === 0}>
+          Mark shown as done
+        </button>
+
         <button onClick={load} disabled={busy} style={{ marginLeft: 8 }}>
           {busy ? 'Refreshing…' : 'Refresh'}
         </button>
@@ -14,6 +14,8 @@ export default function WorkflowDetail() {
   const [name, setName] = useState('');
   const [assigned, setAssigned] = useState('');
   const [due, setDue] = useState(''); // YYYY-MM-DD
+  const [runRules, setRunRules] = useState(false);
+  const [imported, setImported] = useState(null); // { done, errors } of the last import
 
   const load = useCallback(async () => {
     setBusy(true);
@@ -58,6 +60,23 @@ export default function WorkflowDetail() {
     }
   }
 
+  async function importFile(e) {
+    const file = e.target.files?.[0];
+    e.target.value = '';
+    if (!file) return;
+    setBusy(true); setErr(''); setImported(null);
+    try {
+      const events = await TasksAPI.importFile(id, file, { rules: runRules });
+      const done = events.find(ev => ev.type === 'done');
+      setImported({ done, errors: events.filter(ev => ev.type === 'error') });
+      broadcastTaskChange({ action: 'imported', workflowId: Number(id) }); // reloads the list
+    } catch (e) {
+      setErr(e?.response?.data?.error || 'Import failed');
+    } finally {
+      setBusy(false);
+    }
+  }
+
   async function setStatus(t, next) {
     try {
       const { item } = await TasksAPI.update(t.id, { status: next });
@@ -99,6 +118,29 @@ export default function WorkflowDetail() {
         <button type="submit" disabled={busy}>{busy ? 'Saving…' : 'Add task'}</button>
       </form>
 
+      <div style={{ display:'flex', flexWrap:'wrap', gap:12, alignItems:'center', marginTop:12 }}>
+        <label>
+          <span style={{ marginRight:6 }}>Import CSV / NDJSON:</span>
+          <input type="file" accept=".csv,.ndjson,.jsonl" onChange={importFile} disabled={busy} />
+        </label>
+        <label>
+          <input type="checkbox" checked={runRules} onChange={e=>setRunRules(e.target.checked)} /> Run rules
+        </label>
+      </div>
+      {imported?.done && (
+        <div style={{ fontSize:13, marginTop:8 }}>
+          Imported {imported.done.created} of {imported.done.rows} rows
+          {imported.done.failed ? ` • ${imported.done.failed} failed` : ''}
+          {imported.done.truncated ? ` • ${imported.done.error}` : ''}
+          {imported.errors.length > 0 && (
+            <ul style={{ margin:'4px 0 0', paddingLeft:18, color:'crimson' }}>
+              {imported.errors.slice(0, 10).map(ev => <li key={ev.line}>line {ev.line}: {ev.error}</li>)}
+              {imported.errors.length > 10 && <li>…and {imported.errors.length - 10} more</li>}
+            </ul>
+          )}
+        </div>
+      )}
+
       <div style={{ marginTop:16 }}>
         <h3 style={{ margin:0 }}>Tasks</h3>
         {items.length === 0 ? (
@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useEffect, useState } from 'react';
 import { api } from '../lib/api.js';
+import { resetTaskCache } from './taskSync.js';
 
 const Ctx = createContext({ user: null, loading: true, login: () => {}, logout: () => {} });
 
@@ -43,11 +44,12 @@ export function AuthProvider({ children }) {
   }, []);
 
   // After a successful login call, set the user
-  const login = (u) => setUser(u);
+  const login = (u) => { resetTaskCache(); setUser(u); };
 
   // Call API to clear cookie and drop user from context
   const logout = async () => {
     try { await api.post('/auth/logout'); } catch {}
+    resetTaskCache();
     setUser(null);
   };
 
@@ -1,3 +1,5 @@
+import { api } from '../lib/api.js';
+
 // Lightweight task change broadcaster so task updates refresh any open views.
 // Uses EventTarget for in-app subscribers and BroadcastChannel to sync across tabs.
 const EVENT = 'iwas:task-change';
@@ -32,3 +34,55 @@ export function subscribeTaskChanges(fn) {
   emitter.addEventListener(EVENT, handler);
   return () => emitter.removeEventListener(EVENT, handler);
 }
+
+// Local cache of the user's tasks, kept current with /api/tasks/changes:
+// one full snapshot, then only rows changed since the stored version.
+const taskCache = { items: new Map(), version: null, pending: Promise.resolve() };
+
+function byDueDate(a, b) {
+  if (!a.due_date !== !b.due_date) return a.due_date ? -1 : 1;
+  if (a.due_date !== b.due_date) return a.due_date < b.due_date ? -1 : 1;
+  return b.id - a.id;
+}
+
+async function pullTaskChanges() {
+  const since = taskCache.version;
+  const items = since === null ? new Map() : taskCache.items;
+  let cursor = null;
+  for (;;) {
+    const params = {};
+    if (since !== null) params.since = since;
+    if (cursor) params.cursor = cursor;
+    let data;
+    try {
+      data = (await api.get('/tasks/changes', { params })).data;
+    } catch (e) {
+      // Our version is older than the server's kept deletions: start over
+      if (e?.response?.status === 410 && since !== null) {
+        taskCache.version = null;
+        return pullTaskChanges();
+      }
+      throw e;
+    }
+    (data.deleted || []).forEach(d => items.delete(d.id));
+    (data.items || []).forEach(t => items.set(t.id, t));
+    if (!data.has_more) {
+      taskCache.items = items;
+      taskCache.version = data.version;
+      return;
+    }
+    cursor = data.next_cursor;
+  }
+}
+
+export async function syncTasks() {
+  // Queue behind a pull already in flight so a change made meanwhile is not missed
+  taskCache.pending = taskCache.pending.catch(() => {}).then(pullTaskChanges);
+  await taskCache.pending;
+  return [...taskCache.items.values()].sort(byDueDate);
+}
+
+export function resetTaskCache() {
+  taskCache.items = new Map();
+  taskCache.version = null;
+}
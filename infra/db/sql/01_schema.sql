@@ -26,6 +26,13 @@ CREATE TABLE IF NOT EXISTS tasks (
   assigned_to VARCHAR(100),
   due_date DATE,
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  version BIGINT NOT NULL DEFAULT 0,
+  INDEX ix_tasks_due_date (due_date),
+  INDEX ix_tasks_created_at (created_at),
+  INDEX ix_tasks_version (version),
+  INDEX ix_tasks_workflow_created (workflow_id, created_at),
+  INDEX ix_tasks_workflow_due (workflow_id, due_date),
+  INDEX ix_tasks_assigned_due (assigned_to, due_date),
   CONSTRAINT fk_tasks_workflow
     FOREIGN KEY (workflow_id) REFERENCES workflows(id)
     ON DELETE CASCADE
@@ -41,6 +48,8 @@ CREATE TABLE IF NOT EXISTS logs (
   duration_ms INT NULL,
   service VARCHAR(100) NULL,
   error_message TEXT NULL,
+  INDEX ix_logs_timestamp (timestamp),
+  INDEX ix_logs_status_id (status, id),
   CONSTRAINT fk_logs_task
     FOREIGN KEY (task_id) REFERENCES tasks(id)
     ON DELETE CASCADE